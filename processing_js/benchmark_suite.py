@@ -0,0 +1,72 @@
+# coding=utf-8
+"""
+Benchmark Suite.
+
+Runs the end to end pipeline benchmark, saving results as JSON. The following
+environment variables are used:
+
+- BENCHMARK_SIZES: comma separated feature counts (defaults to 10000,100000,1000000)
+- BENCHMARK_OUTPUT: path to the JSON results file (defaults to benchmark_<timestamp>.json)
+- BENCHMARK_BASELINE: path to a previous JSON results file to compare against
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import json
+import os
+import sys
+import time
+import qgis  # pylint: disable=unused-import
+from qgis.PyQt import Qt
+from osgeo import gdal
+
+
+def _run_benchmarks(sizes, output_file, baseline_file=None):
+    """Core function to run the benchmarks."""
+    # imported here so that QGIS is initialized first
+    from processing_js.test.utilities import get_qgis_app  # pylint: disable=import-outside-toplevel
+    get_qgis_app()
+    from processing_js.benchmarks.benchmark_pipeline import (run_benchmark,  # pylint: disable=import-outside-toplevel
+                                                             compare_results)
+
+    print('########')
+    print('Running pipeline benchmarks for {} features'.format(', '.join(str(s) for s in sizes)))
+    print('Python GDAL : %s' % gdal.VersionInfo('VERSION_NUM'))
+    print('QT : %s' % Qt.QT_VERSION)
+    print('########')
+    sys.stdout.flush()
+
+    report = run_benchmark(sizes, output_file)
+    if baseline_file:
+        with open(baseline_file) as f:
+            compare_results(json.load(f), report)
+    return report
+
+
+def benchmark_package():
+    """Runs the benchmarks with the default settings."""
+    from processing_js.benchmarks.benchmark_pipeline import SIZES  # pylint: disable=import-outside-toplevel
+    return _run_benchmarks(SIZES, 'benchmark_{}.json'.format(time.strftime('%Y%m%d_%H%M%S')))
+
+
+def benchmark_environment():
+    """Runs the benchmarks configured by environment variables."""
+    from processing_js.benchmarks.benchmark_pipeline import SIZES  # pylint: disable=import-outside-toplevel
+    sizes = os.environ.get('BENCHMARK_SIZES')
+    sizes = [int(s) for s in sizes.split(',')] if sizes else SIZES
+    output_file = os.environ.get('BENCHMARK_OUTPUT', 'benchmark_{}.json'.format(time.strftime('%Y%m%d_%H%M%S')))
+    return _run_benchmarks(sizes, output_file, os.environ.get('BENCHMARK_BASELINE'))
+
+
+if __name__ == '__main__':
+    benchmark_environment()
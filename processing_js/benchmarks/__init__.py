@@ -0,0 +1,7 @@
+# coding=utf-8
+"""
+Throughput benchmarks for the Javascript provider.
+
+Benchmarks are not part of the regression test suite, and are run manually
+with a working QGIS environment.
+"""
@@ -0,0 +1,112 @@
+# coding=utf-8
+"""Feature marshalling benchmark.
+
+Compares the throughput of the direct QJSValue feature marshalling against
+the GeoJSON string fallback, using the layers from the test data folder.
+
+Run with:
+
+    python -m processing_js.benchmarks.benchmark_marshalling
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import time
+
+from qgis.core import (QgsVectorLayer,
+                       QgsCoordinateTransformContext)
+from qgis.PyQt.QtCore import QTextCodec
+from PyQt5.QtQml import QJSEngine
+
+from processing_js.processing.marshalling import (GeoJsonMarshaller,
+                                                 FeatureMarshaller)
+from processing_js.test.utilities import get_qgis_app
+
+test_data_path = os.path.join(
+    os.path.dirname(__file__),
+    '..',
+    'test',
+    'data')
+
+LAYERS = [
+    'lines.shp',
+    'points.gml',
+    'test_gpkg.gpkg|layername=points',
+    'test_gpkg.gpkg|layername=lines',
+]
+
+SCRIPT = """
+function func(feature)
+{
+  return feature;
+}
+"""
+
+# minimum number of features to pass through each marshaller per layer
+MIN_FEATURES = 20000
+
+
+def create_marshaller(marshaller_class, engine, layer, precision=None):
+    """
+    Creates a marshaller of the specified class for a layer
+    """
+    if marshaller_class is GeoJsonMarshaller:
+        return GeoJsonMarshaller(layer.fields(), layer.crs(), QTextCodec.codecForName("System"),
+                                 precision=precision)
+    return marshaller_class(engine, layer.fields(), layer.crs(), QgsCoordinateTransformContext(),
+                            precision=precision)
+
+
+def run_marshaller(marshaller_class, layer, precision=None):
+    """
+    Passes the features from a layer through a marshaller and an identity script,
+    returning the number of features processed per second
+    """
+    engine = QJSEngine()
+    engine.evaluate(marshaller_class.JS_WRAPPER + SCRIPT)
+    process = engine.globalObject().property('process')
+    marshaller = create_marshaller(marshaller_class, engine, layer, precision)
+
+    features = list(layer.getFeatures())
+    repeats = max(1, MIN_FEATURES // max(1, len(features)))
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for feature in features:
+            marshaller.features_from_js(process.call([marshaller.feature_to_js(feature)]))
+    elapsed = time.perf_counter() - start
+
+    return repeats * len(features) / elapsed if elapsed > 0 else 0
+
+
+def run_benchmark():
+    """
+    Runs the marshalling benchmark over all test layers, printing a summary table
+    """
+    print('{:<35} {:>15} {:>15} {:>8}'.format('Layer', 'GeoJSON (f/s)', 'Direct (f/s)', 'Ratio'))
+    for source in LAYERS:
+        layer = QgsVectorLayer(os.path.join(test_data_path, source), 'layer', 'ogr')
+        if not layer.isValid():
+            print('{:<35} could not be loaded'.format(source))
+            continue
+
+        geojson_rate = run_marshaller(GeoJsonMarshaller, layer)
+        direct_rate = run_marshaller(FeatureMarshaller, layer)
+        ratio = direct_rate / geojson_rate if geojson_rate else 0
+        print('{:<35} {:>15.0f} {:>15.0f} {:>7.2f}x'.format(source, geojson_rate, direct_rate, ratio))
+
+
+if __name__ == '__main__':
+    get_qgis_app()
+    run_benchmark()
@@ -0,0 +1,227 @@
+# coding=utf-8
+"""End to end pipeline benchmark.
+
+Runs representative scripts through JsAlgorithm over synthetic memory layers of
+points, lines and polygons, with varying feature counts, vertex counts and
+attribute widths. Results are saved as JSON, so that runs from different commits
+can be compared.
+
+Run through the benchmark suite entry point:
+
+    python -m processing_js.benchmark_suite
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import json
+import math
+import os
+import random
+import subprocess
+import time
+
+from qgis.core import (Qgis,
+                       QgsFeature,
+                       QgsGeometry,
+                       QgsPointXY,
+                       QgsProcessingContext,
+                       QgsProcessingFeedback,
+                       QgsProject,
+                       QgsVectorLayer)
+
+from processing_js.processing.algorithm import JsAlgorithm
+from processing_js.processing.utils import JsUtils
+
+SIZES = [10000, 100000, 1000000]
+
+# vertices per feature for each geometry type
+VERTEX_COUNTS = {
+    'point': [1],
+    'line': [10, 100],
+    'polygon': [10, 100],
+}
+
+ATTRIBUTE_COUNTS = [5, 50]
+
+# number of features added to memory layers per call
+GENERATE_CHUNK_SIZE = 10000
+
+IDENTITY_SCRIPT = """//#Identity=name
+function func(feature)
+{
+  return feature;
+}
+"""
+
+BATCH_SCRIPT = """//#Identity batch=name
+//#batch
+function funcBatch(features)
+{
+  return features;
+}
+"""
+
+
+def scripts() -> list:
+    """
+    Returns a list of (name, algorithm factory, extra parameters) for the benchmarked scripts
+    """
+    builtin = os.path.join(JsUtils.builtin_scripts_folder(), 'test.js')
+    return [
+        ('test.js', lambda: JsAlgorithm(builtin), {'new_road_name': 'renamed'}),
+        ('identity', lambda: JsAlgorithm(description_file=None, script=IDENTITY_SCRIPT), {}),
+        ('identity_batch', lambda: JsAlgorithm(description_file=None, script=BATCH_SCRIPT), {}),
+    ]
+
+
+class BenchmarkFeedback(QgsProcessingFeedback):
+    """
+    Feedback which discards messages, so that logging from scripts doesn't
+    accumulate during long runs
+    """
+
+    def pushInfo(self, info):  # pylint: disable=missing-docstring,unused-argument
+        pass
+
+    def pushDebugInfo(self, info):  # pylint: disable=missing-docstring,unused-argument
+        pass
+
+
+def create_geometry(rng: random.Random, geometry_type: str, vertices: int) -> QgsGeometry:
+    """
+    Creates a random geometry with approximately the specified number of vertices
+    """
+    x = rng.uniform(-170, 170)
+    y = rng.uniform(-80, 80)
+    if geometry_type == 'point':
+        return QgsGeometry.fromPointXY(QgsPointXY(x, y))
+    if geometry_type == 'line':
+        return QgsGeometry.fromPolylineXY([QgsPointXY(x + i * 0.001, y + rng.uniform(-0.001, 0.001))
+                                           for i in range(vertices)])
+    ring = [QgsPointXY(x + 0.01 * math.cos(2 * math.pi * i / vertices),
+                       y + 0.01 * math.sin(2 * math.pi * i / vertices))
+            for i in range(vertices)]
+    return QgsGeometry.fromPolygonXY([ring + [ring[0]]])
+
+
+def create_layer(geometry_type: str, size: int, vertices: int, attributes: int, seed: int = 1) -> QgsVectorLayer:
+    """
+    Creates a memory layer of random features. The first attribute is a ROAD_NAME string,
+    as used by the built-in test script, followed by alternating integer, double and string fields.
+    """
+    field_types = ['integer', 'double', 'string']
+    fields = ['field=ROAD_NAME:string'] + ['field=attr_{}:{}'.format(i, field_types[i % 3])
+                                           for i in range(attributes - 1)]
+    uri = '{}?crs=EPSG:4326&{}'.format({'point': 'Point', 'line': 'LineString', 'polygon': 'Polygon'}[geometry_type],
+                                       '&'.join(fields))
+    layer = QgsVectorLayer(uri, '{}_{}'.format(geometry_type, size), 'memory')
+
+    rng = random.Random(seed)
+    features = []
+    for i in range(size):
+        feature = QgsFeature(layer.fields())
+        values = ['road {}'.format(i)]
+        for a in range(attributes - 1):
+            values.append([i, rng.random(), 'value {}'.format(a)][a % 3])
+        feature.setAttributes(values)
+        feature.setGeometry(create_geometry(rng, geometry_type, vertices))
+        features.append(feature)
+        if len(features) >= GENERATE_CHUNK_SIZE:
+            layer.dataProvider().addFeatures(features)
+            features = []
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+def run_script(alg_factory, extra_parameters: dict, layer: QgsVectorLayer) -> dict:
+    """
+    Runs a script over a layer, returning the elapsed time and stage timings
+    """
+    alg = alg_factory()
+    alg.initAlgorithm()
+    context = QgsProcessingContext()
+    context.setProject(QgsProject.instance())
+    parameters = {'INPUT': layer, 'OUTPUT': 'memory:', 'TIMINGS': True}
+    parameters.update(extra_parameters)
+
+    start = time.perf_counter()
+    results, ok = alg.run(parameters, context, BenchmarkFeedback())
+    elapsed = time.perf_counter() - start
+    if not ok:
+        return {'error': True, 'elapsed': elapsed}
+
+    return {'elapsed': elapsed,
+            'features_per_second': layer.featureCount() / elapsed if elapsed > 0 else 0,
+            'stages': {key: value for key, value in results.items() if key.endswith('_TIME')}}
+
+
+def git_commit() -> str:
+    """
+    Returns the current git commit, if available
+    """
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.DEVNULL, universal_newlines=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes=None, output_file=None) -> dict:
+    """
+    Runs all scripts over all synthetic layers, printing a summary and saving the results as JSON
+    """
+    results = []
+    print('{:<28} {:<16} {:>12} {:>14}'.format('Layer', 'Script', 'Time (s)', 'Features/s'))
+    for size in sizes or SIZES:
+        for geometry_type, vertex_counts in VERTEX_COUNTS.items():
+            for vertices in vertex_counts:
+                for attributes in ATTRIBUTE_COUNTS:
+                    layer = create_layer(geometry_type, size, vertices, attributes)
+                    layer_name = '{}_{}_v{}_a{}'.format(geometry_type, size, vertices, attributes)
+                    for script_name, alg_factory, extra_parameters in scripts():
+                        res = run_script(alg_factory, extra_parameters, layer)
+                        res.update({'layer': layer_name,
+                                    'geometry_type': geometry_type,
+                                    'features': size,
+                                    'vertices': vertices,
+                                    'attributes': attributes,
+                                    'script': script_name})
+                        results.append(res)
+                        print('{:<28} {:<16} {:>12.2f} {:>14.0f}'.format(
+                            layer_name, script_name, res['elapsed'], res.get('features_per_second', 0)))
+                    del layer
+
+    report = {'commit': git_commit(),
+              'qgis_version': Qgis.QGIS_VERSION,
+              'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+              'results': results}
+    if output_file:
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        print('Results written to {}'.format(output_file))
+    return report
+
+
+def compare_results(baseline: dict, current: dict):
+    """
+    Prints the change in throughput between two sets of results
+    """
+    previous = {(r['layer'], r['script']): r for r in baseline['results']}
+    print('{:<28} {:<16} {:>14} {:>14} {:>8}'.format('Layer', 'Script', 'Baseline f/s', 'Current f/s', 'Change'))
+    for res in current['results']:
+        base = previous.get((res['layer'], res['script']))
+        if not base or not base.get('features_per_second') or 'features_per_second' not in res:
+            continue
+        change = res['features_per_second'] / base['features_per_second'] - 1
+        print('{:<28} {:<16} {:>14.0f} {:>14.0f} {:>+7.1f}%'.format(
+            res['layer'], res['script'], base['features_per_second'], res['features_per_second'], change * 100))
@@ -0,0 +1,68 @@
+# coding=utf-8
+"""Coordinate precision benchmark.
+
+Measures the GeoJSON payload size per feature and the throughput of both
+feature marshalling paths over the bundled lines.shp layer, at a range of
+coordinate precisions.
+
+Run with:
+
+    python -m processing_js.benchmarks.benchmark_precision
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+
+from qgis.core import QgsVectorLayer
+from qgis.PyQt.QtCore import QTextCodec
+
+from processing_js.processing.marshalling import (GeoJsonMarshaller,
+                                                 FeatureMarshaller)
+from processing_js.benchmarks.benchmark_marshalling import (run_marshaller,
+                                                            test_data_path)
+from processing_js.test.utilities import get_qgis_app
+
+PRECISIONS = [17, 6, 3]
+
+
+def bytes_per_feature(layer, precision):
+    """
+    Returns the average GeoJSON payload size for the features in a layer
+    """
+    marshaller = GeoJsonMarshaller(layer.fields(), layer.crs(), QTextCodec.codecForName("System"),
+                                   precision=precision)
+    sizes = [len(marshaller.feature_to_js(f).encode('utf-8')) for f in layer.getFeatures()]
+    return sum(sizes) / len(sizes) if sizes else 0
+
+
+def run_benchmark():
+    """
+    Runs the precision benchmark, printing a summary table
+    """
+    layer = QgsVectorLayer(os.path.join(test_data_path, 'lines.shp'), 'lines', 'ogr')
+    if not layer.isValid():
+        print('lines.shp could not be loaded')
+        return
+
+    print('{:<10} {:>15} {:>15} {:>15}'.format('Precision', 'Bytes/feature', 'GeoJSON (f/s)', 'Direct (f/s)'))
+    for precision in PRECISIONS:
+        print('{:<10} {:>15.1f} {:>15.0f} {:>15.0f}'.format(precision,
+                                                          bytes_per_feature(layer, precision),
+                                                          run_marshaller(GeoJsonMarshaller, layer, precision),
+                                                          run_marshaller(FeatureMarshaller, layer, precision)))
+
+
+if __name__ == '__main__':
+    get_qgis_app()
+    run_benchmark()
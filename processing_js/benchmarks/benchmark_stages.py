@@ -0,0 +1,184 @@
+# coding=utf-8
+"""Conversion stage microbenchmarks.
+
+Times each conversion step of a script call in isolation, over in-memory
+features of varying geometry sizes and attribute counts, so that changes to
+the marshalling layer can be evaluated without noise from provider I/O.
+
+For the GeoJSON path the stages are exportFeature, QJSValue.call, res.toString
+and QgsJsonUtils.stringToFeatureList. For the direct path they are
+feature_to_js, QJSValue.call and features_from_js.
+
+Run with:
+
+    python -m processing_js.benchmarks.benchmark_stages [--save baseline.json] [--baseline baseline.json]
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import argparse
+import json
+import time
+
+from qgis.core import (QgsCoordinateTransformContext,
+                       QgsJsonUtils)
+from qgis.PyQt.QtCore import QTextCodec
+from PyQt5.QtQml import QJSEngine
+
+from processing_js.benchmarks.benchmark_pipeline import create_layer, git_commit
+from processing_js.processing.marshalling import (GeoJsonMarshaller,
+                                                 FeatureMarshaller)
+from processing_js.test.utilities import get_qgis_app
+
+# (geometry type, vertices per feature)
+GEOMETRIES = [
+    ('point', 1),
+    ('line', 10),
+    ('line', 100),
+    ('line', 1000),
+    ('polygon', 10),
+    ('polygon', 100),
+    ('polygon', 1000),
+]
+
+ATTRIBUTE_COUNTS = [1, 10, 50]
+
+# number of features timed per case
+FEATURE_COUNT = 2000
+
+# each stage is timed this many times, and the fastest run is reported
+REPEATS = 3
+
+SCRIPT = """
+function func(feature)
+{
+  return feature;
+}
+"""
+
+
+def time_stage(function, values) -> tuple:
+    """
+    Calls function for each value, returning the list of results and the fastest
+    time per call in microseconds over REPEATS runs
+    """
+    best = None
+    results = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        results = [function(v) for v in values]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best * 1e6 / max(1, len(values))
+
+
+def benchmark_geojson(layer, features) -> dict:
+    """
+    Times the stages of the GeoJSON conversion path
+    """
+    engine = QJSEngine()
+    engine.evaluate(GeoJsonMarshaller.JS_WRAPPER + SCRIPT)
+    process = engine.globalObject().property('process')
+    codec = QTextCodec.codecForName("System")
+    marshaller = GeoJsonMarshaller(layer.fields(), layer.crs(), codec)
+
+    exported, export_time = time_stage(marshaller.feature_to_js, features)
+    called, call_time = time_stage(lambda v: process.call([v]), exported)
+    strings, string_time = time_stage(lambda v: v.toString(), called)
+    _, import_time = time_stage(lambda v: QgsJsonUtils.stringToFeatureList(v, layer.fields(), codec), strings)
+    return {'geojson_export': export_time,
+            'geojson_call': call_time,
+            'geojson_to_string': string_time,
+            'geojson_string_to_features': import_time}
+
+
+def benchmark_direct(layer, features) -> dict:
+    """
+    Times the stages of the direct QJSValue conversion path
+    """
+    engine = QJSEngine()
+    engine.evaluate(FeatureMarshaller.JS_WRAPPER + SCRIPT)
+    process = engine.globalObject().property('process')
+    marshaller = FeatureMarshaller(engine, layer.fields(), layer.crs(), QgsCoordinateTransformContext(),
+                                   lazy=False)
+
+    exported, export_time = time_stage(marshaller.feature_to_js, features)
+    called, call_time = time_stage(lambda v: process.call([v]), exported)
+    _, import_time = time_stage(marshaller.features_from_js, called)
+    return {'direct_export': export_time,
+            'direct_call': call_time,
+            'direct_import': import_time}
+
+
+def run_benchmark() -> dict:
+    """
+    Runs every stage over every combination of geometry size and attribute count,
+    returning the per feature timings in microseconds
+    """
+    cases = []
+    for geometry_type, vertices in GEOMETRIES:
+        for attributes in ATTRIBUTE_COUNTS:
+            layer = create_layer(geometry_type, FEATURE_COUNT, vertices, attributes)
+            features = list(layer.getFeatures())
+            stages = benchmark_geojson(layer, features)
+            stages.update(benchmark_direct(layer, features))
+            cases.append({'case': '{}_v{}_a{}'.format(geometry_type, vertices, attributes),
+                          'geometry_type': geometry_type,
+                          'vertices': vertices,
+                          'attributes': attributes,
+                          'stages': stages})
+    return {'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'cases': cases}
+
+
+def print_table(results: dict, baseline: dict = None):
+    """
+    Prints the per feature stage timings, with the change relative to a baseline
+    if specified
+    """
+    previous = {c['case']: c['stages'] for c in baseline['cases']} if baseline else {}
+    if baseline:
+        print('Baseline: {} ({})'.format(baseline.get('commit'), baseline.get('timestamp')))
+        print('{:<20} {:<28} {:>12} {:>12} {:>8}'.format('Case', 'Stage', 'Base (us)', 'Time (us)', 'Change'))
+    else:
+        print('{:<20} {:<28} {:>12}'.format('Case', 'Stage', 'Time (us)'))
+
+    for case in results['cases']:
+        for stage, value in case['stages'].items():
+            base = previous.get(case['case'], {}).get(stage)
+            if base:
+                print('{:<20} {:<28} {:>12.2f} {:>12.2f} {:>+7.1f}%'.format(
+                    case['case'], stage, base, value, (value / base - 1) * 100))
+            elif baseline:
+                print('{:<20} {:<28} {:>12} {:>12.2f}'.format(case['case'], stage, '-', value))
+            else:
+                print('{:<20} {:<28} {:>12.2f}'.format(case['case'], stage, value))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Conversion stage microbenchmarks')
+    parser.add_argument('--save', help='save the results to a JSON file, e.g. to use as a baseline')
+    parser.add_argument('--baseline', help='compare against results previously saved with --save')
+    args = parser.parse_args()
+
+    get_qgis_app()
+    current = run_benchmark()
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(current, f, indent=2)
+    baseline_results = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline_results = json.load(f)
+    print_table(current, baseline_results)
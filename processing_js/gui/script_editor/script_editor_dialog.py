@@ -50,7 +50,7 @@ from processing.gui.AlgorithmDialog import AlgorithmDialog
 from processing.script import ScriptUtils
 
 from processing_js.processing.utils import JsUtils
-from processing_js.processing.algorithm import JsAlgorithm
+from processing_js.processing.algorithm import create_algorithm
 from processing_js.gui.gui_utils import GuiUtils
 
 pluginPath = os.path.split(os.path.dirname(__file__))[0]
@@ -225,8 +225,7 @@ class ScriptEditorDialog(BASE, WIDGET):
                 return
 
             self.setHasChanged(False)
-
-        QgsApplication.processingRegistry().providerById("r").refreshAlgorithms()
+            QgsApplication.processingRegistry().providerById("js").update_scripts([self.filePath])
 
     def setHasChanged(self, hasChanged):
         self.hasChanged = hasChanged
@@ -234,7 +233,7 @@ class ScriptEditorDialog(BASE, WIDGET):
         self.update_dialog_title()
 
     def runAlgorithm(self):
-        alg = JsAlgorithm(description_file=None, script=self.editor.text())
+        alg = create_algorithm(description_file=None, script=self.editor.text())
         if alg.error is not None:
             error = QgsError(alg.error, "R")
             QgsErrorDialog.show(error,
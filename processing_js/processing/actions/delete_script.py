@@ -60,7 +60,7 @@ class DeleteScriptAction(ContextAction):
             file_path = self.itemData.description_file
             if file_path is not None:
                 os.remove(file_path)
-                QgsApplication.processingRegistry().providerById("js").refreshAlgorithms()
+                QgsApplication.processingRegistry().providerById("js").update_scripts([file_path])
             else:
                 QMessageBox.warning(None,
                                     self.tr("Delete Script"),
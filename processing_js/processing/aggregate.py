@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    aggregate.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import html
+import json
+
+from qgis.core import (QgsProcessing,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingOutputDefinition,
+                       QgsProcessingParameterFeatureSource)
+
+from processing_js.processing.engine import AggregateRunner
+from processing_js.processing.exceptions import InvalidScriptException
+from processing_js.processing.marshalling import FeatureMarshaller, FlatGeometryMarshaller
+from processing_js.processing.outputs import create_output_from_token
+from processing_js.processing.parallel import (ParallelScriptExecutor,
+                                               DEFAULT_CHUNK_SIZE,
+                                               chunked)
+from processing_js.processing.script import JsScriptMixin
+
+
+class JsAggregateAlgorithm(JsScriptMixin, QgsProcessingAlgorithm):
+    """
+    Javascript algorithm which reduces the features of a layer to a single summary value.
+
+    Scripts declare //#aggregate (or //#aggregate:number|string|html) and define
+    map(feature), returning a value for the feature (or undefined to skip it), and
+    reduce(accumulator, value). They may also define initial(), returning the starting
+    accumulator, combine(a, b) for merging accumulators from different chunks (reduce
+    is used if not defined) and finalize(accumulator).
+
+    Features are reduced in chunks, so the reduction can be split between threads.
+    Accumulators must be plain data (numbers, strings, arrays and objects), and the
+    initial accumulator must not change the result when combined.
+    """
+
+    RESULT = 'RESULT'
+
+    RESULT_NUMBER = 'number'
+    RESULT_STRING = 'string'
+    RESULT_HTML = 'html'
+    RESULT_TYPES = (RESULT_NUMBER, RESULT_STRING, RESULT_HTML)
+
+    AGGREGATE_JS = """
+        function _aggregateChunk(features)
+        {
+          var partial = {"empty": true, "value": null};
+          if ( typeof initial === 'function' )
+            partial = {"empty": false, "value": initial()};
+          for ( var i = 0; i < features.length; i++ )
+          {
+            var value = map(features[i]);
+            if ( value === undefined )
+              continue;
+            partial = partial.empty ? {"empty": false, "value": value}
+                                    : {"empty": false, "value": reduce(partial.value, value)};
+          }
+          return partial;
+        }
+
+        function _aggregateCombine(a, b)
+        {
+          if ( b.empty )
+            return a;
+          if ( a.empty )
+            return b;
+          return {"empty": false, "value": (typeof combine === 'function' ? combine : reduce)(a.value, b.value)};
+        }
+
+        function _aggregateResult(partial)
+        {
+          var value = partial.empty ? null : partial.value;
+          return typeof finalize === 'function' ? finalize(value) : value;
+        }
+        """
+
+    def initAlgorithm(self, config=None):
+        """
+        Initializes the algorithm's input and result, and the advanced parameters for
+        aggregate scripts. Aggregates are not split between worker processes.
+        """
+        self.addParameter(QgsProcessingParameterFeatureSource('INPUT', self.tr('Input layer'),
+                                                              [QgsProcessing.TypeVector]))
+        result = create_output_from_token(self.RESULT, self.tr('Result'), self.aggregate_type)
+        if isinstance(result, QgsProcessingOutputDefinition):
+            self.addOutput(result)
+        else:
+            self.addParameter(result)
+        self.init_execution_parameters()
+
+    def set_aggregate_type(self, argument):
+        """
+        Handles the //#aggregate directive, with an optional result type
+        """
+        result_type = argument.lower().strip() or self.RESULT_NUMBER
+        if result_type not in self.RESULT_TYPES:
+            raise InvalidScriptException(self.tr('Unknown aggregate result type: {}').format(argument))
+        self.aggregate_type = result_type
+
+    def marshaller_class(self):
+        """
+        Returns the class used to convert features to script values. GeoJSON strings
+        are not supported for aggregates.
+        """
+        if self.geometry_encoding == self.GEOMETRY_ENCODING_FLAT:
+            return FlatGeometryMarshaller
+        return FeatureMarshaller
+
+    def script_wrapper(self) -> str:
+        return super().script_wrapper() + self.AGGREGATE_JS
+
+    def create_runner(self, feedback, pool=None) -> AggregateRunner:
+        """
+        Creates a new aggregate runner for the prepared script
+        """
+        return AggregateRunner(self.script_source, feedback, self.batch_mode, self.create_marshaller,
+                               parameters=self.script_parameters, pool=pool,
+                               globals_factory=self.create_global_objects,
+                               buffer_feedback=not self.raw_feedback)
+
+    def prepareAlgorithm(self, parameters, context, feedback):
+        """
+        Prepares the algorithm
+        """
+        self.prepare_script(parameters, context, feedback)
+
+        source = self.parameterAsSource(parameters, 'INPUT', context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, 'INPUT'))
+        self.prepare_source(source, context, feedback)
+        self.prepare_execution(parameters, context)
+
+        self.prepare_runner(parameters, context, feedback)
+        return True
+
+    def run_script(self, parameters, context, feedback):
+        """
+        Reduces every feature from the input source, then combines the partial results
+        from each chunk of features
+        """
+        source = self.parameterAsSource(parameters, 'INPUT', context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, 'INPUT'))
+
+        count = source.featureCount()
+        step = 100.0 / count if count > 0 else 1
+        features = source.getFeatures(self.request())
+        chunk_size = self.batch_size if self.batch_size > 0 else DEFAULT_CHUNK_SIZE
+        partials = []
+        processed = [0]
+
+        def handle_results(results, input_count):
+            partials.extend(results)
+            processed[0] += input_count
+            feedback.setProgress(processed[0] * step)
+
+        if self.thread_count > 1:
+            feedback.pushInfo(self.tr('Processing features using {} threads').format(self.thread_count))
+            executor = ParallelScriptExecutor(self.thread_count, self.create_runner,
+                                              ordered=self.preserve_order)
+            executor.run(chunked(features, chunk_size), feedback, handle_results)
+        else:
+            for chunk in chunked(features, chunk_size):
+                if feedback.isCanceled():
+                    break
+                handle_results(self.runner.process_features(chunk), len(chunk))
+
+        if feedback.isCanceled():
+            return {}
+
+        return {self.RESULT: self.result_to_output(self.runner.reduce_partials(partials), parameters, context)}
+
+    def result_to_output(self, result, parameters, context):
+        """
+        Converts the reduced value to the algorithm's result output
+        """
+        if self.aggregate_type == self.RESULT_NUMBER:
+            try:
+                return float(result)
+            except (TypeError, ValueError):
+                return None
+
+        if not isinstance(result, str):
+            result = json.dumps(result, indent=2, default=str)
+        if self.aggregate_type == self.RESULT_STRING:
+            return result
+
+        path = self.parameterAsFileOutput(parameters, self.RESULT, context)
+        with open(path, 'w') as f:
+            if not result.lstrip().startswith('<'):
+                result = '<pre>{}</pre>'.format(html.escape(result))
+            f.write(result)
+        return path
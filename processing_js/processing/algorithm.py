@@ -18,325 +18,547 @@
 """
 
 import os
+import hashlib
 import json
+import tempfile
 
 
-from qgis.core import (QgsProcessing,
-                       QgsProviderRegistry,
-                       QgsProcessingFeatureBasedAlgorithm,
+from qgis.core import (QgsProcessingFeatureBasedAlgorithm,
+                       QgsProcessingContext,
                        QgsProcessingException,
+                       QgsProcessingOutputLayerDefinition,
                        QgsProcessingParameterRasterLayer,
                        QgsProcessingParameterVectorLayer,
-                       QgsProcessingParameterExtent,
-                       QgsProcessingParameterCrs,
-                       QgsProcessingParameterField,
-                       QgsProcessingParameterString,
-                       QgsProcessingParameterFile,
                        QgsProcessingParameterNumber,
                        QgsProcessingParameterEnum,
                        QgsProcessingParameterBoolean,
                        QgsProcessingParameterMultipleLayers,
-                       QgsProcessingParameterRasterDestination,
-                       QgsProcessingParameterVectorDestination,
-                       QgsProcessingParameterFileDestination,
-                       QgsProcessingOutputDefinition,
+                       QgsProcessingParameterMapLayer,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingOutputNumber,
+                       QgsProcessingParameterDefinition,
                        QgsCoordinateReferenceSystem,
-                       QgsJsonExporter,
-                       QgsJsonUtils,
+                       QgsFeatureSink,
+                       QgsFeatureRequest,
+                       QgsRectangle,
+                       QgsVectorFileWriter,
+                       QgsVectorLayer,
                        QgsProcessingUtils)
-from qgis.PyQt.QtCore import QCoreApplication, QDir, QTextCodec
-from PyQt5.QtQml import QJSEngine, QQmlEngine
 
-from processing.core.parameters import getParameterFromString
-from processing_js.processing.outputs import create_output_from_string
+from processing_js.processing.aggregate import JsAggregateAlgorithm
+from processing_js.processing.cache import LruCache
+from processing_js.processing.engine import ScriptRunner
+from processing_js.processing.incremental import (IncrementalState,
+                                                  feature_hash,
+                                                  state_path)
+from processing_js.processing.raster import JsRasterAlgorithm
+from processing_js.processing.script import JsScriptMixin
+from processing_js.processing.timing import StageTimings, TimedSink
+from processing_js.processing.parallel import (ParallelScriptExecutor,
+                                               DEFAULT_CHUNK_SIZE,
+                                               chunked)
+from processing_js.processing.sharding import (ShardedScriptExecutor,
+                                               split_evenly,
+                                               split_extent)
 from processing_js.processing.utils import JsUtils
-from processing_js.gui.gui_utils import GuiUtils
 
 
-class JsAlgorithm(QgsProcessingFeatureBasedAlgorithm):  # pylint: disable=too-many-public-methods
+class JsAlgorithm(JsScriptMixin, QgsProcessingFeatureBasedAlgorithm):
     """
     Javascript Algorithm
     """
 
-    def __init__(self, description_file, script=None):
-        super().__init__()
+    PROCESSES = 'PROCESSES'
+    SHARD_METHOD = 'SHARD_METHOD'
+    INCREMENTAL = 'INCREMENTAL'
+    TIMINGS = 'TIMINGS'
+
+    SHARD_BY_FEATURE_ID = 0
+    SHARD_BY_EXTENT = 1
+
+    def __init__(self, description_file, script=None, metadata=None):
+        super().__init__(description_file, script=script, metadata=metadata)
+        self.timings = None
+        self.process_count = 1
+        self.shard_method = self.SHARD_BY_FEATURE_ID
+        self.incremental = False
+        self.shard_fids = None
+        self.shard_extent = None
+        self.shard_null_geometries = False
+
+    def initParameters(self, config=None):
+        """
+        Adds the advanced parameters shared by all scripts
+        """
+        self.init_execution_parameters()
+        self.init_sharding_parameters()
+
+        incremental = QgsProcessingParameterBoolean(self.INCREMENTAL,
+                                                    self.tr('Only process new and changed features '
+                                                            '(incremental update of an existing output file)'),
+                                                    defaultValue=False)
+        incremental.setFlags(incremental.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(incremental)
+
+        timings = QgsProcessingParameterBoolean(self.TIMINGS,
+                                                self.tr('Report timings for each processing stage'),
+                                                defaultValue=False)
+        timings.setFlags(timings.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(timings)
+        self.addOutput(QgsProcessingOutputNumber('FEATURES_PER_SECOND', self.tr('Features per second')))
+        self.addOutput(QgsProcessingOutputNumber('TOTAL_TIME', self.tr('Total time (seconds)')))
+        for stage in StageTimings.STAGES:
+            self.addOutput(QgsProcessingOutputNumber('{}_TIME'.format(stage.upper()),
+                                                     self.tr('Time spent in {} stage (seconds)').format(stage)))
+
+    def init_sharding_parameters(self):
+        """
+        Adds the advanced parameters controlling execution in worker processes
+        """
+        processes = QgsProcessingParameterNumber(self.PROCESSES,
+                                                 self.tr('Number of worker processes (defaults to provider setting)'),
+                                                 QgsProcessingParameterNumber.Integer,
+                                                 optional=True, minValue=1)
+        processes.setFlags(processes.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(processes)
+
+        shard_method = QgsProcessingParameterEnum(self.SHARD_METHOD,
+                                                  self.tr('Split input between worker processes by'),
+                                                  options=[self.tr('Feature ID ranges'), self.tr('Extent')],
+                                                  defaultValue=self.SHARD_BY_FEATURE_ID)
+        shard_method.setFlags(shard_method.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(shard_method)
+
+    def internal_parameter_names(self):
+        return super().internal_parameter_names() + [self.PROCESSES, self.SHARD_METHOD,
+                                                     self.INCREMENTAL, self.TIMINGS]
 
-        self.script = script
-        self.js_script = ''
-        self.codec = None
-        self.engine = None
-        self.process_js_function = None
-        self.json_exporter = None
-        self.fields = None
-        self._name = ''
-        self._display_name = ''
-        self._group = ''
-        self.description_file = os.path.realpath(description_file) if description_file else None
-        self.error = None
-        self.commands = list()
-        self.is_user_script = False
-        if description_file:
-            self.is_user_script = not description_file.startswith(JsUtils.builtin_scripts_folder())
-
-        if self.script is not None:
-            self.load_from_string()
-        if self.description_file is not None:
-            self.load_from_file()
+    def outputFields(self, fields):
+        return self.select_fields(fields)
 
-    def createInstance(self):
+    def filter_request(self, request):
         """
-        Returns a new instance of this algorithm
+        Restricts a feature request to the features matching the script's filter
+        expression, and to the shard handled by this worker process
         """
-        if self.description_file is not None:
-            return JsAlgorithm(self.description_file)
-
-        return JsAlgorithm(description_file=None, script=self.script)
+        # feature id shards only contain features which already match the filter expression
+        if self.shard_fids is not None:
+            request.setFilterFids(self.shard_fids)
+            return
 
-    def icon(self):
-        """
-        Returns the algorithm's icon
-        """
-        return GuiUtils.get_icon("providerJS.svg")
+        super().filter_request(request)
+        if self.shard_extent is not None:
+            x_min, y_min, x_max, y_max, last = self.shard_extent
+            # features spanning several strips are only handled by the strip containing their center
+            expression = ('(x_min($geometry) + x_max($geometry)) / 2 >= {} AND '
+                          '(x_min($geometry) + x_max($geometry)) / 2 {} {}').format(
+                              repr(x_min), '<=' if last else '<', repr(x_max))
+            if self.shard_null_geometries:
+                # a filter rect would exclude features without geometry
+                request.combineFilterExpression('({}) OR $geometry IS NULL'.format(expression))
+            else:
+                request.setFilterRect(QgsRectangle(x_min, y_min, x_max, y_max))
+                request.combineFilterExpression(expression)
 
-    def svgIconPath(self):
-        """
-        Returns a path to the algorithm's icon as a SVG file
-        """
-        return GuiUtils.get_icon_svg("providerJS.svg")
+    def outputCrs(self, inputCrs):
+        self.input_crs = inputCrs
+        return QgsCoordinateReferenceSystem('EPSG:4326')
 
-    def name(self):
+    def prepareAlgorithm(self, parameters, context, feedback):
         """
-        Internal unique id for algorithm
+        Prepares the algorithm
         """
-        return self._name
+        self.prepare_script(parameters, context, feedback)
+
+        source = self.parameterAsSource(parameters, 'INPUT', context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, 'INPUT'))
+        self.prepare_source(source, context, feedback)
+        self.prepare_execution(parameters, context)
+
+        self.process_count = JsUtils.process_count() if self.parameterDefinition(self.PROCESSES) else 1
+        if parameters.get(self.PROCESSES) is not None:
+            self.process_count = self.parameterAsInt(parameters, self.PROCESSES, context)
+        self.shard_method = self.parameterAsEnum(parameters, self.SHARD_METHOD, context)
+        self.incremental = self.parameterAsBool(parameters, self.INCREMENTAL, context)
+        self.timings = StageTimings() if self.parameterAsBool(parameters, self.TIMINGS, context) else None
+        if self.timings is not None and (self.incremental or self.process_count > 1):
+            feedback.reportError(self.tr('Stage timings are not collected for incremental runs '
+                                         'or runs in worker processes'))
+            self.timings = None
+
+        # results of pure scripts are memoised for identical features, shared by all threads
+        self.memo = None
+        if self.pure:
+            if self.batch_mode:
+                feedback.reportError(self.tr('Results of batched scripts can not be reused, ignoring //#pure'))
+            else:
+                self.memo = LruCache(JsUtils.memo_size())
 
-    def displayName(self):
-        """
-        User friendly display name
-        """
-        return self._display_name
+        self.prepare_runner(parameters, context, feedback)
+        return True
 
-    def shortDescription(self):
+    def create_runner(self, feedback, pool=None) -> ScriptRunner:
         """
-        Returns the path to the script file, for use in toolbox tooltips
+        Creates a new script runner for the prepared script, reusing an engine
+        from the pool if possible
         """
-        return self.description_file
+        return ScriptRunner(self.script_source, feedback, self.batch_mode, self.create_marshaller,
+                            parameters=self.script_parameters, pool=pool,
+                            globals_factory=self.create_global_objects,
+                            memo=self.memo, timings=self.timings,
+                            buffer_feedback=not self.raw_feedback)
 
-    def group(self):
+    def supportInPlaceEdit(self, layer):
         """
-        Returns the algorithm's group
+        In-place editing runs single features through processFeature, which batched
+        scripts don't support
         """
-        return self._group
+        if self.batch_mode:
+            return False
+        return super().supportInPlaceEdit(layer)
 
-    def groupId(self):
-        """
-        Returns the algorithm's group ID
-        """
-        return self._group
+    def outputName(self):
+        return 'Processed'
 
-    def load_from_string(self):
-        """
-        Load the algorithm from a string
-        """
-        lines = self.script.split('\n')
-        self._name = 'unnamedalgorithm'
-        self._display_name = self.tr('[Unnamed algorithm]')
-        self.parse_script(iter(lines))
+    def run_script(self, parameters, context, feedback):
+        """
+        Runs the script over every feature from the input source, either one feature
+        at a time or in batches of features when the script is in batch mode
+        """
+        source = self.parameterAsSource(parameters, 'INPUT', context)
+        if source is None:
+            raise QgsProcessingException(self.invalidSourceError(parameters, 'INPUT'))
+
+        if self.incremental:
+            destination = self.incremental_destination(parameters, context, feedback)
+            if destination:
+                return self.process_incremental(destination, parameters, source, context, feedback)
+
+        (sink, dest_id) = self.parameterAsSink(parameters, 'OUTPUT', context,
+                                               self.outputFields(source.fields()),
+                                               self.outputWkbType(source.wkbType()),
+                                               self.outputCrs(source.sourceCrs()),
+                                               self.sinkFlags())
+        if sink is None:
+            raise QgsProcessingException(self.invalidSinkError(parameters, 'OUTPUT'))
+
+        if self.process_count > 1:
+            self.process_sharded(parameters, sink, context, feedback)
+            return {'OUTPUT': dest_id}
+
+        count = len(self.shard_fids) if self.shard_fids is not None else source.featureCount()
+        step = 100.0 / count if count > 0 else 1
+        features = source.getFeatures(self.request(), self.sourceFlags())
+        if self.timings is not None:
+            # only wrapped when timing, so there's no overhead otherwise
+            features = self.timings.iterate(features)
+            sink = TimedSink(sink, self.timings)
+
+        if self.thread_count > 1:
+            self.process_parallel(features, sink, feedback, step)
+        else:
+            self.process_sequential(features, sink, context, feedback, step)
 
-    def load_from_file(self):
-        """
-        Load the algorithm from a file
-        """
-        filename = os.path.basename(self.description_file)
-        self._display_name = self._name
-        self._name = filename[:filename.rfind('.')]
-        self._display_name = self._name.replace('_', ' ')
-        with open(self.description_file, 'r') as f:
-            lines = [line.strip() for line in f]
-        self.parse_script(iter(lines))
+        results = {'OUTPUT': dest_id}
+        if self.timings is not None:
+            self.timings.finish()
+            feedback.pushInfo(self.tr('Stage timings:'))
+            for line in self.timings.table():
+                feedback.pushInfo(line)
+            results.update(self.timings.outputs())
+        return results
 
-    def parse_script(self, lines):
+    def process_sequential(self, features, sink, context, feedback, step):  # pylint: disable=too-many-arguments
         """
-        Parse the lines from an JS script, initializing parameters and outputs as encountered
+        Runs the script over features in the current thread
         """
-        self.script = ''
-        js_script_lines = list()
-        self.error = None
-        ender = 0
-        line = next(lines).strip('\n').strip('\r')
-        while ender < 10:
-            if line.startswith('//#'):
-                try:
-                    self.process_metadata_line(line)
-                except Exception:  # pylint: disable=broad-except
-                    self.error = self.tr('This script has a syntax error.\n'
-                                         'Problem with line: {0}').format(line)
-            else:
-                if line == '':
-                    ender += 1
-                else:
-                    ender = 0
-                js_script_lines.append(line)
-            self.script += line + '\n'
-            try:
-                line = next(lines).strip('\n').strip('\r')
-            except StopIteration:
+        batch = []
+        for current, feature in enumerate(features):
+            if feedback.isCanceled():
                 break
-        self.js_script = '\n'.join(js_script_lines)
 
-    def process_metadata_line(self, line):
-        """
-        Processes a "metadata" (##) line
-        """
-        line = line.replace('//#', '')
+            if self.batch_size > 0:
+                batch.append(feature)
+                if len(batch) >= self.batch_size:
+                    sink.addFeatures(self.processBatch(batch, context, feedback), QgsFeatureSink.FastInsert)
+                    batch = []
+            else:
+                sink.addFeatures(self.processFeature(feature, context, feedback), QgsFeatureSink.FastInsert)
 
-        # special commands
-        #if line.lower().strip().startswith('dontuserasterpackage'):
-        #    self.use_raster_package = False
-        #    return
+            feedback.setProgress(current * step)
 
-        value, type_ = self.split_tokens(line)
-        if type_.lower().strip() == 'group':
-            self._group = value
-            return
-        if type_.lower().strip() == 'name':
-            self._name = self._display_name = value
-            self._name = JsUtils.strip_special_characters(self._name.lower())
-            return
-
-        self.process_parameter_line(line)
+        if batch and not feedback.isCanceled():
+            sink.addFeatures(self.processBatch(batch, context, feedback), QgsFeatureSink.FastInsert)
 
-    @staticmethod
-    def split_tokens(line):
+    def process_parallel(self, features, sink, feedback, step):
         """
-        Attempts to split a line into tokens
+        Runs the script over features using a pool of worker threads, each with its own engine
         """
-        tokens = line.split('=')
-        return tokens[0], tokens[1]
+        feedback.pushInfo(self.tr('Processing features using {} threads').format(self.thread_count))
+        processed = [0]
+
+        def handle_results(output_features, input_count):
+            sink.addFeatures(output_features, QgsFeatureSink.FastInsert)
+            processed[0] += input_count
+            feedback.setProgress(processed[0] * step)
 
-    def process_parameter_line(self, line):
+        chunk_size = self.batch_size if self.batch_size > 0 else DEFAULT_CHUNK_SIZE
+        executor = ParallelScriptExecutor(self.thread_count, self.create_runner,
+                                          ordered=self.preserve_order)
+        executor.run(chunked(features, chunk_size), feedback, handle_results)
+
+    def process_sharded(self, parameters, sink, context, feedback):  # pylint: disable=too-many-locals
         """
-        Processes a single script line representing a parameter
+        Splits the input into shards, runs each shard in a separate worker process
+        and merges the partial outputs into the sink
         """
-        value, _ = self.split_tokens(line)
-        description = JsUtils.create_descriptive_name(value)
+        source_path = self.parameterAsCompatibleSourceLayerPath(parameters, 'INPUT', context,
+                                                                QgsVectorFileWriter.supportedFormatExtensions(),
+                                                                'gpkg', feedback)
+        layer = QgsVectorLayer(source_path, 'input', 'ogr')
+        if not layer.isValid():
+            raise QgsProcessingException(self.tr('Could not open {} for sharding').format(source_path))
 
-        output = create_output_from_string(line)
-        if output is not None:
-            output.setName(value)
-            output.setDescription(description)
-            if issubclass(output.__class__, QgsProcessingOutputDefinition):
-                self.addOutput(output)
-            else:
-                # destination type parameter
-                self.addParameter(output)
+        # scripts which don't use geometries are always sharded by feature id
+        if self.shard_method == self.SHARD_BY_EXTENT and self.uses_geometry:
+            extent = layer.extent()
+            # features without geometry can't be assigned to a strip, so are handled by the first strip
+            shards = [{'extent': [start, extent.yMinimum(), end, extent.yMaximum(), i == self.process_count - 1],
+                       'null_geometries': i == 0}
+                      for i, (start, end) in enumerate(split_extent(extent.xMinimum(), extent.xMaximum(),
+                                                                    self.process_count))]
         else:
-            line = JsUtils.upgrade_parameter_line(line)
-            param = getParameterFromString(line)
-            if param is not None:
-                self.addParameter(param)
-            else:
-                self.error = self.tr('This script has a syntax error.\n'
-                                     'Problem with line: {0}').format(line)
-
-    def outputFields(self, fields):
-        self.fields = fields
-        return self.fields
+            request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry).setSubsetOfAttributes([])
+            if self.filter_expression:
+                request.setFilterExpression(self.filter_expression)
+            fids = sorted(f.id() for f in layer.getFeatures(request))
+            shards = [{'fids': shard_fids} for shard_fids in split_evenly(fids, self.process_count)]
+        del layer
+
+        script_parameters = self.shard_parameters(parameters, context)
+        script_parameters['INPUT'] = source_path
+        script_parameters[self.PROCESSES] = 1
+        script_parameters[self.THREADS] = self.thread_count
+        script_parameters[self.PRESERVE_ORDER] = self.preserve_order
+        if self.run_precision is not None:
+            script_parameters[self.PRECISION] = self.run_precision
+
+        spec_folder = tempfile.mkdtemp(dir=QgsProcessingUtils.tempFolder())
+        specs = []
+        for index, shard in enumerate(shards):
+            shard_parameters = dict(script_parameters)
+            shard_parameters['OUTPUT'] = os.path.join(spec_folder, 'shard_{}.gpkg'.format(index))
+            shard.update({'script_file': self.description_file,
+                          'script': self.script if self.description_file is None else None,
+                          'parameters': shard_parameters,
+                          'settings': {JsUtils.BATCH_SIZE: JsUtils.batch_size(),
+                                       JsUtils.MEMO_SIZE: JsUtils.memo_size()}})
+            specs.append(shard)
+
+        feedback.pushInfo(self.tr('Processing features using {} worker processes').format(len(specs)))
+        ShardedScriptExecutor(JsUtils.python_executable()).run(specs, spec_folder, feedback)
+        if feedback.isCanceled():
+            return
 
-    def outputCrs(self, inputCrs):
-        self.input_crs = inputCrs
-        return QgsCoordinateReferenceSystem('EPSG:4326')
+        # shards are merged in order, so feature id sharding preserves the input order
+        for spec in specs:
+            output = QgsVectorLayer(spec['parameters']['OUTPUT'], 'shard', 'ogr')
+            sink.addFeatures(self.remap_features(output.getFeatures(), output.fields(), self.fields),
+                             QgsFeatureSink.FastInsert)
 
-    def prepareAlgorithm(self, parameters, context, feedback):
-        """
-        Prepares the algorithm
-        """
-        self.engine = QJSEngine()
-        js_feedback = self.engine.newQObject(feedback)
-        QQmlEngine.setObjectOwnership(feedback, QQmlEngine.CppOwnership)
-        self.engine.globalObject().setProperty("feedback", js_feedback)
-        js = """
-        function process(feature)
-        {
-          res = func(JSON.parse(feature))
-          if ( res && res.stack && res.message )
-            return res;
-         return JSON.stringify(res);
-        }
-        """
+    @staticmethod
+    def remap_features(features, source_fields, target_fields) -> list:
+        """
+        Returns features with their attributes moved from source_fields to the matching
+        target_fields, by field name. Attributes for missing fields are set to NULL.
+        """
+        indices = [source_fields.lookupField(name) for name in target_fields.names()]
+        res = []
+        for feature in features:
+            attributes = feature.attributes()
+            feature.setFields(target_fields, False)
+            feature.setAttributes([attributes[i] if i >= 0 else None for i in indices])
+            res.append(feature)
+        return res
+
+    def incremental_destination(self, parameters, context, feedback):
+        """
+        Returns the file path of the destination for an incremental run, or None if
+        the run can't be incremental.
+
+        Outputs are tracked by their feature ids, so only GeoPackage destinations are supported,
+        as other formats (e.g. Shapefiles) may renumber features when they are edited.
+        """
+        if self.batch_mode:
+            feedback.reportError(self.tr('Incremental runs are not supported for batched scripts, '
+                                         'processing all features'))
+            return None
+
+        destination = self.parameterAsOutputLayer(parameters, 'OUTPUT', context)
+        path = destination.split('|')[0] if destination else ''
+        if not path or path.startswith('memory:') or not os.path.isdir(os.path.dirname(path) or '.'):
+            feedback.reportError(self.tr('Incremental runs require a file destination, processing all features'))
+            return None
+        if os.path.splitext(path)[1].lower() != '.gpkg':
+            feedback.reportError(self.tr('Incremental runs require a GeoPackage destination, processing all features'))
+            return None
+        return path
+
+    def load_output_on_completion(self, parameters, destination, context):
+        """
+        Registers an existing destination to be loaded when the algorithm completes, as
+        parameterAsSink does for new destinations
+        """
+        definition = parameters.get('OUTPUT')
+        if not isinstance(definition, QgsProcessingOutputLayerDefinition) or definition.destinationProject is None:
+            return
 
-        for param in self.parameterDefinitions():
-            if param.isDestination():
-                continue
+        name = definition.destinationName or self.parameterDefinition('OUTPUT').description()
+        context.addLayerToLoadOnCompletion(destination,
+                                           QgsProcessingContext.LayerDetails(name, definition.destinationProject,
+                                                                             'OUTPUT'))
+
+    def incremental_run_key(self, source) -> str:
+        """
+        Returns a key identifying the script, parameter values and input of a run. Stored
+        incremental state is discarded when the key changes.
+        """
+        key = json.dumps({'script': self.script_source,
+                          'parameters': self.script_parameters,
+                          'precision': self.run_precision,
+                          'input': source.sourceName(),
+                          'fields': self.fields.names()},
+                         sort_keys=True, default=str)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def process_incremental(self, destination, parameters, source, context, feedback):  # pylint: disable=too-many-locals
+        """
+        Updates an existing destination file, only running the script for new or changed
+        features, and removing the outputs of deleted features. Runs are single threaded.
+        """
+        state = IncrementalState(state_path(destination))
+        run_key = self.incremental_run_key(source)
+        if not os.path.exists(destination) or state.run_key() != run_key:
+            feedback.pushInfo(self.tr('No matching incremental state found, processing all features'))
+            (sink, dest_id) = self.parameterAsSink(parameters, 'OUTPUT', context,
+                                                   self.fields,
+                                                   self.outputWkbType(source.wkbType()),
+                                                   self.outputCrs(source.sourceCrs()),
+                                                   self.sinkFlags())
+            if sink is None:
+                raise QgsProcessingException(self.invalidSinkError(parameters, 'OUTPUT'))
+            # close the new, empty, destination so it can be edited below
+            del sink
+            state.reset(run_key)
+        else:
+            # parameterAsSink isn't called for an existing destination
+            dest_id = destination
+            self.load_output_on_completion(parameters, destination, context)
+
+        output = QgsVectorLayer(destination, 'output', 'ogr')
+        if not output.isValid():
+            raise QgsProcessingException(self.tr('Could not open {} for updating').format(destination))
+        provider = output.dataProvider()
+
+        count = source.featureCount()
+        step = 100.0 / count if count > 0 else 1
+        seen = set()
+        stale_output_fids = []
+        new_count = modified_count = unchanged_count = 0
+        for current, feature in enumerate(source.getFeatures(self.request(), self.sourceFlags())):
+            if feedback.isCanceled():
+                break
 
-            if param.name() not in parameters or parameters[param.name()] is None:
-                js += '{}=None;\n'.format(param.name())
+            seen.add(feature.id())
+            content_hash = feature_hash(feature)
+            previous = state.get(feature.id())
+            if previous is not None and previous[0] == content_hash:
+                unchanged_count += 1
                 continue
 
-            if isinstance(param,
-                            (QgsProcessingParameterField, QgsProcessingParameterString, QgsProcessingParameterFile)):
-                value = self.parameterAsString(parameters, param.name(), context)
-                js += '{}="{}";'.format(param.name(), value)
-            elif isinstance(param, QgsProcessingParameterNumber):
-                value = self.parameterAsDouble(parameters, param.name(), context)
-                js += '{}={};'.format(param.name(), value)
+            if previous is not None:
+                stale_output_fids.extend(previous[1])
+                modified_count += 1
+            else:
+                new_count += 1
 
-        js += self.js_script
-        result = self.engine.evaluate(js)
+            outputs = self.remap_features(self.processFeature(feature, context, feedback), self.fields,
+                                          provider.fields())
+            _, added = provider.addFeatures(outputs)
+            state.set(feature.id(), content_hash, [f.id() for f in added])
+            feedback.setProgress(current * step)
 
-        user_func = self.engine.globalObject().property("func")
-        if not user_func:
-            raise QgsProcessingException('No \'func\' function detected in script')
-        if not user_func.isCallable():
-            raise QgsProcessingException('Object \'func\' is not a callable function')
+        deleted_count = 0
+        if not feedback.isCanceled():
+            for input_fid in state.input_fids() - seen:
+                stale_output_fids.extend(state.get(input_fid)[1])
+                state.remove(input_fid)
+                deleted_count += 1
 
-        self.process_js_function = self.engine.globalObject().property("process")
-        self.json_exporter = QgsJsonExporter()
+        provider.deleteFeatures(stale_output_fids)
+        state.commit()
+        state.close()
 
-        self.codec = QTextCodec.codecForName("System")
+        feedback.pushInfo(self.tr('Incremental run: {} new, {} modified, {} deleted, '
+                                  '{} unchanged features skipped').format(new_count, modified_count,
+                                                                          deleted_count, unchanged_count))
+        return {'OUTPUT': dest_id}
 
-        return True
+    def shard_parameters(self, parameters, context) -> dict:
+        """
+        Returns the script's parameter values in a form which can be passed to worker processes
+        """
+        res = {}
+        for param in self.parameterDefinitions():
+            name = param.name()
+            if param.isDestination() or name in self.internal_parameter_names() or name not in parameters:
+                continue
 
-    def outputName(self):
-        return 'Processed'
+            value = parameters[name]
+            if value is None or isinstance(value, (str, int, float, bool)):
+                res[name] = value
+            elif isinstance(param, QgsProcessingParameterMultipleLayers):
+                res[name] = [layer.source() for layer in self.parameterAsLayerList(parameters, name, context)]
+            elif isinstance(param, (QgsProcessingParameterMapLayer, QgsProcessingParameterFeatureSource,
+                                    QgsProcessingParameterVectorLayer, QgsProcessingParameterRasterLayer)):
+                layer = self.parameterAsLayer(parameters, name, context)
+                res[name] = layer.source() if layer is not None else None
+            else:
+                res[name] = self.parameterAsString(parameters, name, context)
+        return res
 
     def processFeature(self, feature, context, feedback):
         """
         Executes the algorithm
         """
-        self.json_exporter.setSourceCrs(self.input_crs)
-        geojson = self.json_exporter.exportFeature(feature)
-        res = self.process_js_function.call([geojson])
-        if not res:
-            return []
-        if res.isError():
-            error = "Uncaught exception at line {}:{}".format(res.property("lineNumber").toInt(),
-                                                            res.toString())
-            raise QgsProcessingException(error)
+        return self.runner.process_feature(feature)
 
-        return QgsJsonUtils.stringToFeatureList(res.toString(), self.fields, self.codec)
-
-    def shortHelpString(self):
+    def processBatch(self, features, context, feedback):  # pylint: disable=unused-argument
         """
-        Returns the algorithms helper string
+        Executes the algorithm over a batch of features, using a single call to
+        the script's 'funcBatch' function
         """
-        if self.description_file is None:
-            return ''
-
-        help_file = self.description_file + '.help'
-        print(help_file)
-        if os.path.exists(help_file):
-            with open(help_file) as f:
-                descriptions = json.load(f)
+        return self.runner.process_batch(features)
 
-            return QgsProcessingUtils.formatHelpMapAsHtml(descriptions, self)
 
-        return ''
+def create_algorithm(description_file, script=None, metadata=None) -> JsAlgorithm:
+    """
+    Creates the algorithm for a script, using JsAggregateAlgorithm for scripts
+    which declare the //#aggregate directive and JsRasterAlgorithm for scripts
+    which declare the //#raster directive.
 
-    def tr(self, string, context=''):
-        """
-        Translates a string
-        """
-        if context == '':
-            context = 'JsAlgorithmProvider'
-        return QCoreApplication.translate(context, string)
+    If metadata is specified it is used as the previously parsed metadata lines of
+    the script file, and the file is not read.
+    """
+    alg = JsAlgorithm(description_file, script=script, metadata=metadata)
+    if alg.aggregate_type is not None:
+        algorithm_class = JsAggregateAlgorithm
+    elif alg.raster_type is not None:
+        algorithm_class = JsRasterAlgorithm
+    else:
+        return alg
+
+    specialized = algorithm_class(description_file, script=alg.script, metadata=alg.metadata)
+    specialized.script_mtime = alg.script_mtime
+    return specialized
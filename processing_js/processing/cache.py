@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    cache.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LruCache:
+    """
+    A thread safe, size bounded cache which evicts the least recently used entries.
+
+    A max_size of 0 disables the cache.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored for key, or default if it is not present
+        """
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def take(self, key, default=None):
+        """
+        Removes and returns the value stored for key, or default if it is not present
+        """
+        with self._lock:
+            try:
+                value = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """
+        Stores a value for key, evicting the least recently used entries if the cache is full
+        """
+        with self._lock:
+            if self.max_size <= 0:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def set_max_size(self, max_size: int):
+        """
+        Sets the maximum number of entries, evicting entries if required
+        """
+        with self._lock:
+            self.max_size = max_size
+            self._evict()
+
+    def clear(self):
+        """
+        Removes all entries and resets the hit and miss counts
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _evict(self):
+        """
+        Evicts entries until the cache is within its size limit
+        """
+        while len(self._entries) > max(self.max_size, 0):
+            self._entries.popitem(last=False)
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    engine.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import hashlib
+import json
+import threading
+from time import perf_counter
+
+from qgis.core import QgsFeature, QgsProcessingException
+from qgis.PyQt.QtCore import QCoreApplication
+from PyQt5.QtQml import QJSEngine, QQmlEngine
+
+from processing_js.processing.cache import LruCache
+from processing_js.processing.feedback import (FEEDBACK_JS,
+                                               FLUSH_INTERVAL,
+                                               FLUSH_COUNT,
+                                               MAX_TRACKED_MESSAGES)
+from processing_js.processing.incremental import feature_hash
+from processing_js.processing.marshalling import (python_to_js,
+                                                  raise_for_error)
+
+
+class EnginePool:
+    """
+    A pool of idle engines which have evaluated a script, shared by all runs of
+    the provider's algorithms.
+
+    Engines are keyed by a hash of the evaluated source and the parameter values it was
+    evaluated with, and by the thread which created them, as an engine must only be used
+    from its own thread. Engines are removed from the pool while in use.
+    """
+
+    def __init__(self, max_size: int):
+        self.cache = LruCache(max_size)
+
+    @staticmethod
+    def key(source: str, parameters: dict = None):
+        """
+        Returns the pool key for a script source and parameter values, for the current thread
+        """
+        digest = hashlib.sha1(source.encode('utf-8'))
+        digest.update(json.dumps(parameters or {}, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest(), threading.get_ident()
+
+    def acquire(self, source: str, parameters: dict = None):
+        """
+        Removes and returns an idle engine which has evaluated source with the given
+        parameter values, or None if no engine is available
+        """
+        return self.cache.take(self.key(source, parameters))
+
+    def release(self, source: str, parameters: dict, engine: QJSEngine):
+        """
+        Returns an engine which has evaluated source with the given parameter values to the pool
+        """
+        self.cache.put(self.key(source, parameters), engine)
+
+    def set_max_size(self, max_size: int):
+        """
+        Sets the maximum number of idle engines kept alive
+        """
+        self.cache.set_max_size(max_size)
+
+    def clear(self):
+        """
+        Discards all idle engines
+        """
+        self.cache.clear()
+
+
+class ScriptRunner:
+    """
+    Evaluates a script within its own QJSEngine, and runs features through it.
+
+    The marshaller_factory is called with the engine to create the marshaller
+    used to convert features to and from script values. A runner must only be
+    used from the thread which created it.
+
+    Parameter values are set as properties of the global object before the
+    source is evaluated, so the same compiled source serves every set of values.
+
+    If specified, globals_factory is called with the engine and must return a dict
+    of QObjects to expose to the script as globals, e.g. lookup tables.
+
+    If timings are specified, the export, call and import stages of every script call
+    are timed.
+
+    If a memo cache is specified, the outputs of single feature calls are cached by a
+    hash of the input feature's attributes and geometry, and reused for identical features
+    without calling the script. This is only valid for scripts without side effects whose
+    results don't depend on feature.id, as the feature id is not part of the hash.
+
+    If buffer_feedback is True, messages pushed by the script are buffered and
+    deduplicated before being passed to feedback, and a summary of repeated messages
+    is reported by release(). Buffered messages are passed on at least every
+    flush_interval seconds while the script is being called. Otherwise every call
+    goes straight to feedback.
+
+    If a pool is specified, an idle engine which has already evaluated the same
+    source with the same parameter values is reused when available, and the engine
+    is returned to the pool by release(). The source is not evaluated again for a
+    reused engine, so top level state left by earlier runs (such as counters) is kept.
+    Parameter values are set again in case the script assigned to them.
+    """
+
+    def __init__(self, source: str, feedback, batch_mode: bool, marshaller_factory,  # pylint: disable=too-many-arguments
+                 parameters: dict = None, pool: EnginePool = None, globals_factory=None,
+                 memo: LruCache = None, timings=None, buffer_feedback: bool = False):
+        self.source = source
+        self.parameters = parameters
+        self.feedback = feedback
+        self.memo = memo
+        self.timings = timings
+        self.batch_mode = batch_mode
+        self.pool = pool
+        self.engine = pool.acquire(source, parameters) if pool is not None else None
+        self.reused = self.engine is not None
+        if not self.reused:
+            self.engine = QJSEngine()
+            self.engine.evaluate(FEEDBACK_JS)
+
+        # feedback is rebound for every run, including runs with a reused engine
+        js_feedback = self.engine.newQObject(feedback)
+        QQmlEngine.setObjectOwnership(feedback, QQmlEngine.CppOwnership)
+        self.feedback_proxy = None
+        self.flush_interval = FLUSH_INTERVAL / 1000
+        self.last_flush = perf_counter()
+        if buffer_feedback:
+            self.feedback_proxy = self.engine.globalObject().property('_bufferedFeedback').call(
+                [js_feedback, FLUSH_INTERVAL, FLUSH_COUNT, MAX_TRACKED_MESSAGES])
+            js_feedback = self.feedback_proxy
+        self.engine.globalObject().setProperty("feedback", js_feedback)
+        for name, value in (parameters or {}).items():
+            self.engine.globalObject().setProperty(name, python_to_js(self.engine, value))
+        self.global_objects = globals_factory(self.engine) if globals_factory is not None else {}
+        for name, obj in self.global_objects.items():
+            QQmlEngine.setObjectOwnership(obj, QQmlEngine.CppOwnership)
+            self.engine.globalObject().setProperty(name, self.engine.newQObject(obj))
+        if not self.reused:
+            self.engine.evaluate(source)
+
+        for user_func_name in self.required_functions():
+            user_func = self.engine.globalObject().property(user_func_name)
+            if not user_func:
+                raise QgsProcessingException('No \'{}\' function detected in script'.format(user_func_name))
+            if not user_func.isCallable():
+                raise QgsProcessingException('Object \'{}\' is not a callable function'.format(user_func_name))
+
+        self.process_function = self.engine.globalObject().property("process")
+        self.process_batch_function = self.engine.globalObject().property("processBatch")
+        self.marshaller = marshaller_factory(self.engine)
+
+    def required_functions(self) -> list:
+        """
+        Returns the names of the functions which the script must define
+        """
+        return ['funcBatch' if self.batch_mode else 'func']
+
+    def release(self):
+        """
+        Reports buffered feedback and returns the runner's engine to the pool, after which
+        the runner can no longer be used
+        """
+        self.finish_feedback()
+        if self.pool is not None and self.engine is not None:
+            self.pool.release(self.source, self.parameters, self.engine)
+        self.engine = None
+        self.marshaller = None
+        self.global_objects = {}
+        self.feedback_proxy = None
+
+    def flush_feedback(self):
+        """
+        Passes any buffered messages to feedback
+        """
+        if self.feedback_proxy is not None:
+            self.feedback_proxy.property('_flush').call()
+            self.last_flush = perf_counter()
+
+    def check_feedback(self):
+        """
+        Passes any buffered messages to feedback if flush_interval has elapsed since they
+        were last passed on. Scripts only check the interval when they push a message,
+        so messages could otherwise wait until the script's next message.
+        """
+        if self.feedback_proxy is not None and perf_counter() - self.last_flush >= self.flush_interval:
+            self.flush_feedback()
+
+    def finish_feedback(self):
+        """
+        Passes any buffered messages to feedback, followed by a summary of messages
+        which were repeated
+        """
+        if self.feedback_proxy is None:
+            return
+        repeated = self.feedback_proxy.property('_finish').call().toVariant() or []
+        for method, message, count in repeated:
+            getattr(self.feedback, method)(QCoreApplication.translate('ScriptRunner',
+                                                                      'Message "{}" repeated {:,} times').format(
+                message, int(count) - 1))
+
+    def features_from_js(self, res) -> list:
+        """
+        Converts the result of a script call to a list of features. Buffered messages are
+        flushed before errors are raised, so that messages logged before an error are not lost.
+        """
+        try:
+            features = self.marshaller.features_from_js(res)
+        except QgsProcessingException:
+            self.flush_feedback()
+            raise
+        self.check_feedback()
+        return features
+
+    def process_feature(self, feature) -> list:
+        """
+        Runs a single feature through the script's 'func' function, returning the list of output features
+        """
+        if self.memo is None:
+            return self.call_process_function(feature)
+
+        key = feature_hash(feature)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return [QgsFeature(f) for f in cached]
+        res = self.call_process_function(feature)
+        self.memo.put(key, [QgsFeature(f) for f in res])
+        return res
+
+    def call_process_function(self, feature) -> list:
+        """
+        Calls the script's 'func' function for a single feature, returning the list of output features
+        """
+        if self.timings is not None:
+            return self.timed_call(self.process_function, self.marshaller.feature_to_js, feature)
+        res = self.process_function.call([self.marshaller.feature_to_js(feature)])
+        return self.features_from_js(res)
+
+    def process_batch(self, features) -> list:
+        """
+        Runs a list of features through a single call to the script's 'funcBatch' function,
+        returning the list of output features
+        """
+        if self.timings is not None:
+            return self.timed_call(self.process_batch_function, self.marshaller.features_to_js, features)
+        res = self.process_batch_function.call([self.marshaller.features_to_js(features)])
+        return self.features_from_js(res)
+
+    def timed_call(self, function, export, value) -> list:
+        """
+        Exports a value, calls a script function with it and imports the resulting features,
+        timing each stage
+        """
+        start = perf_counter()
+        argument = export(value)
+        exported = perf_counter()
+        res = function.call([argument])
+        called = perf_counter()
+        features = self.features_from_js(res)
+        self.timings.add_call(exported - start, called - exported, perf_counter() - called)
+        return features
+
+    def process_features(self, features) -> list:
+        """
+        Runs a list of features through the script, using a single call for batched scripts
+        or one call per feature otherwise. Returns the list of output features.
+        """
+        if self.batch_mode:
+            return self.process_batch(features)
+
+        res = []
+        for feature in features:
+            res.extend(self.process_feature(feature))
+        return res
+
+
+class AggregateRunner(ScriptRunner):
+    """
+    Runs features through a script's 'map' and 'reduce' functions.
+
+    Each chunk of features is reduced to a partial result within the engine, which is
+    returned as a plain Python value so that partial results from the engines of
+    different threads can be combined by reduce_partials().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunk_function = self.engine.globalObject().property('_aggregateChunk')
+        self.combine_function = self.engine.globalObject().property('_aggregateCombine')
+        self.result_function = self.engine.globalObject().property('_aggregateResult')
+
+    def required_functions(self) -> list:
+        return ['map', 'reduce']
+
+    def process_features(self, features) -> list:
+        """
+        Reduces a chunk of features, returning a list containing the partial result
+        """
+        res = self.chunk_function.call([self.marshaller.features_to_js(features)])
+        raise_for_error(res)
+        self.check_feedback()
+        return [res.toVariant()]
+
+    def reduce_partials(self, partials):
+        """
+        Combines a list of partial results, in order, returning the final result
+        """
+        res = python_to_js(self.engine, {'empty': True, 'value': None})
+        for partial in partials:
+            res = self.combine_function.call([res, python_to_js(self.engine, partial)])
+            raise_for_error(res)
+        res = self.result_function.call([res])
+        raise_for_error(res)
+        return res.toVariant()
+
+
+class RasterRunner(ScriptRunner):
+    """
+    Runs raster blocks through a script's 'func' function, using a RasterBlockMarshaller
+    """
+
+    def required_functions(self) -> list:
+        return ['func']
+
+    def process_block(self, block, column: int, row: int):
+        """
+        Runs a raster block, with its top left pixel at column and row, through the script,
+        returning the output block
+        """
+        res = self.process_function.call([self.marshaller.block_to_js(block, column, row)])
+        try:
+            output = self.marshaller.block_from_js(res, block.width(), block.height())
+        except QgsProcessingException:
+            self.flush_feedback()
+            raise
+        self.check_feedback()
+        return output
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    feedback.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+# buffered messages are flushed after this many milliseconds, checked whenever a message is pushed
+# and by the script runner after each script call
+FLUSH_INTERVAL = 1000
+
+# buffered messages are flushed once this many are waiting
+FLUSH_COUNT = 100
+
+# maximum number of distinct messages counted for repeat summaries. Further distinct
+# messages are never deduplicated, so memory use is bounded for scripts which log
+# a different message for every feature
+MAX_TRACKED_MESSAGES = 10000
+
+# Defines _bufferedFeedback(target, flushInterval, flushCount, maxTracked), which wraps
+# the feedback object exposed to scripts. Messages are buffered and only the first
+# occurrence of each message is passed on, with repeats counted. Calling _finish()
+# flushes the buffer and returns [method, message, count] for each repeated message.
+# All other feedback methods and properties are passed through unchanged.
+FEEDBACK_JS = """
+        function _bufferedFeedback(target, flushInterval, flushCount, maxTracked)
+        {
+          if ( typeof Proxy !== 'function' )
+            return target;
+
+          var buffer = [];
+          var counts = Object.create(null);
+          var tracked = 0;
+          var lastFlush = 0;
+
+          var flush = function() {
+            var messages = buffer;
+            buffer = [];
+            lastFlush = Date.now();
+            messages.forEach(function(m) { target[m[0]](m[1]); });
+          };
+
+          var push = function(method) {
+            return function(message) {
+              message = String(message);
+              var key = method + '\\n' + message;
+              if ( key in counts )
+              {
+                counts[key][2]++;
+                return;
+              }
+              if ( tracked < maxTracked )
+              {
+                counts[key] = [method, message, 1];
+                tracked++;
+              }
+              buffer.push([method, message]);
+              if ( buffer.length >= flushCount || Date.now() - lastFlush >= flushInterval )
+                flush();
+            };
+          };
+
+          var methods = Object.create(null);
+          ['pushInfo', 'pushWarning', 'pushDebugInfo', 'pushConsoleInfo', 'pushCommandInfo'].forEach(function(name) {
+            if ( typeof target[name] === 'function' )
+              methods[name] = push(name);
+          });
+          methods.reportError = function() {
+            flush();
+            return target.reportError.apply(target, arguments);
+          };
+          methods._flush = flush;
+          methods._finish = function() {
+            flush();
+            var repeated = [];
+            for ( var key in counts )
+            {
+              if ( counts[key][2] > 1 )
+                repeated.push(counts[key]);
+            }
+            counts = Object.create(null);
+            tracked = 0;
+            return repeated;
+          };
+
+          return new Proxy(target, {
+            get: function(t, name) {
+              if ( name in methods )
+                return methods[name];
+              var value = t[name];
+              return typeof value === 'function' ? value.bind(t) : value;
+            }
+          });
+        }
+        """
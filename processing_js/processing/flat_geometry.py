@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    flat_geometry.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import struct
+import sys
+from array import array
+
+# Flat geometry buffers are laid out as:
+#
+# - a header of 6 int32 values: ISO WKB type, stride (number of ordinates per vertex),
+#   number of ordinates, number of ring offsets, number of part offsets, padding
+# - the ordinates of all vertices, as float64 values
+# - the ring offsets, as int32 vertex indices. Ring i spans vertices rings[i] to rings[i + 1]
+# - the part offsets, as int32 ring indices. Part i spans rings parts[i] to parts[i + 1]
+#
+# All values are stored in native byte order, so that the buffer can be wrapped
+# directly by Float64Array and Int32Array views in scripts.
+
+HEADER = struct.Struct('=6i')
+
+WKB_POINT = 1
+WKB_LINESTRING = 2
+WKB_POLYGON = 3
+WKB_MULTIPOINT = 4
+WKB_MULTILINESTRING = 5
+WKB_MULTIPOLYGON = 6
+
+NATIVE_WKB_BYTE_ORDER = 1 if sys.byteorder == 'little' else 0
+
+JS_FUNCTIONS = """
+        var _FLAT_TYPES = [null, 'Point', 'LineString', 'Polygon', 'MultiPoint', 'MultiLineString', 'MultiPolygon'];
+
+        function _flatGeometry(buffer)
+        {
+          var header = new Int32Array(buffer, 0, 6);
+          var offset = 24;
+          var coordinates = new Float64Array(buffer, offset, header[2]);
+          offset += header[2] * 8;
+          var rings = new Int32Array(buffer, offset, header[3]);
+          offset += header[3] * 4;
+          var parts = new Int32Array(buffer, offset, header[4]);
+          return {"type": _FLAT_TYPES[header[0] % 1000],
+                  "wkbType": header[0],
+                  "stride": header[1],
+                  "coordinates": coordinates,
+                  "rings": rings,
+                  "parts": parts};
+        }
+
+        function _flatBuffer(geometry)
+        {
+          var stride = geometry.stride || 2;
+          var wkbType = geometry.wkbType || (_FLAT_TYPES.indexOf(geometry.type) + (stride == 3 ? 1000 : stride == 4 ? 3000 : 0));
+          var coordinates = geometry.coordinates;
+          var rings = geometry.rings || [0, coordinates.length / stride];
+          var parts = geometry.parts || [0, rings.length - 1];
+          var buffer = new ArrayBuffer(24 + coordinates.length * 8 + (rings.length + parts.length) * 4);
+          new Int32Array(buffer, 0, 6).set([wkbType, stride, coordinates.length, rings.length, parts.length, 0]);
+          var offset = 24;
+          new Float64Array(buffer, offset, coordinates.length).set(coordinates);
+          offset += coordinates.length * 8;
+          new Int32Array(buffer, offset, rings.length).set(rings);
+          offset += rings.length * 4;
+          new Int32Array(buffer, offset, parts.length).set(parts);
+          return buffer;
+        }
+
+        function _flatFeature(feature)
+        {
+          // lazy features with unread geometries are passed through unchanged
+          if ( feature && feature.__lazyGeometrySlot >= 0 )
+            return;
+          if ( feature && feature.geometry && feature.geometry.coordinates instanceof Float64Array )
+            feature.geometry = _flatBuffer(feature.geometry);
+        }
+
+        function _flatResult(res)
+        {
+          if ( !res || ( res.stack && res.message ) )
+            return res;
+          if ( Array.isArray(res) )
+            res.forEach(_flatFeature);
+          else if ( res.type == 'FeatureCollection' )
+            res.features.forEach(_flatFeature);
+          else
+            _flatFeature(res);
+          return res;
+        }
+        """
+
+
+def wkb_to_flat(wkb: bytes):  # pylint: disable=too-many-locals
+    """
+    Converts a WKB geometry to a flat geometry buffer.
+
+    Coordinates are copied from the WKB in blocks per ring, so no per-vertex
+    objects are created. Returns None if the geometry type cannot be represented
+    as a flat geometry (e.g. curved geometries or geometry collections).
+    """
+    if not wkb:
+        return None
+
+    prefix = '<' if wkb[0] == 1 else '>'
+    wkb_type = struct.unpack_from(prefix + 'I', wkb, 1)[0]
+    base_type, stride, iso_type = _split_wkb_type(wkb_type)
+    if base_type not in (WKB_POINT, WKB_LINESTRING, WKB_POLYGON,
+                         WKB_MULTIPOINT, WKB_MULTILINESTRING, WKB_MULTIPOLYGON):
+        return None
+
+    coordinate_blocks = []
+    rings = [0]
+    parts = [0]
+
+    def read_points(offset, count):
+        size = count * stride * 8
+        coordinate_blocks.append(wkb[offset:offset + size])
+        rings.append(rings[-1] + count)
+        return offset + size
+
+    def read_part(offset, part_type):
+        if part_type == WKB_POINT:
+            offset = read_points(offset, 1)
+        elif part_type == WKB_LINESTRING:
+            count = struct.unpack_from(prefix + 'I', wkb, offset)[0]
+            offset = read_points(offset + 4, count)
+        else:
+            ring_count = struct.unpack_from(prefix + 'I', wkb, offset)[0]
+            offset += 4
+            for _ in range(ring_count):
+                count = struct.unpack_from(prefix + 'I', wkb, offset)[0]
+                offset = read_points(offset + 4, count)
+        parts.append(len(rings) - 1)
+        return offset
+
+    if base_type <= WKB_POLYGON:
+        read_part(5, base_type)
+    else:
+        part_count = struct.unpack_from(prefix + 'I', wkb, 5)[0]
+        offset = 9
+        for _ in range(part_count):
+            # each part has its own byte order and type header
+            offset = read_part(offset + 5, base_type - 3)
+
+    coordinates = b''.join(coordinate_blocks)
+    if wkb[0] != NATIVE_WKB_BYTE_ORDER:
+        swapped = array('d', coordinates)
+        swapped.byteswap()
+        coordinates = swapped.tobytes()
+
+    return b''.join([HEADER.pack(iso_type, stride, len(coordinates) // 8, len(rings), len(parts), 0),
+                     coordinates,
+                     array('i', rings).tobytes(),
+                     array('i', parts).tobytes()])
+
+
+def flat_to_wkb(buffer: bytes) -> bytes:  # pylint: disable=too-many-locals
+    """
+    Converts a flat geometry buffer to a WKB geometry, in native byte order
+    """
+    wkb_type, stride, coordinate_count, ring_count, part_count, _ = HEADER.unpack_from(buffer, 0)
+    base_type = wkb_type % 1000
+    coordinate_offset = HEADER.size
+    ring_offset = coordinate_offset + coordinate_count * 8
+    part_offset = ring_offset + ring_count * 4
+    rings = array('i', buffer[ring_offset:part_offset])
+    parts = array('i', buffer[part_offset:part_offset + part_count * 4])
+
+    vertex_size = stride * 8
+    order = bytes([NATIVE_WKB_BYTE_ORDER])
+    uint32 = struct.Struct('=I')
+
+    def ring_wkb(ring, with_count=True):
+        start = coordinate_offset + rings[ring] * vertex_size
+        end = coordinate_offset + rings[ring + 1] * vertex_size
+        count = uint32.pack(rings[ring + 1] - rings[ring]) if with_count else b''
+        return count + buffer[start:end]
+
+    def part_wkb(part, part_type):
+        first_ring = parts[part]
+        last_ring = parts[part + 1]
+        header = order + uint32.pack(part_type + wkb_type - base_type)
+        if part_type == WKB_POINT:
+            return header + ring_wkb(first_ring, with_count=False)
+        if part_type == WKB_LINESTRING:
+            return header + ring_wkb(first_ring)
+        return header + b''.join([uint32.pack(last_ring - first_ring)] +
+                                 [ring_wkb(r) for r in range(first_ring, last_ring)])
+
+    if base_type <= WKB_POLYGON:
+        return part_wkb(0, base_type)
+
+    part_count = len(parts) - 1
+    return b''.join([order, uint32.pack(wkb_type), uint32.pack(part_count)] +
+                    [part_wkb(p, base_type - 3) for p in range(part_count)])
+
+
+def _split_wkb_type(wkb_type: int):
+    """
+    Splits a WKB type into its base type, stride and equivalent ISO WKB type
+    """
+    if wkb_type & 0x80000000:
+        # 2.5D types, always with z values
+        base_type = wkb_type & 0xff
+        return base_type, 3, base_type + 1000
+
+    base_type = wkb_type % 1000
+    dimension = wkb_type // 1000
+    stride = {0: 2, 1: 3, 2: 3, 3: 4}.get(dimension, 2)
+    return base_type, stride, wkb_type
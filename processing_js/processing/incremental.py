@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    incremental.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import hashlib
+import json
+import sqlite3
+
+STATE_SUFFIX = '.jsstate.sqlite'
+
+
+def state_path(destination: str) -> str:
+    """
+    Returns the path of the sidecar state file for a destination file
+    """
+    return destination + STATE_SUFFIX
+
+
+def feature_hash(feature) -> str:
+    """
+    Returns a hash of a feature's attributes and geometry
+    """
+    digest = hashlib.sha1(repr(feature.attributes()).encode('utf-8'))
+    if feature.hasGeometry():
+        digest.update(bytes(feature.geometry().asWkb()))
+    return digest.hexdigest()
+
+
+class IncrementalState:
+    """
+    Stores the content hash and output feature ids of every input feature processed
+    into a destination, in a sidecar SQLite database.
+
+    The state is only valid for the run key it was created with, which identifies
+    the script, parameter values and input. All rows are read into memory when
+    the state is opened, and changes are written when commit() is called.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS features '
+                                '(input_fid INTEGER PRIMARY KEY, hash TEXT, output_fids TEXT)')
+        self.features = {row[0]: (row[1], json.loads(row[2]))
+                         for row in self.connection.execute('SELECT input_fid, hash, output_fids FROM features')}
+        self.changed = set()
+        self.removed = set()
+
+    def run_key(self):
+        """
+        Returns the run key the state was created with, or None for a new state
+        """
+        row = self.connection.execute("SELECT value FROM meta WHERE key='run_key'").fetchone()
+        return row[0] if row else None
+
+    def reset(self, run_key: str):
+        """
+        Discards all stored features, and starts a new state for a run key
+        """
+        self.connection.execute('DELETE FROM features')
+        self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run_key', ?)", (run_key,))
+        self.connection.commit()
+        self.features = {}
+        self.changed = set()
+        self.removed = set()
+
+    def get(self, input_fid: int):
+        """
+        Returns a tuple of the hash and output fids stored for an input feature, or None
+        """
+        return self.features.get(input_fid)
+
+    def set(self, input_fid: int, content_hash: str, output_fids: list):
+        """
+        Stores the hash and output fids for an input feature
+        """
+        self.features[input_fid] = (content_hash, output_fids)
+        self.changed.add(input_fid)
+        self.removed.discard(input_fid)
+
+    def remove(self, input_fid: int):
+        """
+        Removes an input feature from the state
+        """
+        self.features.pop(input_fid, None)
+        self.changed.discard(input_fid)
+        self.removed.add(input_fid)
+
+    def input_fids(self) -> set:
+        """
+        Returns the ids of all input features in the state
+        """
+        return set(self.features.keys())
+
+    def commit(self):
+        """
+        Writes all changes to the state file
+        """
+        self.connection.executemany('DELETE FROM features WHERE input_fid = ?',
+                                    [(fid,) for fid in self.removed])
+        self.connection.executemany('INSERT OR REPLACE INTO features (input_fid, hash, output_fids) VALUES (?, ?, ?)',
+                                    [(fid, self.features[fid][0], json.dumps(self.features[fid][1]))
+                                     for fid in self.changed])
+        self.connection.commit()
+        self.changed = set()
+        self.removed = set()
+
+    def close(self):
+        """
+        Closes the state file
+        """
+        self.connection.close()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    lookup.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import sys
+import time
+import weakref
+
+from qgis.core import (QgsFeatureRequest,
+                       QgsProcessingException)
+from qgis.PyQt.QtCore import QObject, QVariant, pyqtSlot
+from PyQt5.QtQml import QJSValue
+
+from processing_js.processing.marshalling import python_to_js
+
+
+def _is_null(value) -> bool:
+    """
+    Returns True if an attribute value is null
+    """
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+class LookupTable:
+    """
+    An in memory hash index of a layer's attributes, keyed by the values of a key field.
+
+    Tables are read only once built, so a single table can be shared by the engines
+    of all worker threads.
+    """
+
+    def __init__(self, name: str, source, key_field: str):
+        self.name = name
+        self.key_field = key_field
+        self.entries = {}
+        self.duplicates = 0
+        self.build_time = 0
+
+        fields = source.fields()
+        key_index = fields.lookupField(key_field)
+        if key_index < 0:
+            raise QgsProcessingException('Lookup key field {} does not exist'.format(key_field))
+
+        start = time.perf_counter()
+        names = fields.names()
+        request = QgsFeatureRequest().setFlags(QgsFeatureRequest.NoGeometry)
+        for feature in source.getFeatures(request):
+            attributes = feature.attributes()
+            key = attributes[key_index]
+            if _is_null(key) or key in self.entries:
+                self.duplicates += 1
+                continue
+            self.entries[key] = dict(zip(names, [None if _is_null(v) else v for v in attributes]))
+        self.build_time = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns the attributes for a key, or None if the key is not present
+        """
+        try:
+            return self.entries[key]
+        except (KeyError, TypeError):
+            return None
+
+    def memory_usage(self) -> int:
+        """
+        Returns an approximate size of the table in bytes
+        """
+        size = sys.getsizeof(self.entries)
+        for key, attributes in self.entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof(attributes)
+            size += sum(sys.getsizeof(v) for v in attributes.values())
+        return size
+
+
+class LookupObject(QObject):
+    """
+    Exposes a lookup table to a script engine
+    """
+
+    def __init__(self, table: LookupTable, engine):
+        super().__init__()
+        self.table = table
+        # weak reference, to avoid keeping pooled engines alive
+        self.engine = weakref.proxy(engine)
+
+    @pyqtSlot('QVariant', result=QJSValue)
+    def get(self, key) -> QJSValue:
+        """
+        Returns the attributes for a key as an object, or null if the key is not present
+        """
+        return python_to_js(self.engine, self.table.get(key))
+
+    @pyqtSlot('QVariant', result=bool)
+    def has(self, key) -> bool:
+        """
+        Returns True if the key is present
+        """
+        return self.table.get(key) is not None
+
+    @pyqtSlot(result=int)
+    def size(self) -> int:
+        """
+        Returns the number of keys
+        """
+        return len(self.table)
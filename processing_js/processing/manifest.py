@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    manifest.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import json
+import os
+
+
+class ScriptManifest:
+    """
+    On-disk cache of the metadata lines parsed from script files, so that unchanged
+    scripts can be registered without being opened.
+
+    Entries are keyed by the real path of the script, and are only used while the
+    file's modification time and size match those recorded when it was parsed.
+    Metadata lines are stored rather than algorithm objects, and are parsed again
+    when the algorithm is created, which is cheap compared to reading the file.
+    """
+
+    VERSION = 3
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.modified = False
+        self.load()
+
+    @staticmethod
+    def key(script_path: str) -> str:
+        """
+        Returns the manifest key for a script path
+        """
+        return os.path.realpath(script_path)
+
+    @staticmethod
+    def signature(script_path: str):
+        """
+        Returns the (modification time, size) of a script file, or None if it can't be read
+        """
+        try:
+            stat = os.stat(script_path)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def load(self):
+        """
+        Reads the manifest file. A missing, unreadable or outdated manifest is treated as empty.
+        """
+        self.entries = {}
+        try:
+            with open(self.path, 'r') as f:
+                content = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(content, dict) or content.get('version') != self.VERSION:
+            return
+        self.entries = content.get('scripts', {})
+
+    def save(self):
+        """
+        Writes the manifest file, if it has changed since it was loaded
+        """
+        if not self.modified:
+            return
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        # written to a temporary file first, so an interrupted write never leaves a corrupt manifest
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'version': self.VERSION, 'scripts': self.entries}, f)
+        os.replace(temp_path, self.path)
+        self.modified = False
+
+    def get(self, script_path: str, signature=None):
+        """
+        Returns the cached metadata lines for a script, or None if the script is not
+        in the manifest or has changed since it was parsed
+        """
+        key = self.key(script_path)
+        self.seen.add(key)
+        if signature is None:
+            signature = self.signature(script_path)
+        entry = self.entries.get(key)
+        if entry is None or signature is None or [entry['mtime'], entry['size']] != list(signature):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['metadata']
+
+    def put(self, script_path: str, signature, metadata: list):
+        """
+        Stores the metadata lines parsed from a script with the given signature
+        """
+        key = self.key(script_path)
+        self.seen.add(key)
+        if signature is None:
+            return
+        self.entries[key] = {'mtime': signature[0], 'size': signature[1], 'metadata': list(metadata)}
+        self.modified = True
+
+    def remove(self, script_path: str):
+        """
+        Removes the entry for a script
+        """
+        if self.entries.pop(self.key(script_path), None) is not None:
+            self.modified = True
+
+    def prune(self):
+        """
+        Removes entries for scripts which were not looked up since the manifest was
+        loaded, e.g. deleted scripts or scripts in folders which are no longer configured
+        """
+        for key in [k for k in self.entries if k not in self.seen]:
+            del self.entries[key]
+            self.modified = True
+
+    def hit_rate(self) -> float:
+        """
+        Returns the percentage of lookups which were answered from the manifest
+        """
+        lookups = self.hits + self.misses
+        return 100.0 * self.hits / lookups if lookups else 0
+
+    def reset_statistics(self):
+        """
+        Resets the lookup statistics and the set of scripts looked up
+        """
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,804 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    marshalling.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import weakref
+
+from qgis.core import (QgsFeature,
+                       QgsGeometry,
+                       QgsPoint,
+                       QgsLineString,
+                       QgsPolygon,
+                       QgsMultiPoint,
+                       QgsMultiLineString,
+                       QgsMultiPolygon,
+                       QgsGeometryCollection,
+                       QgsWkbTypes,
+                       QgsJsonExporter,
+                       QgsJsonUtils,
+                       QgsCoordinateTransform,
+                       QgsCoordinateReferenceSystem,
+                       QgsProcessingException)
+from qgis.PyQt.QtCore import (QObject,
+                              QVariant,
+                              QByteArray,
+                              QDate,
+                              QDateTime,
+                              QTime,
+                              Qt,
+                              pyqtSlot)
+from PyQt5.QtQml import QJSValue, QQmlEngine
+
+from processing_js.processing import flat_geometry
+
+GEOJSON_CRS = QgsCoordinateReferenceSystem('EPSG:4326')
+
+INT32_MIN = -2 ** 31
+INT32_MAX = 2 ** 31 - 1
+
+STALE_FEATURE_ERROR = ('Features can only be read during the script call they were passed to. '
+                       'Use the //#eager directive to keep features between calls')
+
+
+def result_is_empty(res: QJSValue) -> bool:
+    """
+    Returns True if a value returned from a script does not contain any features
+    """
+    return res is None or res.isUndefined() or res.isNull()
+
+
+def raise_for_error(res: QJSValue):
+    """
+    Raises a QgsProcessingException if a value returned from a script is an uncaught exception
+    """
+    if res.isError():
+        error = "Uncaught exception at line {}:{}".format(res.property("lineNumber").toInt(),
+                                                        res.toString())
+        raise QgsProcessingException(error)
+
+
+def _null_safe(converter):
+    """
+    Wraps a value converter so that nulls and unconvertible values become NULL attributes
+    """
+    def convert(value):
+        if value is None:
+            return None
+        try:
+            return converter(value)
+        except (TypeError, ValueError):
+            return None
+    return convert
+
+
+def _to_bool(value) -> bool:
+    """
+    Converts a script value to a boolean attribute value
+    """
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+
+def _to_int(value) -> int:
+    """
+    Converts a script value to an integer attribute value
+    """
+    if isinstance(value, str):
+        return int(float(value))
+    return int(value)
+
+
+def _to_date(value) -> QDate:
+    """
+    Converts a script value to a date attribute value
+    """
+    if isinstance(value, QDateTime):
+        return value.date()
+    if isinstance(value, QDate):
+        return value
+    return QDate.fromString(str(value), Qt.ISODate)
+
+
+def _to_datetime(value) -> QDateTime:
+    """
+    Converts a script value to a date time attribute value
+    """
+    if isinstance(value, QDateTime):
+        return value
+    return QDateTime.fromString(str(value), Qt.ISODate)
+
+
+def _to_time(value) -> QTime:
+    """
+    Converts a script value to a time attribute value
+    """
+    if isinstance(value, QDateTime):
+        return value.time()
+    if isinstance(value, QTime):
+        return value
+    return QTime.fromString(str(value), Qt.ISODate)
+
+
+VALUE_CONVERTERS = {
+    QVariant.Bool: _to_bool,
+    QVariant.Int: _to_int,
+    QVariant.UInt: _to_int,
+    QVariant.LongLong: _to_int,
+    QVariant.ULongLong: _to_int,
+    QVariant.Double: float,
+    QVariant.String: str,
+    QVariant.Date: _to_date,
+    QVariant.DateTime: _to_datetime,
+    QVariant.Time: _to_time,
+}
+
+
+def value_converter(field):
+    """
+    Returns a function for converting values returned by scripts to the type of a field
+    """
+    converter = VALUE_CONVERTERS.get(field.type())
+    if converter is None:
+        return lambda value: value
+    return _null_safe(converter)
+
+
+def python_to_js(engine, value) -> QJSValue:  # pylint: disable=too-many-return-statements
+    """
+    Converts a Python value (e.g. an attribute or parameter value) to a QJSValue
+    """
+    if value is None or (isinstance(value, QVariant) and value.isNull()):
+        return QJSValue(QJSValue.NullValue)
+    if isinstance(value, bool):
+        return QJSValue(value)
+    if isinstance(value, int):
+        # QJSValue only has 32 bit integer constructors
+        return QJSValue(value) if INT32_MIN <= value <= INT32_MAX else QJSValue(float(value))
+    if isinstance(value, float):
+        return QJSValue(value)
+    if isinstance(value, (QDate, QDateTime, QTime)):
+        return QJSValue(value.toString(Qt.ISODate))
+    if isinstance(value, (list, tuple)):
+        res = engine.newArray(len(value))
+        for i, v in enumerate(value):
+            res.setProperty(i, python_to_js(engine, v))
+        return res
+    if isinstance(value, dict):
+        res = engine.newObject()
+        for k, v in value.items():
+            res.setProperty(str(k), python_to_js(engine, v))
+        return res
+    return QJSValue(str(value))
+
+
+def source_field_indices(fields, source_fields) -> list:
+    """
+    Returns the indices of each of the output fields within the source fields
+    """
+    return [source_fields.lookupField(name) for name in fields.names()]
+
+
+class GeoJsonMarshaller:
+    """
+    Converts features to and from the script using GeoJSON strings.
+
+    This is the original conversion path, and is kept as a fallback for
+    scripts which declare the //#geojson directive.
+    """
+
+    JS_WRAPPER = """
+        function process(feature)
+        {
+          res = func(JSON.parse(feature))
+          if ( res && res.stack && res.message )
+            return res;
+         return JSON.stringify(res);
+        }
+
+        function processBatch(features)
+        {
+          res = funcBatch(JSON.parse(features))
+          if ( res && res.stack && res.message )
+            return res;
+          if ( !res )
+            return null;
+          return JSON.stringify({"type": "FeatureCollection",
+                                 "features": res.filter(function(f) { return f; })});
+        }
+        """
+
+    def __init__(self, fields, source_crs, codec, source_fields=None,  # pylint: disable=too-many-arguments
+                 precision=None):
+        self.fields = fields
+        self.codec = codec
+        # the exporter is configured once, and reused for every feature
+        self.exporter = QgsJsonExporter()
+        self.exporter.setSourceCrs(source_crs)
+        if precision is not None:
+            self.exporter.setPrecision(precision)
+        if source_fields is not None:
+            self.exporter.setAttributes(source_field_indices(fields, source_fields))
+
+    def feature_to_js(self, feature: QgsFeature):
+        """
+        Converts a feature to a value to pass to the 'process' wrapper
+        """
+        return self.exporter.exportFeature(feature)
+
+    def features_to_js(self, features):
+        """
+        Converts a list of features to a value to pass to the 'processBatch' wrapper
+        """
+        return '[{}]'.format(','.join(self.exporter.exportFeature(f) for f in features))
+
+    def features_from_js(self, res: QJSValue):
+        """
+        Converts a value returned by the script wrappers to a list of features
+        """
+        if result_is_empty(res):
+            return []
+        raise_for_error(res)
+        return QgsJsonUtils.stringToFeatureList(res.toString(), self.fields, self.codec)
+
+
+# Features are only held by the lazy feature source until the next call to the script,
+# so lazy features are tagged with the generation of the call they were passed to, and
+# reading unloaded values from a feature kept from an earlier call throws an error.
+LAZY_FEATURE_JS = """
+        var _lazyFieldIndex = Object.create(null);
+        var _lazyGeneration = 0;
+
+        function _lazyCheck(generation)
+        {
+          if ( generation !== _lazyGeneration )
+            throw new Error('%s');
+        }
+
+        function _lazyProperties(slot, generation)
+        {
+          var values = {};
+          var deleted = Object.create(null);
+          var isField = function(name) {
+            return name in _lazyFieldIndex && !( name in deleted );
+          };
+          var load = function(target, name) {
+            if ( !( name in target ) && isField(name) )
+            {
+              _lazyCheck(generation);
+              target[name] = _featureSource.attribute(slot, _lazyFieldIndex[name]);
+            }
+          };
+          return new Proxy(values, {
+            get: function(target, name) {
+              if ( name == '__lazyTarget' )
+                return target;
+              if ( name == '__lazySlot' )
+                return slot;
+              if ( name == '__lazyGeneration' )
+                return generation;
+              if ( name == '__lazyDeleted' )
+                return Object.keys(deleted);
+              load(target, name);
+              return target[name];
+            },
+            set: function(target, name, value) {
+              delete deleted[name];
+              target[name] = value;
+              return true;
+            },
+            deleteProperty: function(target, name) {
+              if ( name in _lazyFieldIndex )
+                deleted[name] = true;
+              delete target[name];
+              return true;
+            },
+            has: function(target, name) {
+              return name in target || isField(name);
+            },
+            ownKeys: function(target) {
+              var keys = Object.keys(_lazyFieldIndex).filter(isField);
+              Reflect.ownKeys(target).forEach(function(name) {
+                if ( keys.indexOf(name) < 0 )
+                  keys.push(name);
+              });
+              return keys;
+            },
+            getOwnPropertyDescriptor: function(target, name) {
+              load(target, name);
+              return Reflect.getOwnPropertyDescriptor(target, name);
+            }
+          });
+        }
+
+        function _lazyFeature(slot, id, generation)
+        {
+          var geometry = null;
+          var loaded = false;
+          var feature = {"type": "Feature", "id": id, "properties": _lazyProperties(slot, generation)};
+          Object.defineProperty(feature, 'geometry', {
+            get: function() {
+              if ( !loaded )
+              {
+                _lazyCheck(generation);
+                geometry = _featureSource.geometry(slot);
+                loaded = true;
+              }
+              return geometry;
+            },
+            set: function(value) {
+              geometry = value;
+              loaded = true;
+            },
+            enumerable: true,
+            configurable: true
+          });
+          Object.defineProperty(feature, '__lazyGeometrySlot', {
+            get: function() { return loaded ? -1 : slot; }
+          });
+          Object.defineProperty(feature, '__lazyGeneration', {value: generation});
+          return feature;
+        }
+        """ % STALE_FEATURE_ERROR
+
+
+class LazyFeatureSource(QObject):
+    """
+    Provides attribute values and geometries to lazy feature objects, when they are
+    first read by a script
+    """
+
+    def __init__(self, marshaller):
+        super().__init__()
+        # weak reference, so that marshallers (and their engines) are freed as soon as they are released
+        self.marshaller = weakref.proxy(marshaller)
+        self.features = []
+
+    @pyqtSlot(int, int, result=QJSValue)
+    def attribute(self, slot: int, index: int) -> QJSValue:
+        """
+        Returns the value of the attribute at index for the feature in the given slot
+        """
+        return self.marshaller.value_to_js(self.features[slot].attribute(self.marshaller.source_indices[index]))
+
+    @pyqtSlot(int, result=QJSValue)
+    def geometry(self, slot: int) -> QJSValue:
+        """
+        Returns the geometry of the feature in the given slot
+        """
+        return self.marshaller.geometry_to_js(self.features[slot].geometry())
+
+
+class FeatureMarshaller:  # pylint: disable=too-many-public-methods
+    """
+    Converts features directly to and from QJSValue objects, without any intermediate
+    GeoJSON text.
+
+    Features are presented to scripts using the same structure as GeoJSON features, with
+    geometries reprojected to EPSG:4326.
+
+    If lazy is True (and the engine supports Proxy objects), feature attributes and
+    geometries are only converted when they are first read by the script. Returned
+    features with a geometry which was never read reuse the input geometry directly.
+    Input features are only kept until the next call to the script, so lazy features
+    kept by a script from an earlier call raise an error when unread values are needed.
+
+    If source_fields is specified, input features use these fields and only the
+    attributes which are also present in the output fields are passed to scripts.
+
+    If precision is specified, coordinates are rounded to this number of decimal places.
+    """
+
+    JS_WRAPPER = """
+        function process(feature)
+        {
+          return func(feature);
+        }
+
+        function processBatch(features)
+        {
+          return funcBatch(features);
+        }
+        """
+
+    def __init__(self, engine, fields, source_crs, transform_context, lazy=True,  # pylint: disable=too-many-arguments
+                 source_fields=None, precision=None):
+        self.engine = engine
+        self.precision = precision
+        self.fields = fields
+        self.field_names = fields.names()
+        self.field_index = {name: i for i, name in enumerate(self.field_names)}
+        self.field_converters = [value_converter(field) for field in fields]
+        self.source_indices = source_field_indices(fields, source_fields if source_fields is not None else fields)
+        self.transform = None
+        if source_crs.isValid() and source_crs != GEOJSON_CRS:
+            self.transform = QgsCoordinateTransform(source_crs, GEOJSON_CRS, transform_context)
+
+        self.source = None
+        self.lazy_feature_function = None
+        self.generation = 0
+        if lazy and self.engine.evaluate('typeof Proxy').toString() == 'function':
+            self.source = LazyFeatureSource(self)
+            QQmlEngine.setObjectOwnership(self.source, QQmlEngine.CppOwnership)
+            self.engine.globalObject().setProperty('_featureSource', self.engine.newQObject(self.source))
+            self.engine.evaluate(LAZY_FEATURE_JS)
+            field_index = self.engine.globalObject().property('_lazyFieldIndex')
+            for i, name in enumerate(self.field_names):
+                field_index.setProperty(name, i)
+            self.lazy_feature_function = self.engine.globalObject().property('_lazyFeature')
+
+    def feature_to_js(self, feature: QgsFeature) -> QJSValue:
+        """
+        Converts a feature to a QJSValue GeoJSON-style feature object
+        """
+        if self.source is not None:
+            self.set_lazy_features([feature])
+        return self.feature_to_js_slot(feature, 0)
+
+    def feature_to_js_slot(self, feature: QgsFeature, slot: int) -> QJSValue:
+        """
+        Converts a feature to a QJSValue GeoJSON-style feature object, with the feature
+        stored in the specified lazy feature source slot
+        """
+        if self.lazy_feature_function is not None:
+            return self.lazy_feature_function.call([QJSValue(slot), self.value_to_js(feature.id()),
+                                                     QJSValue(self.generation)])
+
+        res = self.engine.newObject()
+        res.setProperty('type', 'Feature')
+        res.setProperty('id', self.value_to_js(feature.id()))
+
+        properties = self.engine.newObject()
+        attributes = feature.attributes()
+        for name, index in zip(self.field_names, self.source_indices):
+            properties.setProperty(name, self.value_to_js(attributes[index]))
+        res.setProperty('properties', properties)
+
+        res.setProperty('geometry', self.geometry_to_js(feature.geometry()))
+        return res
+
+    def features_to_js(self, features) -> QJSValue:
+        """
+        Converts a list of features to a QJSValue array of feature objects
+        """
+        if self.source is not None:
+            self.set_lazy_features(list(features))
+        res = self.engine.newArray(len(features))
+        for i, feature in enumerate(features):
+            res.setProperty(i, self.feature_to_js_slot(feature, i))
+        return res
+
+    def set_lazy_features(self, features: list):
+        """
+        Replaces the input features read by lazy feature objects, starting a new generation
+        so that lazy features from earlier calls no longer read from the replaced features
+        """
+        self.source.features = features
+        self.generation = (self.generation + 1) % INT32_MAX
+        self.engine.globalObject().setProperty('_lazyGeneration', QJSValue(self.generation))
+
+    def lazy_source_feature(self, value: QJSValue, slot: int) -> QgsFeature:
+        """
+        Returns the input feature for a lazy feature or properties object, raising a
+        QgsProcessingException if the object was passed to an earlier call
+        """
+        if value.property('__lazyGeneration').toInt() != self.generation:
+            raise QgsProcessingException(STALE_FEATURE_ERROR)
+        return self.source.features[slot]
+
+    def value_to_js(self, value) -> QJSValue:
+        """
+        Converts an attribute value to a QJSValue
+        """
+        return python_to_js(self.engine, value)
+
+    def geometry_to_js(self, geometry: QgsGeometry) -> QJSValue:
+        """
+        Converts a geometry to a QJSValue GeoJSON-style geometry object
+        """
+        if geometry.isNull():
+            return QJSValue(QJSValue.NullValue)
+
+        geometry = QgsGeometry(geometry)
+        if self.transform is not None:
+            geometry.transform(self.transform)
+        if QgsWkbTypes.isCurvedType(geometry.wkbType()):
+            geometry = QgsGeometry(geometry.constGet().segmentize())
+
+        return self.prepared_geometry_to_js(geometry)
+
+    def prepared_geometry_to_js(self, geometry: QgsGeometry) -> QJSValue:
+        """
+        Converts a reprojected, non-curved geometry to a QJSValue geometry object
+        """
+        return self.abstract_geometry_to_js(geometry.constGet())
+
+    def abstract_geometry_to_js(self, geometry) -> QJSValue:
+        """
+        Converts a QgsAbstractGeometry to a QJSValue GeoJSON-style geometry object
+        """
+        res = self.engine.newObject()
+        flat_type = QgsWkbTypes.flatType(geometry.wkbType())
+        if flat_type == QgsWkbTypes.GeometryCollection:
+            res.setProperty('type', 'GeometryCollection')
+            parts = self.engine.newArray(geometry.numGeometries())
+            for i in range(geometry.numGeometries()):
+                parts.setProperty(i, self.abstract_geometry_to_js(geometry.geometryN(i)))
+            res.setProperty('geometries', parts)
+            return res
+
+        res.setProperty('type', QgsWkbTypes.displayString(flat_type))
+        res.setProperty('coordinates', self.coordinates_to_js(geometry, flat_type))
+        return res
+
+    def coordinates_to_js(self, geometry, flat_type) -> QJSValue:
+        """
+        Converts the coordinates of a QgsAbstractGeometry to nested QJSValue arrays
+        """
+        if flat_type == QgsWkbTypes.Point:
+            return self.point_to_js(geometry)
+        if flat_type == QgsWkbTypes.LineString:
+            return self.points_to_js(geometry.points())
+        if flat_type == QgsWkbTypes.Polygon:
+            rings = [geometry.exteriorRing()] + [geometry.interiorRing(i) for i in
+                                                 range(geometry.numInteriorRings())]
+            res = self.engine.newArray(len(rings))
+            for i, ring in enumerate(rings):
+                res.setProperty(i, self.points_to_js(ring.points()))
+            return res
+
+        # multi part types
+        part_type = QgsWkbTypes.singleType(flat_type)
+        res = self.engine.newArray(geometry.numGeometries())
+        for i in range(geometry.numGeometries()):
+            res.setProperty(i, self.coordinates_to_js(geometry.geometryN(i), part_type))
+        return res
+
+    def points_to_js(self, points) -> QJSValue:
+        """
+        Converts a list of QgsPoint to a QJSValue array of positions
+        """
+        res = self.engine.newArray(len(points))
+        for i, point in enumerate(points):
+            res.setProperty(i, self.point_to_js(point))
+        return res
+
+    def point_to_js(self, point: QgsPoint) -> QJSValue:
+        """
+        Converts a QgsPoint to a QJSValue position array
+        """
+        coordinates = [point.x(), point.y(), point.z()] if point.is3D() else [point.x(), point.y()]
+        if self.precision is not None:
+            coordinates = [round(c, self.precision) for c in coordinates]
+        res = self.engine.newArray(len(coordinates))
+        for i, c in enumerate(coordinates):
+            res.setProperty(i, c)
+        return res
+
+    def features_from_js(self, res: QJSValue):
+        """
+        Converts a value returned by the script to a list of features
+        """
+        if result_is_empty(res):
+            return []
+        raise_for_error(res)
+
+        if res.isArray():
+            values = [res.property(i) for i in range(res.property('length').toInt())]
+        elif res.property('type').toString() == 'FeatureCollection':
+            features = res.property('features')
+            values = [features.property(i) for i in range(features.property('length').toInt())]
+        else:
+            values = [res]
+
+        return [self.feature_from_js(v) for v in values if not result_is_empty(v)]
+
+    def feature_from_js(self, value: QJSValue) -> QgsFeature:
+        """
+        Converts a QJSValue GeoJSON-style feature object to a QgsFeature
+        """
+        feature = QgsFeature(self.fields)
+        properties = value.property('properties')
+        if properties.isObject():
+            feature.setAttributes(self.attributes_from_js(properties))
+
+        lazy_slot = value.property('__lazyGeometrySlot')
+        if lazy_slot.isNumber() and lazy_slot.toInt() >= 0:
+            # geometry was never read by the script, so reuse the input geometry
+            feature.setGeometry(self.passthrough_geometry(self.lazy_source_feature(value, lazy_slot.toInt())))
+            return feature
+
+        geometry = self.geometry_from_js(value.property('geometry'))
+        if geometry is not None:
+            feature.setGeometry(geometry)
+        return feature
+
+    def attributes_from_js(self, properties: QJSValue) -> list:
+        """
+        Converts a QJSValue feature properties object to a list of attributes
+        """
+        changed = properties.property('__lazyTarget')
+        if not changed.isObject():
+            return self.set_attributes_from_variant([None] * len(self.field_names), properties.toVariant())
+
+        # only values which were read or set by the script exist in the lazy properties,
+        # everything else comes straight from the input feature
+        source_attributes = self.lazy_source_feature(properties,
+                                                     properties.property('__lazySlot').toInt()).attributes()
+        attributes = [source_attributes[index] for index in self.source_indices]
+        self.set_attributes_from_variant(attributes, changed.toVariant())
+        for name in properties.property('__lazyDeleted').toVariant():
+            attributes[self.field_index[name]] = None
+        return attributes
+
+    def set_attributes_from_variant(self, attributes: list, properties: dict) -> list:
+        """
+        Sets the values from a dictionary of properties returned by the script into
+        an attribute list, converting them to the output field types. Properties which
+        do not match an output field are ignored.
+        """
+        field_index = self.field_index
+        converters = self.field_converters
+        for name, value in properties.items():
+            index = field_index.get(name)
+            if index is not None:
+                attributes[index] = converters[index](value)
+        return attributes
+
+    def passthrough_geometry(self, feature: QgsFeature) -> QgsGeometry:
+        """
+        Returns the geometry from an input feature, reprojected for output
+        """
+        geometry = QgsGeometry(feature.geometry())
+        if self.transform is not None and not geometry.isNull():
+            geometry.transform(self.transform)
+        return geometry
+
+    def geometry_from_js(self, value: QJSValue):
+        """
+        Converts a QJSValue geometry object to a QgsGeometry, or returns None
+        if the value is not a geometry object
+        """
+        if not value.isObject():
+            return None
+        return self.geometry_from_variant(value.toVariant())
+
+    def geometry_from_variant(self, geometry: dict) -> QgsGeometry:
+        """
+        Converts a GeoJSON-style geometry dictionary to a QgsGeometry
+        """
+        geometry_type = geometry.get('type')
+        if geometry_type == 'GeometryCollection':
+            collection = QgsGeometryCollection()
+            for part in geometry.get('geometries') or []:
+                collection.addGeometry(self.geometry_from_variant(part).constGet().clone())
+            return QgsGeometry(collection)
+
+        coordinates = geometry.get('coordinates')
+        if coordinates is None:
+            return QgsGeometry()
+
+        res = self.abstract_geometry_from_coordinates(geometry_type, coordinates)
+        if res is None:
+            raise QgsProcessingException('Unsupported geometry type returned from script: {}'.format(geometry_type))
+        return QgsGeometry(res)
+
+    def abstract_geometry_from_coordinates(self, geometry_type: str, coordinates):  # pylint: disable=too-many-return-statements
+        """
+        Creates a QgsAbstractGeometry from a geometry type and nested coordinate lists
+        """
+        if geometry_type == 'Point':
+            return QgsPoint(*coordinates[:3])
+        if geometry_type == 'LineString':
+            return QgsLineString([QgsPoint(*c[:3]) for c in coordinates])
+        if geometry_type == 'Polygon':
+            polygon = QgsPolygon()
+            for i, ring_coordinates in enumerate(coordinates):
+                ring = self.abstract_geometry_from_coordinates('LineString', ring_coordinates)
+                if i == 0:
+                    polygon.setExteriorRing(ring)
+                else:
+                    polygon.addInteriorRing(ring)
+            return polygon
+
+        multi_types = {'MultiPoint': (QgsMultiPoint, 'Point'),
+                       'MultiLineString': (QgsMultiLineString, 'LineString'),
+                       'MultiPolygon': (QgsMultiPolygon, 'Polygon')}
+        if geometry_type in multi_types:
+            collection_class, part_type = multi_types[geometry_type]
+            collection = collection_class()
+            for part in coordinates:
+                collection.addGeometry(self.abstract_geometry_from_coordinates(part_type, part))
+            return collection
+
+        return None
+
+
+class FlatGeometryBridge(QObject):
+    """
+    Hands flat geometry buffers to scripts, where they are received as ArrayBuffer objects
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pending = None
+
+    @pyqtSlot(result=QByteArray)
+    def take(self) -> QByteArray:
+        """
+        Returns the pending geometry buffer
+        """
+        buffer = self.pending
+        self.pending = None
+        return buffer
+
+
+class FlatGeometryMarshaller(FeatureMarshaller):
+    """
+    Feature marshaller which presents geometries to scripts using flat typed arrays.
+
+    Geometry objects have 'type', 'wkbType' and 'stride' properties, with all
+    vertex ordinates in a 'coordinates' Float64Array and ring and part offsets
+    in 'rings' and 'parts' Int32Arrays, all viewing a single buffer. Scripts can
+    return geometries using the same layout, or as GeoJSON-style geometry objects.
+    Geometries which cannot be represented in the flat layout (such as
+    geometry collections) are always presented as GeoJSON-style objects.
+
+    Flat geometries are always transferred at full precision.
+    """
+
+    JS_WRAPPER = flat_geometry.JS_FUNCTIONS + """
+        function process(feature)
+        {
+          return _flatResult(func(feature));
+        }
+
+        function processBatch(features)
+        {
+          return _flatResult(funcBatch(features));
+        }
+        """
+
+    def __init__(self, engine, fields, source_crs, transform_context, lazy=True,  # pylint: disable=too-many-arguments
+                 source_fields=None, precision=None):
+        super().__init__(engine, fields, source_crs, transform_context, lazy, source_fields, precision)
+        self.bridge = FlatGeometryBridge()
+        QQmlEngine.setObjectOwnership(self.bridge, QQmlEngine.CppOwnership)
+        self.engine.globalObject().setProperty('_flatGeometryBridge', self.engine.newQObject(self.bridge))
+        self.decode_function = self.engine.evaluate(
+            '(function() { return _flatGeometry(_flatGeometryBridge.take()); })')
+
+    def prepared_geometry_to_js(self, geometry: QgsGeometry) -> QJSValue:
+        buffer = flat_geometry.wkb_to_flat(bytes(geometry.asWkb()))
+        if buffer is None:
+            return super().prepared_geometry_to_js(geometry)
+
+        self.bridge.pending = QByteArray(buffer)
+        return self.decode_function.call()
+
+    def geometry_from_js(self, value: QJSValue):
+        if not value.isObject():
+            return None
+
+        variant = value.toVariant()
+        if isinstance(variant, QByteArray):
+            geometry = QgsGeometry()
+            geometry.fromWkb(flat_geometry.flat_to_wkb(bytes(variant)))
+            return geometry
+
+        return self.geometry_from_variant(variant)
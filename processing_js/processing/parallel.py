@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    parallel.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import queue
+import threading
+from itertools import islice
+
+from qgis.core import (QgsProcessingException,
+                       QgsProcessingFeedback)
+
+# number of features sent to a worker at once, for scripts which are not batched
+DEFAULT_CHUNK_SIZE = 100
+
+
+def chunked(iterable, size: int):
+    """
+    Splits an iterable into lists of at most size items
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ForwardingFeedback(QgsProcessingFeedback):
+    """
+    Feedback used by a worker thread, which queues messages instead of reporting them
+    so that they can be passed to the algorithm's feedback from the main thread
+    """
+
+    def __init__(self, messages: queue.Queue):
+        super().__init__()
+        self.messages = messages
+
+    def setProgressText(self, text):  # pylint: disable=missing-docstring
+        self.messages.put(('setProgressText', (text,)))
+
+    def reportError(self, error, fatalError=False):  # pylint: disable=missing-docstring
+        self.messages.put(('reportError', (error, fatalError)))
+
+    def pushWarning(self, warning):  # pylint: disable=missing-docstring
+        self.messages.put(('pushWarning', (warning,)))
+
+    def pushInfo(self, info):  # pylint: disable=missing-docstring
+        self.messages.put(('pushInfo', (info,)))
+
+    def pushCommandInfo(self, info):  # pylint: disable=missing-docstring
+        self.messages.put(('pushCommandInfo', (info,)))
+
+    def pushDebugInfo(self, info):  # pylint: disable=missing-docstring
+        self.messages.put(('pushDebugInfo', (info,)))
+
+    def pushConsoleInfo(self, info):  # pylint: disable=missing-docstring
+        self.messages.put(('pushConsoleInfo', (info,)))
+
+
+class ScriptWorker(threading.Thread):
+    """
+    Worker thread which owns a ScriptRunner, and processes chunks of features from a task queue.
+
+    The runner is created by calling runner_factory with the worker's own feedback object.
+    """
+
+    def __init__(self, runner_factory, feedback: ForwardingFeedback,  # pylint: disable=too-many-arguments
+                 tasks: queue.Queue, results: queue.Queue, stop: threading.Event):
+        super().__init__(daemon=True)
+        self.runner_factory = runner_factory
+        self.feedback = feedback
+        self.tasks = tasks
+        self.results = results
+        self.stop = stop
+
+    def run(self):
+        runner = None
+        try:
+            # the engine must be created (and destroyed) within this thread
+            runner = self.runner_factory(self.feedback)
+            while True:
+                task = self.tasks.get()
+                if task is None:
+                    break
+
+                index, features = task
+                if self.stop.is_set():
+                    self.results.put((index, len(features), [], None))
+                    continue
+                self.results.put((index, len(features), runner.process_features(features), None))
+        except Exception as e:  # pylint: disable=broad-except
+            self.stop.set()
+            self.results.put((None, 0, None, e))
+        finally:
+            if runner is not None:
+                runner.release()
+            del runner
+
+
+class ParallelScriptExecutor:
+    """
+    Runs chunks of features through a pool of worker threads, each evaluating the
+    script in its own engine.
+
+    If ordered is True, output features are passed to the result handler in the
+    same order as the input chunks.
+
+    The runner_factory is called from each worker thread with a feedback object for
+    that worker. Messages pushed to a worker's feedback are passed on to the feedback
+    given to run() from the calling thread, so that feedback is never used from
+    several threads at once.
+    """
+
+    def __init__(self, thread_count: int, runner_factory, ordered: bool = True):
+        self.thread_count = thread_count
+        self.runner_factory = runner_factory
+        self.ordered = ordered
+        self.received = 0
+        self.next_index = 0
+        self.pending = {}
+
+    def run(self, chunks, feedback, handle_results):
+        """
+        Processes all chunks, calling handle_results with the list of output features
+        and number of input features for each processed chunk
+        """
+        tasks = queue.Queue()
+        results = queue.Queue()
+        messages = queue.Queue()
+        stop = threading.Event()
+        workers = [ScriptWorker(self.runner_factory, ForwardingFeedback(messages), tasks, results, stop)
+                   for _ in range(self.thread_count)]
+        for worker in workers:
+            worker.start()
+
+        self.received = 0
+        self.next_index = 0
+        self.pending = {}
+        submitted = 0
+        try:
+            for chunk in chunks:
+                if feedback.isCanceled() or stop.is_set():
+                    break
+
+                # limit the number of chunks held in memory
+                while submitted - self.received >= 2 * self.thread_count:
+                    self.collect(results.get(), handle_results)
+                    self.forward_feedback(messages, workers, feedback)
+
+                tasks.put((submitted, chunk))
+                submitted += 1
+
+            if feedback.isCanceled():
+                stop.set()
+            while self.received < submitted:
+                self.collect(results.get(), handle_results)
+                self.forward_feedback(messages, workers, feedback)
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            for _ in workers:
+                tasks.put(None)
+            for worker in workers:
+                worker.join()
+            # includes messages reported while the workers released their runners
+            self.forward_feedback(messages, workers, feedback)
+
+        # report errors from workers which failed before any chunks were submitted
+        while not results.empty():
+            self.collect(results.get(), handle_results)
+
+    @staticmethod
+    def forward_feedback(messages: queue.Queue, workers, feedback):
+        """
+        Passes messages queued by the workers to feedback, and cancels the workers'
+        feedback if feedback has been canceled
+        """
+        while True:
+            try:
+                method, args = messages.get_nowait()
+            except queue.Empty:
+                break
+            getattr(feedback, method)(*args)
+
+        if feedback.isCanceled():
+            for worker in workers:
+                if not worker.feedback.isCanceled():
+                    worker.feedback.cancel()
+
+    def collect(self, result, handle_results):
+        """
+        Handles a single result from a worker
+        """
+        index, count, features, error = result
+        if error is not None:
+            if isinstance(error, QgsProcessingException):
+                raise error
+            raise QgsProcessingException(str(error))
+
+        self.received += 1
+        if not self.ordered:
+            handle_results(features, count)
+            return
+
+        self.pending[index] = (features, count)
+        while self.next_index in self.pending:
+            handle_results(*self.pending.pop(self.next_index))
+            self.next_index += 1
@@ -18,7 +18,7 @@
 """
 
 import os
-from qgis.PyQt.QtCore import QCoreApplication
+from qgis.PyQt.QtCore import QCoreApplication, QFileSystemWatcher, QTimer
 from qgis.core import (Qgis,
                        QgsProcessingProvider,
                        QgsMessageLog)
@@ -30,20 +30,39 @@ from processing.gui.ProviderActions import (ProviderActions,
 from processing_js.processing.actions.create_new_script import CreateNewScriptAction
 from processing_js.processing.actions.edit_script import EditScriptAction
 from processing_js.processing.actions.delete_script import DeleteScriptAction
+from processing_js.processing.engine import EnginePool
 from processing_js.processing.exceptions import InvalidScriptException
+from processing_js.processing.manifest import ScriptManifest
 from processing_js.processing.utils import JsUtils
-from processing_js.processing.algorithm import JsAlgorithm
+from processing_js.processing.algorithm import create_algorithm
 from processing_js.gui.gui_utils import GuiUtils
 
 
-class JsAlgorithmProvider(QgsProcessingProvider):
+class JsAlgorithmProvider(QgsProcessingProvider):  # pylint: disable=too-many-public-methods
     """
-    Processing provider for executing Javascript scripts
+    Processing provider for executing Javascript scripts.
+
+    Once loaded, the script folders are watched for changes. Refreshing the provider
+    then only reads scripts which were added or changed since the last refresh, and
+    all other algorithms are recreated from their already parsed metadata.
     """
 
+    # delay after the last file system change before scripts are updated, so that
+    # bulk copies result in a single refresh
+    WATCHER_DELAY = 500
+
     def __init__(self):
         super().__init__()
         self.algs = []
+        self.engine_pool = EnginePool(JsUtils.DEFAULT_ENGINE_POOL_SIZE)
+        self.manifest = None
+        # real path -> (metadata lines, (modification time, size)) for each loaded script
+        self.scripts = {}
+        self.script_dirs = set()
+        self.scanned_folders = None
+        self.watcher = None
+        self.watcher_timer = None
+        self.pending_paths = set()
         self.actions = []
         create_script_action = CreateNewScriptAction()
         self.actions.append(create_script_action)
@@ -59,10 +78,44 @@ class JsAlgorithmProvider(QgsProcessingProvider):
             self.name(), JsUtils.SCRIPTS_FOLDER,
             self.tr('Javascript scripts folder'), JsUtils.default_scripts_folder(),
             valuetype=Setting.MULTIPLE_FOLDERS))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.BATCH_SIZE,
+            self.tr('Number of features per call for batched scripts'), JsUtils.DEFAULT_BATCH_SIZE,
+            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.THREADS,
+            self.tr('Number of threads for running scripts'), 1,
+            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.PROCESSES,
+            self.tr('Number of worker processes for running scripts'), 1,
+            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.PYTHON_EXECUTABLE,
+            self.tr('Python interpreter for worker processes'), JsUtils.default_python_executable(),
+            valuetype=Setting.FILE))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.ENGINE_POOL_SIZE,
+            self.tr('Number of idle script engines kept for reuse (0 to disable)'),
+            JsUtils.DEFAULT_ENGINE_POOL_SIZE,
+            valuetype=Setting.INT))
+        ProcessingConfig.addSetting(Setting(
+            self.name(), JsUtils.MEMO_SIZE,
+            self.tr('Number of results cached for pure scripts'), JsUtils.DEFAULT_MEMO_SIZE,
+            valuetype=Setting.INT))
 
         ProviderActions.registerProviderActions(self, self.actions)
         ProviderContextMenuActions.registerProviderContextMenuActions(self.contextMenuActions)
         ProcessingConfig.readSettings()
+
+        self.watcher = QFileSystemWatcher()
+        self.watcher.directoryChanged.connect(self.path_changed)
+        self.watcher.fileChanged.connect(self.path_changed)
+        self.watcher_timer = QTimer()
+        self.watcher_timer.setSingleShot(True)
+        self.watcher_timer.setInterval(self.WATCHER_DELAY)
+        self.watcher_timer.timeout.connect(self.process_pending_changes)
+
         self.refreshAlgorithms()
         return True
 
@@ -71,6 +124,19 @@ class JsAlgorithmProvider(QgsProcessingProvider):
         Called when unloading provider
         """
         ProcessingConfig.removeSetting(JsUtils.SCRIPTS_FOLDER)
+        ProcessingConfig.removeSetting(JsUtils.BATCH_SIZE)
+        ProcessingConfig.removeSetting(JsUtils.THREADS)
+        ProcessingConfig.removeSetting(JsUtils.PROCESSES)
+        ProcessingConfig.removeSetting(JsUtils.PYTHON_EXECUTABLE)
+        ProcessingConfig.removeSetting(JsUtils.ENGINE_POOL_SIZE)
+        ProcessingConfig.removeSetting(JsUtils.MEMO_SIZE)
+        self.clear_engine_pool()
+        if self.watcher_timer is not None:
+            self.watcher_timer.stop()
+            self.watcher_timer = None
+        self.watcher = None
+        self.scanned_folders = None
+        self.pending_paths = set()
         ProviderActions.deregisterProviderActions(self)
         ProviderContextMenuActions.deregisterProviderContextMenuActions(self.contextMenuActions)
 
@@ -114,13 +180,209 @@ class JsAlgorithmProvider(QgsProcessingProvider):
         """
         Called when provider must populate its available algorithms
         """
-        algs = []
-        for f in JsUtils.script_folders():
-            algs.extend(self.load_scripts_from_folder(f))
+        folders = JsUtils.script_folders()
+        if self.watcher is not None and folders == self.scanned_folders:
+            # only scripts which changed since the last refresh are read again
+            self.watcher_timer.stop()
+            self.apply_changes(self.take_pending_paths())
+            algs = self.algorithms_from_metadata()
+        else:
+            algs = self.scan_script_folders(folders)
 
         for a in algs:
             self.addAlgorithm(a)
 
+    def scan_script_folders(self, folders) -> list:
+        """
+        Loads all scripts from the script folders, returning the list of algorithms. If
+        the provider is watching for changes, the folders and scripts are watched.
+        """
+        if self.manifest is None:
+            self.manifest = ScriptManifest(JsUtils.manifest_path())
+        self.manifest.reset_statistics()
+        self.scripts = {}
+        self.script_dirs = set()
+
+        algs = []
+        for f in folders:
+            algs.extend(self.load_scripts_from_folder(f))
+
+        self.manifest.prune()
+        self.save_manifest()
+        QgsMessageLog.logMessage(
+            self.tr('Found {} Javascript scripts, {} loaded from cached metadata ({:.1f}% hit rate)').format(
+                self.manifest.hits + self.manifest.misses, self.manifest.hits, self.manifest.hit_rate()),
+            self.tr('Processing'), Qgis.Info)
+
+        if self.watcher is not None:
+            watched = self.watcher.directories() + self.watcher.files()
+            if watched:
+                self.watcher.removePaths(watched)
+            paths = sorted(self.script_dirs) + sorted(self.scripts.keys())
+            if paths:
+                self.watcher.addPaths(paths)
+            self.scanned_folders = folders
+        return algs
+
+    def algorithms_from_metadata(self) -> list:
+        """
+        Creates algorithms for all loaded scripts from their parsed metadata, without
+        reading the script files
+        """
+        algs = []
+        for path, (metadata, signature) in sorted(self.scripts.items()):
+            alg = create_algorithm(path, metadata=metadata)
+            alg.script_mtime = signature[0]
+            if alg.name().strip():
+                algs.append(alg)
+        return algs
+
+    def save_manifest(self):
+        """
+        Saves the script metadata manifest, logging any errors
+        """
+        try:
+            self.manifest.save()
+        except OSError as e:
+            QgsMessageLog.logMessage(self.tr('Could not save Javascript script cache: {}').format(e),
+                                     self.tr('Processing'), Qgis.Warning)
+
+    def path_changed(self, path):
+        """
+        Called when a watched script or folder changes. Changes are collected until
+        no further changes are reported for WATCHER_DELAY milliseconds.
+        """
+        self.pending_paths.add(path)
+        self.watcher_timer.start()
+
+    def take_pending_paths(self) -> set:
+        """
+        Returns and clears the set of changed paths which have not been processed yet
+        """
+        paths = self.pending_paths
+        self.pending_paths = set()
+        return paths
+
+    def process_pending_changes(self):
+        """
+        Updates the algorithms for all scripts and folders changed since the last update
+        """
+        self.update_scripts(self.take_pending_paths())
+
+    def update_scripts(self, paths) -> bool:
+        """
+        Updates the algorithms for changed script files or folders, refreshing the
+        provider if any script was added, changed or removed. Returns True if the
+        provider was refreshed.
+        """
+        if self.watcher is None or self.scanned_folders is None:
+            self.refreshAlgorithms()
+            return True
+
+        if not self.apply_changes(paths):
+            return False
+        self.refreshAlgorithms()
+        return True
+
+    def apply_changes(self, paths) -> bool:
+        """
+        Reads the scripts at or within changed paths, returning True if any script
+        was added, changed or removed
+        """
+        changed = False
+        watched_files = set(self.watcher.files())
+        for path in paths:
+            path = os.path.realpath(path)
+            if os.path.isdir(path):
+                changed = self.update_folder(path, watched_files) or changed
+            elif os.path.exists(path):
+                # scripts saved outside the script folders are not loaded
+                if os.path.dirname(path) in self.script_dirs and self.is_script_file(path):
+                    changed = self.update_script(path, watched_files) or changed
+            else:
+                changed = self.remove_scripts(path) or changed
+
+        if changed:
+            self.save_manifest()
+        return changed
+
+    def update_folder(self, folder, watched_files) -> bool:
+        """
+        Updates the scripts directly within a watched folder, scanning any new sub-folders.
+        Returns True if any script was added, changed or removed.
+        """
+        changed = False
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if os.path.isdir(path):
+                if path not in self.script_dirs:
+                    changed = self.add_folder(path, watched_files) or changed
+            elif self.is_script_file(name):
+                changed = self.update_script(path, watched_files) or changed
+
+        for path in [p for p in self.scripts if os.path.dirname(p) == folder and not os.path.exists(p)]:
+            changed = self.remove_scripts(path) or changed
+        return changed
+
+    def add_folder(self, folder, watched_files) -> bool:
+        """
+        Watches a new folder and loads the scripts it contains, returning True if any were found
+        """
+        changed = False
+        for path, _, files in os.walk(folder):
+            self.script_dirs.add(path)
+            self.watcher.addPath(path)
+            for name in files:
+                if self.is_script_file(name):
+                    changed = self.update_script(os.path.join(path, name), watched_files) or changed
+        return changed
+
+    def update_script(self, path, watched_files) -> bool:
+        """
+        Reads a new or changed script, returning True if the script was added or changed.
+        Scripts are considered changed if either their modification time or size differs.
+        """
+        path = os.path.realpath(path)
+        # files replaced by editors are no longer watched, so they are always watched again
+        if path not in watched_files:
+            self.watcher.addPath(path)
+            watched_files.add(path)
+
+        known = self.scripts.get(path)
+        signature = ScriptManifest.signature(path)
+        if known is not None and signature is not None and known[1] == signature:
+            return False
+
+        self.scripts.pop(path, None)
+        if self.try_load_script(path) is None:
+            return known is not None
+        return True
+
+    def remove_scripts(self, path) -> bool:
+        """
+        Removes a deleted script, or all scripts within a deleted folder, returning
+        True if any script was removed
+        """
+        removed = [p for p in self.scripts if p == path or p.startswith(path + os.sep)]
+        for p in removed:
+            del self.scripts[p]
+            self.manifest.remove(p)
+        self.script_dirs = {d for d in self.script_dirs if d != path and not d.startswith(path + os.sep)}
+        return bool(removed)
+
+    @staticmethod
+    def is_script_file(name) -> bool:
+        """
+        Returns True if a file name is a script
+        """
+        return name.lower().endswith('js')
+
+    def clear_engine_pool(self):
+        """
+        Discards all idle script engines kept for reuse
+        """
+        self.engine_pool.clear()
+
     def load_scripts_from_folder(self, folder):
         """
         Loads all scripts found under the specified sub-folder
@@ -130,21 +392,48 @@ class JsAlgorithmProvider(QgsProcessingProvider):
 
         algs = []
         for path, _, files in os.walk(folder):
+            self.script_dirs.add(os.path.realpath(path))
             for description_file in files:
-                if description_file.lower().endswith('js'):
-                    try:
-                        fullpath = os.path.join(path, description_file)
-                        alg = JsAlgorithm(fullpath)
-                        if alg.name().strip():
-                            algs.append(alg)
-                    except InvalidScriptException as e:
-                        QgsMessageLog.logMessage(e.msg, self.tr('Processing'), Qgis.Critical)
-                    except Exception as e:  # pylint: disable=broad-except
-                        QgsMessageLog.logMessage(
-                            self.tr('Could not load Javascript script: {0}\n{1}').format(description_file, str(e)),
-                            self.tr('Processing'), Qgis.Critical)
+                if self.is_script_file(description_file):
+                    alg = self.try_load_script(os.path.join(path, description_file))
+                    if alg is not None and alg.name().strip():
+                        algs.append(alg)
         return algs
 
+    def try_load_script(self, path):
+        """
+        Creates the algorithm for a script file, logging any errors. Returns None if
+        the script could not be loaded.
+        """
+        try:
+            return self.load_script(path)
+        except InvalidScriptException as e:
+            QgsMessageLog.logMessage(e.msg, self.tr('Processing'), Qgis.Critical)
+        except Exception as e:  # pylint: disable=broad-except
+            QgsMessageLog.logMessage(
+                self.tr('Could not load Javascript script: {0}\n{1}').format(os.path.basename(path), str(e)),
+                self.tr('Processing'), Qgis.Critical)
+        return None
+
+    def load_script(self, path):
+        """
+        Creates the algorithm for a script file, using the metadata cached in the
+        manifest if the file hasn't changed since it was last parsed
+        """
+        if self.manifest is None:
+            return create_algorithm(path)
+
+        signature = ScriptManifest.signature(path)
+        metadata = self.manifest.get(path, signature)
+        if metadata is not None:
+            alg = create_algorithm(path, metadata=metadata)
+            alg.script_mtime = signature[0]
+        else:
+            alg = create_algorithm(path)
+            self.manifest.put(path, signature, alg.metadata)
+        self.scripts[alg.description_file] = (alg.metadata, signature)
+        return alg
+
     def tr(self, string, context=''):
         """
         Translates a string
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    raster.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import math
+import os
+
+from qgis.core import (Qgis,
+                       QgsProcessingAlgorithm,
+                       QgsProcessingException,
+                       QgsProcessingParameterBand,
+                       QgsProcessingParameterDefinition,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterRasterDestination,
+                       QgsProcessingParameterRasterLayer,
+                       QgsRasterBlock,
+                       QgsRasterFileWriter,
+                       QgsRasterIterator)
+from qgis.PyQt.QtCore import QObject, QByteArray, pyqtSlot
+from PyQt5.QtQml import QJSValue, QQmlEngine
+
+from processing_js.processing.engine import RasterRunner
+from processing_js.processing.exceptions import InvalidScriptException
+from processing_js.processing.marshalling import python_to_js, raise_for_error
+from processing_js.processing.script import JsScriptMixin
+
+DATA_TYPE_FLOAT32 = 'float32'
+DATA_TYPE_FLOAT64 = 'float64'
+
+DATA_TYPES = {
+    DATA_TYPE_FLOAT32: Qgis.Float32,
+    DATA_TYPE_FLOAT64: Qgis.Float64,
+}
+
+# default maximum width and height of the tiles passed to scripts
+DEFAULT_TILE_SIZE = 512
+
+
+class RasterBlockBridge(QObject):
+    """
+    Hands raster block data to scripts, where it is received as an ArrayBuffer
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pending = None
+
+    @pyqtSlot(result=QByteArray)
+    def take(self) -> QByteArray:
+        """
+        Returns the pending block data
+        """
+        data = self.pending
+        self.pending = None
+        return data
+
+
+class RasterBlockMarshaller:
+    """
+    Converts raster blocks to and from script values.
+
+    Blocks are presented to scripts as objects with a 'data' typed array
+    (Float32Array or Float64Array, depending on data_type) holding the pixel
+    values row by row, plus 'width', 'height', 'noData' (or null if the band has
+    no nodata value) and the 'column' and 'row' of the block's top left pixel.
+
+    Scripts return a typed array or array of width * height values, or an object
+    with such a 'data' array. Returning nothing keeps the (possibly modified)
+    input data. Block data is shared between the QByteArray and the script's
+    ArrayBuffer rather than copied.
+    """
+
+    JS_WRAPPER = """
+        var _RASTER_ARRAYS = {"float32": Float32Array, "float64": Float64Array};
+
+        function _rasterBlock(buffer, width, height, column, row, noData, dataType)
+        {
+          return {"data": new _RASTER_ARRAYS[dataType](buffer),
+                  "width": width,
+                  "height": height,
+                  "column": column,
+                  "row": row,
+                  "noData": noData,
+                  "dataType": dataType};
+        }
+
+        function process(block)
+        {
+          var res = func(block);
+          if ( res === undefined || res === null )
+            res = block.data;
+          else if ( !ArrayBuffer.isView(res) && !Array.isArray(res) && res.data !== undefined )
+            res = res.data;
+
+          var ArrayType = _RASTER_ARRAYS[block.dataType];
+          if ( !( res instanceof ArrayType ) )
+            res = ArrayType.from(res);
+          if ( res.length != block.width * block.height )
+            throw new Error('Expected ' + block.width * block.height + ' values for block, got ' + res.length);
+          // views of part of a larger buffer are copied, whole buffers are returned as is
+          if ( res.byteOffset != 0 || res.byteLength != res.buffer.byteLength )
+            res = res.slice();
+          return res.buffer;
+        }
+        """
+
+    def __init__(self, engine, data_type: str, no_data=None):
+        self.engine = engine
+        self.data_type = data_type
+        self.qgis_data_type = DATA_TYPES[data_type]
+        self.no_data = no_data
+        self.bridge = RasterBlockBridge()
+        QQmlEngine.setObjectOwnership(self.bridge, QQmlEngine.CppOwnership)
+        self.engine.globalObject().setProperty('_rasterBlockBridge', self.engine.newQObject(self.bridge))
+        self.decode_function = self.engine.evaluate(
+            '(function(width, height, column, row, noData, dataType) { '
+            'return _rasterBlock(_rasterBlockBridge.take(), width, height, column, row, noData, dataType); })')
+
+    def block_to_js(self, block: QgsRasterBlock, column: int, row: int) -> QJSValue:
+        """
+        Converts a raster block, with its top left pixel at column and row, to a script value
+        """
+        if block.dataType() != self.qgis_data_type:
+            block.convert(self.qgis_data_type)
+        self.bridge.pending = block.data()
+        return self.decode_function.call([QJSValue(block.width()), QJSValue(block.height()),
+                                          QJSValue(column), QJSValue(row),
+                                          python_to_js(self.engine, self.no_data),
+                                          QJSValue(self.data_type)])
+
+    def block_from_js(self, res: QJSValue, width: int, height: int) -> QgsRasterBlock:
+        """
+        Converts the value returned by the 'process' wrapper to a raster block
+        """
+        raise_for_error(res)
+        data = res.toVariant()
+        if not isinstance(data, QByteArray):
+            raise QgsProcessingException('Script did not return raster data')
+
+        block = QgsRasterBlock(self.qgis_data_type, width, height)
+        block.setData(data)
+        if self.no_data is not None:
+            block.setNoDataValue(self.no_data)
+        return block
+
+
+class JsRasterAlgorithm(JsScriptMixin, QgsProcessingAlgorithm):
+    """
+    Javascript algorithm which processes a raster band block by block.
+
+    Scripts declare //#raster (or //#raster:float32|float64) and define func(block),
+    which is called for each tile of the input band with the block's pixel values
+    in a typed array of the declared type. See RasterBlockMarshaller for the block
+    structure. The returned values are written to a single band output raster with
+    the same extent, size and nodata value as the input band.
+
+    Larger tiles need fewer script calls, at the cost of more memory per call.
+    """
+
+    BAND = 'BAND'
+    TILE_SIZE = 'TILE_SIZE'
+
+    def __init__(self, description_file, script=None, metadata=None):
+        super().__init__(description_file, script=script, metadata=metadata)
+        self.band = 1
+        self.tile_size = DEFAULT_TILE_SIZE
+        self.no_data = None
+        self.raster_interface = None
+        self.raster_extent = None
+        self.raster_width = 0
+        self.raster_height = 0
+        self.raster_crs = None
+
+    def initAlgorithm(self, config=None):
+        """
+        Initializes the algorithm's input band and output raster, and the advanced
+        parameters for raster scripts
+        """
+        self.addParameter(QgsProcessingParameterRasterLayer('INPUT', self.tr('Input layer')))
+        self.addParameter(QgsProcessingParameterBand(self.BAND, self.tr('Band number'), 1, 'INPUT'))
+        self.addParameter(QgsProcessingParameterRasterDestination('OUTPUT', self.tr('Processed')))
+
+        tile_size = QgsProcessingParameterNumber(self.TILE_SIZE,
+                                                 self.tr('Maximum tile width and height (pixels)'),
+                                                 type=QgsProcessingParameterNumber.Integer,
+                                                 defaultValue=DEFAULT_TILE_SIZE, minValue=1)
+        tile_size.setFlags(tile_size.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(tile_size)
+
+    def internal_parameter_names(self):
+        return [self.BAND, self.TILE_SIZE]
+
+    def set_raster_type(self, argument):
+        """
+        Handles the //#raster directive, with an optional output data type
+        """
+        data_type = argument.lower().strip() or DATA_TYPE_FLOAT32
+        if data_type not in DATA_TYPES:
+            raise InvalidScriptException(self.tr('Unknown raster data type: {}').format(argument))
+        self.raster_type = data_type
+
+    def marshaller_class(self):
+        return RasterBlockMarshaller
+
+    def create_marshaller(self, engine):
+        return RasterBlockMarshaller(engine, self.raster_type, self.no_data)
+
+    def create_runner(self, feedback, pool=None) -> RasterRunner:
+        """
+        Creates a new raster runner for the prepared script
+        """
+        return RasterRunner(self.script_source, feedback, False, self.create_marshaller,
+                            parameters=self.script_parameters, pool=pool,
+                            globals_factory=self.create_global_objects,
+                            buffer_feedback=not self.raw_feedback)
+
+    def prepareAlgorithm(self, parameters, context, feedback):
+        """
+        Prepares the algorithm
+        """
+        self.prepare_script(parameters, context, feedback)
+
+        layer = self.parameterAsRasterLayer(parameters, 'INPUT', context)
+        if layer is None:
+            raise QgsProcessingException(self.invalidRasterError(parameters, 'INPUT'))
+        self.band = self.parameterAsInt(parameters, self.BAND, context)
+        self.tile_size = self.parameterAsInt(parameters, self.TILE_SIZE, context)
+
+        # the provider is cloned, as blocks are read in the algorithm's thread
+        self.raster_interface = layer.dataProvider().clone()
+        self.raster_extent = layer.extent()
+        self.raster_width = layer.width()
+        self.raster_height = layer.height()
+        self.raster_crs = layer.crs()
+        self.no_data = None
+        if self.raster_interface.sourceHasNoDataValue(self.band):
+            self.no_data = self.raster_interface.sourceNoDataValue(self.band)
+
+        self.prepare_runner(parameters, context, feedback)
+        return True
+
+    def run_script(self, parameters, context, feedback):
+        """
+        Runs the script over each tile of the input band, writing the results to the output raster
+        """
+        output_file = self.parameterAsOutputLayer(parameters, 'OUTPUT', context)
+        writer = QgsRasterFileWriter(output_file)
+        writer.setOutputProviderKey('gdal')
+        writer.setOutputFormat(QgsRasterFileWriter.driverForExtension(os.path.splitext(output_file)[1]) or 'GTiff')
+        provider = writer.createOneBandRaster(DATA_TYPES[self.raster_type], self.raster_width, self.raster_height,
+                                              self.raster_extent, self.raster_crs)
+        if provider is None or not provider.isValid():
+            raise QgsProcessingException(self.tr('Could not create raster output: {}').format(output_file))
+        if self.no_data is not None:
+            provider.setNoDataValue(1, self.no_data)
+        provider.setEditable(True)
+
+        iterator = QgsRasterIterator(self.raster_interface)
+        iterator.setMaximumTileWidth(self.tile_size)
+        iterator.setMaximumTileHeight(self.tile_size)
+        iterator.startRasterRead(self.band, self.raster_width, self.raster_height, self.raster_extent)
+        tile_count = math.ceil(self.raster_width / self.tile_size) * math.ceil(self.raster_height / self.tile_size)
+        step = 100.0 / tile_count if tile_count > 0 else 1
+
+        current = 0
+        while not feedback.isCanceled():
+            ok, _, _, block, column, row = iterator.readNextRasterPart(self.band)
+            if not ok:
+                break
+            provider.writeBlock(self.runner.process_block(block, column, row), 1, column, row)
+            current += 1
+            feedback.setProgress(current * step)
+
+        provider.setEditable(False)
+        return {'OUTPUT': output_file}
@@ -0,0 +1,838 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    script.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import os
+import json
+import re
+
+from qgis.core import (QgsProcessingException,
+                       QgsProcessingParameterRasterLayer,
+                       QgsProcessingParameterVectorLayer,
+                       QgsProcessingParameterExtent,
+                       QgsProcessingParameterCrs,
+                       QgsProcessingParameterField,
+                       QgsProcessingParameterNumber,
+                       QgsProcessingParameterEnum,
+                       QgsProcessingParameterBoolean,
+                       QgsProcessingParameterMultipleLayers,
+                       QgsProcessingParameterMapLayer,
+                       QgsProcessingParameterFeatureSource,
+                       QgsProcessingOutputDefinition,
+                       QgsProcessingParameterDefinition,
+                       QgsFeatureRequest,
+                       QgsExpression,
+                       QgsFields,
+                       QgsProcessingUtils)
+from qgis.PyQt.QtCore import QCoreApplication, QTextCodec
+
+from processing.core.parameters import getParameterFromString
+from processing_js.processing.engine import EnginePool
+from processing_js.processing.exceptions import InvalidScriptException
+from processing_js.processing.lookup import LookupTable, LookupObject
+from processing_js.processing.marshalling import (GeoJsonMarshaller,
+                                                 FeatureMarshaller,
+                                                 FlatGeometryMarshaller)
+from processing_js.processing.outputs import create_output_from_string
+from processing_js.processing.spatial import SpatialIndexTable, SpatialIndexObject
+from processing_js.processing.utils import JsUtils
+from processing_js.gui.gui_utils import GuiUtils
+
+# metadata directives without an argument, mapped to the attribute and value they set
+FLAG_DIRECTIVES = {
+    'batch': ('batch_mode', True),
+    'geojson': ('use_geojson', True),
+    'eager': ('lazy_features', False),
+    'no_geometry': ('uses_geometry', False),
+    # results are reused for features with the same attributes and geometry, so
+    # they must not depend on feature.id or on any state outside the feature
+    'pure': ('pure', True),
+    'raw_feedback': ('raw_feedback', True),
+}
+
+# metadata directives which take an argument, written as //#directive:argument, mapped
+# to the name of the method which handles the argument
+DIRECTIVES = {
+    'aggregate': 'set_aggregate_type',
+    'raster': 'set_raster_type',
+    'precision': 'set_precision',
+    'lookup': 'add_lookup',
+    'spatial_index': 'add_spatial_index',
+    'filter': 'set_filter_expression',
+    'uses_fields': 'set_used_fields',
+    'geometry_encoding': 'set_geometry_encoding',
+}
+
+# directives which can also be written without an argument, e.g. //#aggregate
+OPTIONAL_ARGUMENT_DIRECTIVES = ('aggregate', 'raster')
+
+# a string directive statement, such as 'use strict';
+STRING_DIRECTIVE = re.compile(r'''^(['"])[^'"]*\1;?$''')
+
+
+
+class JsScriptMixin:  # pylint: disable=too-many-public-methods
+    """
+    Script handling shared by the Javascript algorithms: reading scripts and their
+    metadata, passing parameter values, lookups and spatial indexes to scripts, and
+    creating the runners which execute scripts.
+
+    Mixed into the QGIS algorithm class each kind of script is based on.
+    """
+
+    GEOMETRY_ENCODING_GEOJSON = 'geojson'
+    GEOMETRY_ENCODING_FLAT = 'flat'
+
+    PRECISION = 'PRECISION'
+    THREADS = 'THREADS'
+    PRESERVE_ORDER = 'PRESERVE_ORDER'
+
+    def __init__(self, description_file, script=None, metadata=None):
+        super().__init__()
+
+        self.script = script
+        self.js_script = ''
+        self.metadata = []
+        self.codec = None
+        self.script_source = ''
+        self.script_parameters = {}
+        self.runner = None
+        self.batch_mode = False
+        self.aggregate_type = None
+        self.raster_type = None
+        self.batch_size = 0
+        self.use_geojson = False
+        self.geometry_encoding = self.GEOMETRY_ENCODING_GEOJSON
+        self.lazy_features = True
+        self.pure = False
+        self.raw_feedback = False
+        self.memo = None
+        self.used_fields = None
+        self.filter_expression = None
+        self.lookups = {}
+        self.lookup_tables = {}
+        self.spatial_indexes = {}
+        self.spatial_index_tables = {}
+        self.uses_geometry = True
+        self.source_fields = None
+        self.precision = None
+        self.run_precision = None
+        self.thread_count = 1
+        self.preserve_order = True
+        self.input_crs = None
+        self.transform_context = None
+        self.fields = None
+        self._name = ''
+        self._display_name = ''
+        self._group = ''
+        self.script_mtime = None
+        self.description_file = os.path.realpath(description_file) if description_file else None
+        self.error = None
+        self.commands = list()
+        self.is_user_script = False
+        if description_file:
+            self.is_user_script = not description_file.startswith(JsUtils.builtin_scripts_folder())
+
+        if self.description_file is not None:
+            self.load_from_file(script, metadata)
+        elif self.script is not None:
+            self.load_from_string()
+
+    def createInstance(self):
+        """
+        Returns a new instance of this algorithm
+        """
+        if self.description_file is not None:
+            # reuse the already read script unless the file has changed since
+            if self.script_mtime is not None and self.file_mtime() == self.script_mtime:
+                alg = type(self)(self.description_file, script=self.script, metadata=self.metadata)
+                alg.script_mtime = self.script_mtime
+                return alg
+            return type(self)(self.description_file)
+
+        return type(self)(description_file=None, script=self.script)
+
+    def icon(self):
+        """
+        Returns the algorithm's icon
+        """
+        return GuiUtils.get_icon("providerJS.svg")
+
+    def svgIconPath(self):
+        """
+        Returns a path to the algorithm's icon as a SVG file
+        """
+        return GuiUtils.get_icon_svg("providerJS.svg")
+
+    def name(self):
+        """
+        Internal unique id for algorithm
+        """
+        return self._name
+
+    def displayName(self):
+        """
+        User friendly display name
+        """
+        return self._display_name
+
+    def shortDescription(self):
+        """
+        Returns the path to the script file, for use in toolbox tooltips
+        """
+        return self.description_file
+
+    def group(self):
+        """
+        Returns the algorithm's group
+        """
+        return self._group
+
+    def groupId(self):
+        """
+        Returns the algorithm's group ID
+        """
+        return self._group
+
+    def load_from_string(self):
+        """
+        Load the algorithm from a string
+        """
+        lines = self.script.split('\n')
+        self._name = 'unnamedalgorithm'
+        self._display_name = self.tr('[Unnamed algorithm]')
+        self.parse_script(iter(lines))
+
+    def load_from_file(self, script=None, metadata=None):
+        """
+        Load the algorithm from a file. If script is specified it is used
+        as the previously read content of the file. Otherwise, if metadata is
+        specified it is used as the previously parsed metadata lines of the file,
+        or else only the metadata block at the start of the file is read.
+        In both cases the script body is only read by load_script().
+        """
+        filename = os.path.basename(self.description_file)
+        self._display_name = self._name
+        self._name = filename[:filename.rfind('.')]
+        self._display_name = self._name.replace('_', ' ')
+        if script is not None:
+            lines = [line.strip() for line in script.split('\n')]
+            self.parse_script(iter(lines))
+            return
+
+        if metadata is None:
+            self.script_mtime = self.file_mtime()
+            with open(self.description_file, 'r') as f:
+                metadata = self.read_metadata(f)
+                if not metadata:
+                    # no metadata block at the start of the script, so the whole script is
+                    # parsed for metadata lines placed after code
+                    f.seek(0)
+                    self.parse_script(line.strip() for line in f)
+                    return
+        self.error = None
+        self.metadata = list(metadata)
+        self.parse_metadata(self.metadata)
+        self.script = None
+        self.js_script = None
+
+    def file_mtime(self):
+        """
+        Returns the modification time of the script file, or None if it can't be read
+        """
+        try:
+            return os.path.getmtime(self.description_file)
+        except OSError:
+            return None
+
+    def parse_script(self, lines):
+        """
+        Parse the lines from an JS script, initializing parameters and outputs as encountered
+        """
+        self.error = None
+        self.script, self.metadata, self.js_script = self.split_script(lines)
+        self.parse_metadata(self.metadata)
+
+    def parse_metadata(self, metadata):
+        """
+        Processes a list of metadata lines, initializing parameters and outputs
+        """
+        for line in metadata:
+            try:
+                self.process_metadata_line(line)
+            except InvalidScriptException as e:
+                self.error = e.msg
+            except Exception:  # pylint: disable=broad-except
+                self.error = self.tr('This script has a syntax error.\n'
+                                     'Problem with line: {0}').format(line)
+
+    @staticmethod
+    def split_script(lines):
+        """
+        Splits the lines from a JS script into the script text, the list of
+        metadata (//#) lines and the script body
+        """
+        script = ''
+        metadata = []
+        js_script_lines = list()
+        ender = 0
+        try:
+            line = next(lines).strip('\n').strip('\r')
+        except StopIteration:
+            return script, metadata, ''
+        while ender < 10:
+            if line.startswith('//#'):
+                metadata.append(line)
+            else:
+                if line == '':
+                    ender += 1
+                else:
+                    ender = 0
+                js_script_lines.append(line)
+            script += line + '\n'
+            try:
+                line = next(lines).strip('\n').strip('\r')
+            except StopIteration:
+                break
+        return script, metadata, '\n'.join(js_script_lines)
+
+    @staticmethod
+    def read_metadata(lines) -> list:
+        """
+        Reads the metadata (//#) lines from the start of a script, stopping at the
+        first line of code. Comments and string directives such as 'use strict'
+        are skipped.
+        """
+        metadata = []
+        in_comment = False
+        for line in lines:
+            line = line.strip()
+            if in_comment:
+                in_comment = '*/' not in line
+            elif line.startswith('//#'):
+                metadata.append(line)
+            elif line.startswith('/*'):
+                in_comment = '*/' not in line[2:]
+            elif line and not line.startswith('//') and not STRING_DIRECTIVE.match(line):
+                break
+        return metadata
+
+    def load_script(self, feedback=None):
+        """
+        Reads the script body, for algorithms which were registered from the script's
+        metadata only.
+
+        Raises a QgsProcessingException if the metadata in the file no longer matches
+        the metadata the algorithm was created from, as the algorithm's parameters
+        would be out of date.
+        """
+        if self.js_script is not None:
+            return
+
+        mtime = self.file_mtime()
+        with open(self.description_file, 'r') as f:
+            self.script, metadata, self.js_script = self.split_script(line.strip() for line in f)
+
+        if metadata != self.metadata:
+            self.script = None
+            self.js_script = None
+            if self.script_mtime is not None and mtime != self.script_mtime:
+                raise QgsProcessingException(self.tr('Script {} has been changed since it was loaded. '
+                                                     'Please reload the script.').format(self.description_file))
+            raise QgsProcessingException(self.tr('Metadata (//#) lines in {} must be placed before '
+                                                 'the script code').format(self.description_file))
+
+        if feedback is not None and self.script_mtime is not None and mtime != self.script_mtime:
+            feedback.pushInfo(self.tr('Script {} has been changed since it was loaded, '
+                                      'running the current version').format(self.description_file))
+        self.script_mtime = mtime
+
+    def process_metadata_line(self, line):
+        """
+        Processes a "metadata" (##) line
+        """
+        line = line.replace('//#', '')
+
+        flag = FLAG_DIRECTIVES.get(line.lower().strip())
+        if flag is not None:
+            setattr(self, *flag)
+            return
+
+        directive, separator, argument = line.partition(':')
+        directive = directive.lower().strip()
+        if directive in DIRECTIVES:
+            if not separator and directive not in OPTIONAL_ARGUMENT_DIRECTIVES:
+                raise InvalidScriptException(
+                    self.tr('Directive {0} requires an argument, written as //#{0}:argument').format(directive))
+            getattr(self, DIRECTIVES[directive])(argument)
+            return
+
+        value, type_ = self.split_tokens(line)
+        if value.lower().strip() in DIRECTIVES:
+            raise InvalidScriptException(
+                self.tr('Ambiguous line //#{0}. Directives are written as //#{1}:argument, '
+                        'parameters can not be named {1}').format(line, value.lower().strip()))
+        if type_.lower().strip() == 'group':
+            self._group = value
+        elif type_.lower().strip() == 'name':
+            self._name = self._display_name = value
+            self._name = JsUtils.strip_special_characters(self._name.lower())
+        else:
+            self.process_parameter_line(line)
+
+    def set_aggregate_type(self, argument):
+        """
+        Handles the //#aggregate directive, with an optional result type. Result
+        types are checked by JsAggregateAlgorithm.
+        """
+        self.aggregate_type = argument.lower().strip()
+
+    def set_raster_type(self, argument):
+        """
+        Handles the //#raster directive, with an optional output data type. Data
+        types are checked by JsRasterAlgorithm.
+        """
+        self.raster_type = argument.lower().strip()
+
+    def set_precision(self, argument):
+        """
+        Handles the //#precision directive
+        """
+        self.precision = int(argument)
+        if not 0 <= self.precision <= 17:
+            raise InvalidScriptException(self.tr('Invalid coordinate precision: {}').format(argument))
+
+    def add_lookup(self, argument):
+        """
+        Handles a //#lookup:layer,key_field[,name] directive
+        """
+        tokens = [t.strip() for t in argument.split(',')]
+        if len(tokens) not in (2, 3) or not all(tokens):
+            raise InvalidScriptException(self.tr('Invalid lookup: {}').format(argument))
+        name = tokens[2] if len(tokens) == 3 else 'lookup'
+        self.lookups[name] = (tokens[0], tokens[1])
+
+    def add_spatial_index(self, argument):
+        """
+        Handles a //#spatial_index:layer[,name] directive
+        """
+        tokens = [t.strip() for t in argument.split(',')]
+        if len(tokens) not in (1, 2) or not all(tokens):
+            raise InvalidScriptException(self.tr('Invalid spatial index: {}').format(argument))
+        name = tokens[1] if len(tokens) == 2 else 'spatial'
+        self.spatial_indexes[name] = tokens[0]
+
+    def set_filter_expression(self, argument):
+        """
+        Handles the //#filter directive
+        """
+        expression = QgsExpression(argument.strip())
+        if expression.hasParserError():
+            raise InvalidScriptException(self.tr('Invalid filter expression: {}').format(
+                expression.parserErrorString()))
+        self.filter_expression = argument.strip()
+
+    def set_used_fields(self, argument):
+        """
+        Handles the //#uses_fields directive
+        """
+        self.used_fields = [f.strip() for f in argument.split(',') if f.strip()]
+
+    def set_geometry_encoding(self, argument):
+        """
+        Handles the //#geometry_encoding directive
+        """
+        encoding = argument.lower().strip()
+        if encoding not in (self.GEOMETRY_ENCODING_GEOJSON, self.GEOMETRY_ENCODING_FLAT):
+            raise InvalidScriptException(self.tr('Unknown geometry encoding: {}').format(argument))
+        self.geometry_encoding = encoding
+
+    @staticmethod
+    def split_tokens(line):
+        """
+        Attempts to split a line into tokens
+        """
+        tokens = line.split('=')
+        return tokens[0], tokens[1]
+
+    def process_parameter_line(self, line):
+        """
+        Processes a single script line representing a parameter
+        """
+        value, _ = self.split_tokens(line)
+        description = JsUtils.create_descriptive_name(value)
+
+        output = create_output_from_string(line)
+        if output is not None:
+            output.setName(value)
+            output.setDescription(description)
+            if issubclass(output.__class__, QgsProcessingOutputDefinition):
+                self.addOutput(output)
+            else:
+                # destination type parameter
+                self.addParameter(output)
+        else:
+            line = JsUtils.upgrade_parameter_line(line)
+            param = getParameterFromString(line)
+            if param is not None:
+                self.addParameter(param)
+            else:
+                self.error = self.tr('This script has a syntax error.\n'
+                                     'Problem with line: {0}').format(line)
+
+    def init_execution_parameters(self):
+        """
+        Adds the advanced parameters controlling how the script is run
+        """
+        precision = QgsProcessingParameterNumber(self.PRECISION,
+                                                 self.tr('Coordinate precision (decimal places)'),
+                                                 QgsProcessingParameterNumber.Integer,
+                                                 defaultValue=self.precision,
+                                                 optional=True, minValue=0, maxValue=17)
+        precision.setFlags(precision.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(precision)
+
+        threads = QgsProcessingParameterNumber(self.THREADS,
+                                               self.tr('Number of threads (defaults to provider setting)'),
+                                               QgsProcessingParameterNumber.Integer,
+                                               optional=True, minValue=1)
+        threads.setFlags(threads.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(threads)
+
+        preserve_order = QgsProcessingParameterBoolean(self.PRESERVE_ORDER,
+                                                       self.tr('Preserve input feature order'),
+                                                       defaultValue=True)
+        preserve_order.setFlags(preserve_order.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(preserve_order)
+
+    def internal_parameter_names(self):
+        """
+        Returns the names of parameters which are handled by the provider, and are not
+        passed to scripts
+        """
+        return [self.PRECISION, self.THREADS, self.PRESERVE_ORDER]
+
+    def select_fields(self, fields):
+        """
+        Returns the fields passed to the script, which are restricted to the fields
+        declared by //#uses_fields if present
+        """
+        self.source_fields = fields
+        if self.used_fields is None:
+            self.fields = fields
+        else:
+            self.fields = QgsFields()
+            for name in self.used_fields:
+                index = fields.lookupField(name)
+                if index >= 0:
+                    self.fields.append(fields.at(index))
+        return self.fields
+
+    def request(self):
+        """
+        Returns the feature request used to fetch input features, restricted to the
+        attributes and geometry declared as used by the script, and to features
+        matching the script's filter expression. Providers which can compile the
+        expression will only return matching features.
+        """
+        request = QgsFeatureRequest()
+        if not self.uses_geometry:
+            request.setFlags(QgsFeatureRequest.NoGeometry)
+        if self.used_fields is not None and self.source_fields is not None:
+            request.setSubsetOfAttributes(self.fields.names(), self.source_fields)
+        self.filter_request(request)
+        return request
+
+    def filter_request(self, request):
+        """
+        Restricts a feature request to the features matching the script's filter expression
+        """
+        if self.filter_expression:
+            request.setFilterExpression(self.filter_expression)
+
+    def prepare_script(self, parameters, context, feedback):
+        """
+        Reads the script body and the values of the script's parameters
+        """
+        self.load_script(feedback)
+        # parameters are injected as typed globals, so the source is the same for every run
+        self.script_source = self.script_wrapper() + self.js_script
+        self.script_parameters = self.script_parameter_values(parameters, context)
+        self.batch_size = JsUtils.batch_size() if self.batch_mode else 0
+
+    def prepare_source(self, source, context, feedback):
+        """
+        Prepares the fields and CRS used to convert features from the input source
+        """
+        fields = self.select_fields(source.fields())
+        if self.used_fields is not None:
+            for name in self.used_fields:
+                if fields.lookupField(name) < 0:
+                    feedback.reportError(self.tr('Field {} declared by uses_fields does not exist').format(name))
+
+        self.input_crs = source.sourceCrs()
+        self.transform_context = context.transformContext()
+        self.codec = QTextCodec.codecForName("System")
+
+    def prepare_execution(self, parameters, context):
+        """
+        Reads the advanced parameters added by init_execution_parameters
+        """
+        self.run_precision = self.precision
+        if parameters.get(self.PRECISION) is not None:
+            self.run_precision = self.parameterAsInt(parameters, self.PRECISION, context)
+
+        self.thread_count = JsUtils.thread_count()
+        if parameters.get(self.THREADS) is not None:
+            self.thread_count = self.parameterAsInt(parameters, self.THREADS, context)
+        self.preserve_order = self.parameterAsBool(parameters, self.PRESERVE_ORDER, context)
+
+    def prepare_runner(self, parameters, context, feedback):
+        """
+        Builds the lookups and spatial indexes used by the script, and creates the main runner
+        """
+        self.build_lookup_tables(parameters, context, feedback)
+        self.build_spatial_indexes(parameters, context, feedback)
+
+        # the main runner validates the script, and is used for single threaded execution
+        self.runner = self.create_runner(feedback, self.engine_pool())
+        if self.runner.reused:
+            feedback.pushDebugInfo(self.tr('Reusing script engine from pool'))
+
+    def build_lookup_tables(self, parameters, context, feedback):
+        """
+        Builds the lookup tables declared by //#lookup directives. The layer for each table is
+        either the name of one of the script's parameters or a layer source.
+        """
+        self.lookup_tables = {}
+        for name, (layer, key_field) in self.lookups.items():
+            source = self.secondary_source(layer, parameters, context)
+            table = LookupTable(name, source, key_field)
+            feedback.pushInfo(self.tr('Built lookup {} with {} keys in {:.1f} ms, using approximately {:.1f} MB').format(
+                name, len(table), table.build_time * 1000, table.memory_usage() / 1048576))
+            if table.duplicates:
+                feedback.reportError(self.tr('Lookup {} skipped {} features with duplicate or null keys').format(
+                    name, table.duplicates))
+            self.lookup_tables[name] = table
+
+    def build_spatial_indexes(self, parameters, context, feedback):
+        """
+        Builds the spatial indexes declared by //#spatial_index directives. The layer for each index
+        is either the name of one of the script's parameters or a layer source.
+        """
+        self.spatial_index_tables = {}
+        for name, layer in self.spatial_indexes.items():
+            source = self.secondary_source(layer, parameters, context)
+            table = SpatialIndexTable(name, source, context.transformContext())
+            feedback.pushInfo(self.tr('Built spatial index {} with {} features in {:.1f} ms').format(
+                name, len(table), table.build_time * 1000))
+            self.spatial_index_tables[name] = table
+
+    def secondary_source(self, layer, parameters, context):
+        """
+        Returns the feature source for a secondary layer referenced by a directive, which is
+        either the name of one of the script's parameters or a layer source
+        """
+        if self.parameterDefinition(layer) is not None:
+            source = self.parameterAsSource(parameters, layer, context)
+        else:
+            source = QgsProcessingUtils.mapLayerFromString(layer, context)
+        if source is None:
+            raise QgsProcessingException(self.tr('Could not load layer {}').format(layer))
+        return source
+
+    def create_global_objects(self, engine) -> dict:
+        """
+        Creates the objects exposed to scripts as globals, for a single engine
+        """
+        objects = {name: LookupObject(table, engine) for name, table in self.lookup_tables.items()}
+        objects.update({name: SpatialIndexObject(table, engine)
+                        for name, table in self.spatial_index_tables.items()})
+        return objects
+
+    def script_parameter_values(self, parameters, context) -> dict:
+        """
+        Returns the values of the script's parameters, converted to plain Python values
+        which can be set as properties of a script engine's global object
+        """
+        values = {}
+        for param in self.parameterDefinitions():
+            if param.isDestination() or param.name() in self.internal_parameter_names():
+                continue
+            values[param.name()] = self.script_parameter_value(param, parameters, context)
+        return values
+
+    def script_parameter_value(self, param, parameters, context):  # pylint: disable=too-many-return-statements
+        """
+        Returns the value of a single parameter as a plain Python value
+        """
+        name = param.name()
+        if parameters.get(name) is None:
+            return None
+
+        if isinstance(param, QgsProcessingParameterBoolean):
+            return self.parameterAsBool(parameters, name, context)
+        if isinstance(param, QgsProcessingParameterNumber):
+            if param.dataType() == QgsProcessingParameterNumber.Integer:
+                return self.parameterAsInt(parameters, name, context)
+            return self.parameterAsDouble(parameters, name, context)
+        if isinstance(param, QgsProcessingParameterEnum):
+            if param.allowMultiple():
+                return self.parameterAsEnums(parameters, name, context)
+            return self.parameterAsEnum(parameters, name, context)
+        if isinstance(param, QgsProcessingParameterField) and param.allowMultiple():
+            return self.parameterAsFields(parameters, name, context)
+        if isinstance(param, QgsProcessingParameterExtent):
+            extent = self.parameterAsExtent(parameters, name, context)
+            return {'xmin': extent.xMinimum(), 'ymin': extent.yMinimum(),
+                    'xmax': extent.xMaximum(), 'ymax': extent.yMaximum(),
+                    'crs': self.parameterAsExtentCrs(parameters, name, context).authid()}
+        if isinstance(param, QgsProcessingParameterCrs):
+            return self.crs_to_value(self.parameterAsCrs(parameters, name, context))
+        if isinstance(param, QgsProcessingParameterMultipleLayers):
+            return [self.layer_to_value(layer) for layer in self.parameterAsLayerList(parameters, name, context)]
+        if isinstance(param, (QgsProcessingParameterMapLayer, QgsProcessingParameterFeatureSource,
+                              QgsProcessingParameterVectorLayer, QgsProcessingParameterRasterLayer)):
+            return self.layer_to_value(self.parameterAsLayer(parameters, name, context))
+        return self.parameterAsString(parameters, name, context)
+
+    @staticmethod
+    def crs_to_value(crs) -> dict:
+        """
+        Converts a CRS to a plain Python value for scripts
+        """
+        if not crs.isValid():
+            return None
+        return {'authid': crs.authid(),
+                'description': crs.description(),
+                'wkt': crs.toWkt()}
+
+    @staticmethod
+    def layer_to_value(layer) -> dict:
+        """
+        Converts a map layer to a plain Python value for scripts
+        """
+        if layer is None:
+            return None
+        return {'id': layer.id(),
+                'name': layer.name(),
+                'source': layer.source(),
+                'crs': layer.crs().authid()}
+
+    def script_wrapper(self) -> str:
+        """
+        Returns the source evaluated before the script, defining the functions called by the runner
+        """
+        return self.marshaller_class().JS_WRAPPER
+
+    def engine_pool(self):
+        """
+        Returns the provider's pool of warm engines, or None if the algorithm
+        is not attached to a provider
+        """
+        pool = getattr(self.provider(), 'engine_pool', None)
+        if not isinstance(pool, EnginePool):
+            return None
+        pool.set_max_size(JsUtils.engine_pool_size())
+        return pool
+
+    def create_marshaller(self, engine):
+        """
+        Creates the marshaller for converting features to and from values in a script engine
+        """
+        marshaller_class = self.marshaller_class()
+        if marshaller_class is GeoJsonMarshaller:
+            return GeoJsonMarshaller(self.fields, self.input_crs, self.codec,
+                                     source_fields=self.source_fields,
+                                     precision=self.run_precision)
+
+        return marshaller_class(engine, self.fields, self.input_crs,
+                                self.transform_context, lazy=self.lazy_features,
+                                source_fields=self.source_fields,
+                                precision=self.run_precision)
+
+    def marshaller_class(self):
+        """
+        Returns the class used to convert features to and from script values.
+
+        The //#geojson fallback takes precedence over any declared geometry encoding.
+        """
+        if self.use_geojson:
+            return GeoJsonMarshaller
+        if self.geometry_encoding == self.GEOMETRY_ENCODING_FLAT:
+            return FlatGeometryMarshaller
+        return FeatureMarshaller
+
+    def processAlgorithm(self, parameters, context, feedback):
+        """
+        Runs the script, reporting any buffered script messages even if the run fails or
+        is canceled. The engine is only returned to the pool by postProcessAlgorithm,
+        which is called for successful runs.
+        """
+        try:
+            return self.run_script(parameters, context, feedback)
+        finally:
+            if self.runner is not None:
+                self.runner.finish_feedback()
+
+    def run_script(self, parameters, context, feedback):
+        """
+        Runs the prepared script, returning the algorithm's results
+        """
+        raise NotImplementedError
+
+    def postProcessAlgorithm(self, context, feedback):
+        """
+        Returns the engine used by a successful run to the provider's pool, and reports
+        how effective result memoisation was
+        """
+        if self.memo is not None:
+            lookups = self.memo.hits + self.memo.misses
+            feedback.pushInfo(self.tr('Pure script result cache: {} hits, {} misses ({:.1f}% hit rate)').format(
+                self.memo.hits, self.memo.misses, 100.0 * self.memo.hits / lookups if lookups else 0))
+            self.memo = None
+        if self.runner is not None:
+            self.runner.release()
+            self.runner = None
+        return {}
+
+    def shortHelpString(self):
+        """
+        Returns the algorithms helper string
+        """
+        if self.description_file is None:
+            return ''
+
+        help_file = self.description_file + '.help'
+        print(help_file)
+        if os.path.exists(help_file):
+            with open(help_file) as f:
+                descriptions = json.load(f)
+
+            return QgsProcessingUtils.formatHelpMapAsHtml(descriptions, self)
+
+        return ''
+
+    def tr(self, string, context=''):
+        """
+        Translates a string
+        """
+        if context == '':
+            context = 'JsAlgorithmProvider'
+        return QCoreApplication.translate(context, string)
+
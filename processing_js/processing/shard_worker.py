@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    shard_worker.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+
+Entry point for headless worker processes which run a single shard of a
+Javascript script's input. Started by ShardedScriptExecutor with the path to a
+JSON shard specification:
+
+    python -m processing_js.processing.shard_worker <spec.json>
+"""
+
+import json
+import os
+import sys
+
+from qgis.core import (QgsApplication,
+                       QgsProcessingContext,
+                       QgsProcessingFeedback)
+
+from processing_js.processing.sharding import (format_message,
+                                               MESSAGE_PROGRESS,
+                                               MESSAGE_INFO,
+                                               MESSAGE_ERROR)
+
+
+def send(kind: str, message):
+    """
+    Sends a message to the parent process
+    """
+    sys.stdout.write(format_message(kind, message))
+    sys.stdout.flush()
+
+
+class ShardFeedback(QgsProcessingFeedback):
+    """
+    Feedback object which forwards all messages and progress to the parent process
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.progressChanged.connect(lambda progress: send(MESSAGE_PROGRESS, progress))
+
+    def pushInfo(self, info):  # pylint: disable=missing-docstring
+        send(MESSAGE_INFO, info)
+
+    def pushDebugInfo(self, info):  # pylint: disable=missing-docstring
+        send(MESSAGE_INFO, info)
+
+    def pushCommandInfo(self, info):  # pylint: disable=missing-docstring
+        send(MESSAGE_INFO, info)
+
+    def pushConsoleInfo(self, info):  # pylint: disable=missing-docstring
+        send(MESSAGE_INFO, info)
+
+    def reportError(self, error, fatalError=False):  # pylint: disable=missing-docstring,unused-argument
+        send(MESSAGE_ERROR, error)
+
+
+def run_shard(spec: dict) -> bool:
+    """
+    Runs the script over a single shard, returning True if successful
+    """
+    # imported here, after the processing plugin has been added to the path
+    from processing.core.ProcessingConfig import ProcessingConfig, Setting  # pylint: disable=import-outside-toplevel
+    from processing_js.processing.algorithm import JsAlgorithm  # pylint: disable=import-outside-toplevel
+
+    for name, value in spec.get('settings', {}).items():
+        ProcessingConfig.addSetting(Setting('Javascript', name, name, value))
+
+    if spec.get('script_file'):
+        alg = JsAlgorithm(spec['script_file'])
+    else:
+        alg = JsAlgorithm(description_file=None, script=spec['script'])
+    alg.initAlgorithm()
+    alg.shard_fids = spec.get('fids')
+    alg.shard_extent = spec.get('extent')
+    alg.shard_null_geometries = spec.get('null_geometries', False)
+
+    context = QgsProcessingContext()
+    feedback = ShardFeedback()
+    _, ok = alg.run(spec['parameters'], context, feedback)
+    return ok
+
+
+def main(argv) -> int:
+    """
+    Worker entry point
+    """
+    with open(argv[1]) as f:
+        spec = json.load(f)
+
+    app = QgsApplication([], False)
+    app.initQgis()
+    sys.path.append(os.path.join(QgsApplication.pkgDataPath(), 'python', 'plugins'))
+    try:
+        return 0 if run_shard(spec) else 1
+    except Exception as e:  # pylint: disable=broad-except
+        send(MESSAGE_ERROR, str(e))
+        return 1
+    finally:
+        app.exitQgis()
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    sharding.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+from qgis.core import QgsProcessingException
+
+# prefixes used by shard workers when reporting back to the parent process
+MESSAGE_PROGRESS = 'progress'
+MESSAGE_INFO = 'info'
+MESSAGE_ERROR = 'error'
+
+
+def split_evenly(values: list, count: int) -> list:
+    """
+    Splits a list into at most count contiguous, non-empty lists of similar size
+    """
+    count = max(1, min(count, len(values)))
+    size, remainder = divmod(len(values), count)
+    res = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < remainder else 0)
+        res.append(values[start:end])
+        start = end
+    return [r for r in res if r]
+
+
+def split_extent(x_min: float, x_max: float, count: int) -> list:
+    """
+    Splits an x range into count vertical strips, returned as (start, end) tuples
+    """
+    width = (x_max - x_min) / count
+    return [(x_min + i * width, x_max if i == count - 1 else x_min + (i + 1) * width)
+            for i in range(count)]
+
+
+def format_message(kind: str, message) -> str:
+    """
+    Formats a message sent from a shard worker to the parent process
+    """
+    return '{}:{}\n'.format(kind, str(message).replace('\n', ' '))
+
+
+def parse_message(line: str):
+    """
+    Parses a message sent from a shard worker, returning a tuple of kind and message
+    """
+    kind, _, message = line.rstrip('\n').partition(':')
+    return kind, message
+
+
+class ShardedScriptExecutor:
+    """
+    Runs shards of a script's input in separate headless worker processes.
+
+    Each shard is described by a JSON serializable specification, which is passed
+    to a worker started from the shard_worker module. Progress reported by workers
+    is forwarded to the feedback object, and all workers are terminated if the
+    feedback is canceled.
+    """
+
+    def __init__(self, python_executable: str):
+        self.python_executable = python_executable
+
+    def run(self, specs: list, spec_folder: str, feedback):  # pylint: disable=too-many-locals
+        """
+        Runs all shards in parallel, returning when every worker has finished
+        """
+        messages = queue.Queue()
+        processes = []
+        env = dict(os.environ)
+        # workers need the same modules as this process, including the QGIS and processing packages
+        env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+
+        for index, spec in enumerate(specs):
+            spec_path = os.path.join(spec_folder, 'shard_{}.json'.format(index))
+            with open(spec_path, 'w') as f:
+                json.dump(spec, f)
+
+            process = subprocess.Popen([self.python_executable, '-m', 'processing_js.processing.shard_worker',
+                                        spec_path],
+                                       stdout=subprocess.PIPE,
+                                       stderr=subprocess.STDOUT,
+                                       universal_newlines=True,
+                                       env=env)
+            processes.append(process)
+            threading.Thread(target=self.read_output, args=(index, process, messages), daemon=True).start()
+
+        progress = [0.0] * len(processes)
+        errors = []
+        running = len(processes)
+        while running:
+            if feedback.isCanceled():
+                for process in processes:
+                    process.terminate()
+
+            try:
+                index, line = messages.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            if line is None:
+                running -= 1
+                continue
+
+            kind, message = parse_message(line)
+            if kind == MESSAGE_PROGRESS:
+                progress[index] = float(message)
+                feedback.setProgress(sum(progress) / len(progress))
+            elif kind == MESSAGE_ERROR:
+                errors.append(message)
+                feedback.reportError('[{}] {}'.format(index, message))
+            elif kind == MESSAGE_INFO:
+                feedback.pushInfo('[{}] {}'.format(index, message))
+            else:
+                feedback.pushConsoleInfo('[{}] {}'.format(index, line.rstrip('\n')))
+
+        for process in processes:
+            process.wait()
+
+        if feedback.isCanceled():
+            return
+
+        failed = [i for i, process in enumerate(processes) if process.returncode != 0]
+        if failed:
+            raise QgsProcessingException('Shard worker(s) {} failed:\n{}'.format(
+                ', '.join(str(i) for i in failed), '\n'.join(errors)))
+
+    @staticmethod
+    def read_output(index: int, process, messages: queue.Queue):
+        """
+        Forwards lines written by a worker process to the message queue
+        """
+        for line in process.stdout:
+            messages.put((index, line))
+        messages.put((index, None))
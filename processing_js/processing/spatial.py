@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    spatial.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import time
+import weakref
+
+from qgis.core import (QgsFeatureRequest,
+                       QgsGeometry,
+                       QgsPointXY,
+                       QgsRectangle,
+                       QgsSpatialIndex)
+from qgis.PyQt.QtCore import QObject, QVariant, pyqtSlot
+from PyQt5.QtQml import QJSValue
+
+from processing_js.processing.marshalling import (GEOJSON_CRS,
+                                                  python_to_js)
+
+
+class SpatialIndexTable:
+    """
+    A spatial index over a layer's features, with their attributes.
+
+    Geometries are indexed in EPSG:4326, matching the coordinates of features passed to
+    scripts. Tables are read only once built, so a single table can be shared by the
+    engines of all worker threads.
+    """
+
+    def __init__(self, name: str, source, transform_context):
+        self.name = name
+        # storing geometries makes nearest neighbour queries use exact distances
+        self.index = QgsSpatialIndex(QgsSpatialIndex.FlagStoreFeatureGeometries)
+        self.geometries = {}
+        self.attributes = {}
+
+        start = time.perf_counter()
+        names = source.fields().names()
+        request = QgsFeatureRequest().setDestinationCrs(GEOJSON_CRS, transform_context)
+        for feature in source.getFeatures(request):
+            if not feature.hasGeometry():
+                continue
+            self.index.addFeature(feature)
+            self.geometries[feature.id()] = feature.geometry()
+            self.attributes[feature.id()] = dict(zip(names, [None if isinstance(v, QVariant) and v.isNull() else v
+                                                             for v in feature.attributes()]))
+        self.build_time = time.perf_counter() - start
+
+    def __len__(self):
+        return len(self.geometries)
+
+    def nearest(self, x: float, y: float, k: int = 1) -> list:
+        """
+        Returns the k features nearest to a point, as a list of dicts of id, distance
+        and properties ordered by distance
+        """
+        k = max(k, 1)
+        point = QgsGeometry.fromPointXY(QgsPointXY(x, y))
+        res = [{'id': fid,
+                'distance': self.geometries[fid].distance(point),
+                'properties': self.attributes[fid]}
+               for fid in self.index.nearestNeighbor(QgsPointXY(x, y), k)]
+        # ties can return more than k features
+        res.sort(key=lambda r: r['distance'])
+        return res[:k]
+
+    def intersects(self, bbox) -> list:
+        """
+        Returns the features whose bounding boxes intersect a bounding box, as a list of
+        dicts of id and properties.
+
+        The bounding box can be a GeoJSON style [xmin, ymin, xmax, ymax] list or a dict
+        with xmin, ymin, xmax and ymax values.
+        """
+        if isinstance(bbox, dict):
+            rect = QgsRectangle(bbox['xmin'], bbox['ymin'], bbox['xmax'], bbox['ymax'])
+        else:
+            rect = QgsRectangle(*[float(v) for v in bbox[:4]])
+        return [{'id': fid, 'properties': self.attributes[fid]}
+                for fid in self.index.intersects(rect)]
+
+
+class SpatialIndexObject(QObject):
+    """
+    Exposes a spatial index to a script engine
+    """
+
+    def __init__(self, table: SpatialIndexTable, engine):
+        super().__init__()
+        self.table = table
+        # weak reference, to avoid keeping pooled engines alive
+        self.engine = weakref.proxy(engine)
+
+    @pyqtSlot(float, float, result=QJSValue)
+    @pyqtSlot(float, float, int, result=QJSValue)
+    def nearest(self, x: float, y: float, k: int = 1) -> QJSValue:
+        """
+        Returns the k features nearest to a point
+        """
+        return python_to_js(self.engine, self.table.nearest(x, y, k))
+
+    @pyqtSlot('QVariant', result=QJSValue)
+    def intersects(self, bbox) -> QJSValue:
+        """
+        Returns the features whose bounding boxes intersect a bounding box
+        """
+        return python_to_js(self.engine, self.table.intersects(bbox))
+
+    @pyqtSlot(result=int)
+    def size(self) -> int:
+        """
+        Returns the number of indexed features
+        """
+        return len(self.table)
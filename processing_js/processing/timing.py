@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+***************************************************************************
+    timing.py
+    ---------------------
+    Date                 : October 2026
+    Copyright            : (C) 2026 by North Road
+    Email                : nyall at north-road dot com
+***************************************************************************
+*                                                                         *
+*   This program is free software; you can redistribute it and/or modify  *
+*   it under the terms of the GNU General Public License as published by  *
+*   the Free Software Foundation; either version 2 of the License, or     *
+*   (at your option) any later version.                                   *
+*                                                                         *
+***************************************************************************
+"""
+
+import threading
+from time import perf_counter
+
+
+class StageTimings:
+    """
+    Accumulates the time spent in, and number of calls to, each stage of the feature pipeline.
+
+    Stages are timed with perf_counter. Times from worker threads are summed, so with
+    several threads the stage totals can exceed the elapsed time of the run. With lazy
+    feature conversion, part of the export cost is incurred during the script call.
+    """
+
+    READ = 'read'
+    EXPORT = 'export'
+    CALL = 'call'
+    IMPORT = 'import'
+    WRITE = 'write'
+    STAGES = (READ, EXPORT, CALL, IMPORT, WRITE)
+
+    def __init__(self):
+        self.times = dict.fromkeys(self.STAGES, 0.0)
+        self.counts = dict.fromkeys(self.STAGES, 0)
+        self.features = 0
+        self.start = perf_counter()
+        self.elapsed = None
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, elapsed: float, count: int = 1):
+        """
+        Adds the time spent in a stage
+        """
+        with self._lock:
+            self.times[stage] += elapsed
+            self.counts[stage] += count
+
+    def add_call(self, export_time: float, call_time: float, import_time: float):
+        """
+        Adds the times for the export, call and import stages of a single script call
+        """
+        with self._lock:
+            self.times[self.EXPORT] += export_time
+            self.times[self.CALL] += call_time
+            self.times[self.IMPORT] += import_time
+            self.counts[self.EXPORT] += 1
+            self.counts[self.CALL] += 1
+            self.counts[self.IMPORT] += 1
+
+    def iterate(self, features):
+        """
+        Yields features from an iterator, timing the read stage
+        """
+        iterator = iter(features)
+        while True:
+            start = perf_counter()
+            try:
+                feature = next(iterator)
+            except StopIteration:
+                return
+            self.add(self.READ, perf_counter() - start)
+            self.features += 1
+            yield feature
+
+    def finish(self):
+        """
+        Records the elapsed time of the run
+        """
+        self.elapsed = perf_counter() - self.start
+
+    def features_per_second(self) -> float:
+        """
+        Returns the number of input features processed per second
+        """
+        return self.features / self.elapsed if self.elapsed else 0.0
+
+    def table(self) -> list:
+        """
+        Returns the timings as lines of a plain text table
+        """
+        lines = ['{:<10}{:>12}{:>12}{:>10}'.format('Stage', 'Time (s)', 'Calls', 'Share')]
+        for stage in self.STAGES:
+            share = 100.0 * self.times[stage] / self.elapsed if self.elapsed else 0
+            lines.append('{:<10}{:>12.4f}{:>12}{:>9.1f}%'.format(stage, self.times[stage], self.counts[stage], share))
+        lines.append('{:<10}{:>12.4f}{:>12}'.format('total', self.elapsed or 0, self.features))
+        lines.append('{:.1f} features per second'.format(self.features_per_second()))
+        return lines
+
+    def outputs(self) -> dict:
+        """
+        Returns the timings as numeric algorithm outputs
+        """
+        res = {'{}_TIME'.format(stage.upper()): self.times[stage] for stage in self.STAGES}
+        res['TOTAL_TIME'] = self.elapsed
+        res['FEATURES_PER_SECOND'] = self.features_per_second()
+        return res
+
+
+class TimedSink:
+    """
+    Wraps a feature sink, timing the write stage
+    """
+
+    def __init__(self, sink, timings: StageTimings):
+        self.sink = sink
+        self.timings = timings
+
+    def addFeatures(self, features, flags=None):  # pylint: disable=invalid-name
+        """
+        Adds features to the wrapped sink
+        """
+        start = perf_counter()
+        res = self.sink.addFeatures(features) if flags is None else self.sink.addFeatures(features, flags)
+        self.timings.add(StageTimings.WRITE, perf_counter() - start)
+        return res
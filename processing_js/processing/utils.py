@@ -17,6 +17,8 @@
 ***************************************************************************
 """
 import os
+import shutil
+import sys
 
 from qgis.PyQt.QtCore import QCoreApplication
 from processing.core.ProcessingConfig import ProcessingConfig
@@ -31,6 +33,16 @@ class JsUtils:  # pylint: disable=too-many-public-methods
     """
 
     SCRIPTS_FOLDER = 'JS_SCRIPTS_FOLDER'
+    BATCH_SIZE = 'JS_BATCH_SIZE'
+    THREADS = 'JS_THREADS'
+    PROCESSES = 'JS_PROCESSES'
+    PYTHON_EXECUTABLE = 'JS_PYTHON_EXECUTABLE'
+    ENGINE_POOL_SIZE = 'JS_ENGINE_POOL_SIZE'
+    MEMO_SIZE = 'JS_MEMO_SIZE'
+
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_ENGINE_POOL_SIZE = 8
+    DEFAULT_MEMO_SIZE = 10000
 
     VALID_CHARS = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
 
@@ -50,6 +62,13 @@ class JsUtils:  # pylint: disable=too-many-public-methods
         mkdir(folder)
         return os.path.abspath(folder)
 
+    @staticmethod
+    def manifest_path():
+        """
+        Returns the path to the cache of metadata parsed from script files
+        """
+        return os.path.join(userFolder(), 'jsscripts_manifest.json')
+
     @staticmethod
     def script_folders():
         """
@@ -64,6 +83,86 @@ class JsUtils:  # pylint: disable=too-many-public-methods
         folders.append(JsUtils.builtin_scripts_folder())
         return folders
 
+    @staticmethod
+    def batch_size() -> int:
+        """
+        Returns the number of features to pass to batched scripts in each call
+        """
+        size = ProcessingConfig.getSetting(JsUtils.BATCH_SIZE)
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return JsUtils.DEFAULT_BATCH_SIZE
+        return size if size > 0 else JsUtils.DEFAULT_BATCH_SIZE
+
+    @staticmethod
+    def thread_count() -> int:
+        """
+        Returns the default number of threads to use when running scripts
+        """
+        threads = ProcessingConfig.getSetting(JsUtils.THREADS)
+        try:
+            threads = int(threads)
+        except (TypeError, ValueError):
+            return 1
+        return max(threads, 1)
+
+    @staticmethod
+    def process_count() -> int:
+        """
+        Returns the default number of worker processes to use when running scripts
+        """
+        processes = ProcessingConfig.getSetting(JsUtils.PROCESSES)
+        try:
+            processes = int(processes)
+        except (TypeError, ValueError):
+            return 1
+        return max(processes, 1)
+
+    @staticmethod
+    def engine_pool_size() -> int:
+        """
+        Returns the maximum number of idle script engines to keep for reuse
+        """
+        size = ProcessingConfig.getSetting(JsUtils.ENGINE_POOL_SIZE)
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return JsUtils.DEFAULT_ENGINE_POOL_SIZE
+        return max(size, 0)
+
+    @staticmethod
+    def memo_size() -> int:
+        """
+        Returns the maximum number of results cached for scripts declared as pure
+        """
+        size = ProcessingConfig.getSetting(JsUtils.MEMO_SIZE)
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            return JsUtils.DEFAULT_MEMO_SIZE
+        return max(size, 0)
+
+    @staticmethod
+    def default_python_executable() -> str:
+        """
+        Returns the default Python interpreter for worker processes.
+
+        Inside QGIS sys.executable is usually the QGIS binary itself, so the
+        interpreter is searched for on the path instead.
+        """
+        if os.path.basename(sys.executable).lower().startswith('python'):
+            return sys.executable
+        return shutil.which('python3') or shutil.which('python') or 'python3'
+
+    @staticmethod
+    def python_executable() -> str:
+        """
+        Returns the Python interpreter used to run worker processes
+        """
+        executable = ProcessingConfig.getSetting(JsUtils.PYTHON_EXECUTABLE)
+        return executable if executable else JsUtils.default_python_executable()
+
     @staticmethod
     def create_descriptive_name(name):
         """
@@ -0,0 +1,12 @@
+//#Aggregate test=name
+//#aggregate:string
+//#no_geometry
+function map(feature)
+{
+  return feature.properties.name;
+}
+
+function reduce(names, name)
+{
+  return names + ',' + name;
+}
@@ -0,0 +1,6 @@
+//#Batch test=name
+//#batch
+function funcBatch(features)
+{
+  return features;
+}
@@ -0,0 +1,6 @@
+//#Filter test=name
+//#filter:"TYPE" = 'road' AND "LANES" >= 2
+function func(feature)
+{
+  return feature;
+}
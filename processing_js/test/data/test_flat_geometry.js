@@ -0,0 +1,6 @@
+//#Flat geometry test=name
+//#geometry_encoding:flat
+function func(feature)
+{
+  return feature;
+}
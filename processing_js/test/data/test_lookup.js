@@ -0,0 +1,9 @@
+//#Lookup test=name
+//#Classes=source
+//#lookup:Classes,code
+//#lookup:Classes,name,by_name
+function func(feature)
+{
+  feature.properties.class = lookup.get(feature.properties.code).name;
+  return feature;
+}
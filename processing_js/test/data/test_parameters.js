@@ -0,0 +1,11 @@
+//#Parameters test=name
+//#Distance=number 5
+//#Label=string hello
+//#Keep=boolean True
+//#Method=enum first;second;third
+//#Area=extent
+//#Target=crs
+function func(feature)
+{
+  return feature;
+}
@@ -0,0 +1,6 @@
+//#Precision test=name
+//#precision:3
+function func(feature)
+{
+  return feature;
+}
@@ -0,0 +1,11 @@
+//#Raster scale=name
+//#raster:float64
+//#factor=number 2
+function func(block)
+{
+  for (var i = 0; i < block.data.length; i++)
+  {
+    if (block.data[i] != block.noData)
+      block.data[i] *= factor;
+  }
+}
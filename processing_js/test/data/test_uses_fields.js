@@ -0,0 +1,7 @@
+//#Uses fields test=name
+//#uses_fields:name,intval
+//#no_geometry
+function func(feature)
+{
+  return feature;
+}
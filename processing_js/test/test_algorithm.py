@@ -16,13 +16,29 @@ __revision__ = '$Format:%H$'
 
 import unittest
 import os
+import tempfile
 from qgis.core import (QgsProcessingParameterNumber,
+                       QgsProcessingParameterDefinition,
+                       QgsFeatureRequest,
+                       QgsFeature,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsPointXY,
                        QgsProcessing,
                        QgsProcessingContext,
+                       QgsProcessingException,
                        QgsProcessingFeedback,
+                       QgsProcessingOutputLayerDefinition,
+                       QgsProject,
+                       QgsRasterLayer,
                        QgsVectorLayer)
-from processing_js.processing.algorithm import JsAlgorithm
-from .utilities import get_qgis_app
+from qgis.PyQt.QtCore import QVariant
+from processing_js.processing.aggregate import JsAggregateAlgorithm
+from processing_js.processing.algorithm import JsAlgorithm, create_algorithm
+from processing_js.processing.raster import JsRasterAlgorithm
+from processing_js.processing.incremental import state_path
+from .utilities import get_qgis_app, RecordingFeedback
 
 QGIS_APP = get_qgis_app()
 
@@ -144,6 +160,379 @@ class AlgorithmTest(unittest.TestCase):
         self.assertEqual(alg.displayName(), 'bad algorithm')
         self.assertEqual(alg.error, 'This script has a syntax error.\nProblem with line: polyg=xvector')
 
+    def testBatchMode(self):
+        """
+        Test parsing the batch mode directive
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_batch.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.name(), 'batchtest')
+        self.assertTrue(alg.batch_mode)
+        # batched scripts can't process single features
+        layer = QgsVectorLayer('Point?crs=EPSG:4326', 'layer', 'memory')
+        self.assertFalse(alg.supportInPlaceEdit(layer))
+
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_algorithm_2.rsx'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.batch_mode)
+
+    def testGeometryEncoding(self):
+        """
+        Test parsing the geometry encoding directive
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_flat_geometry.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.geometry_encoding, JsAlgorithm.GEOMETRY_ENCODING_FLAT)
+
+        alg = JsAlgorithm(description_file=None, script='//#geometry_encoding:wkt\nfunction func(f) { return f; }')
+        self.assertTrue(alg.error)
+
+    def testUsedFields(self):
+        """
+        Test the used fields and no geometry directives
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_uses_fields.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.used_fields, ['name', 'intval'])
+        self.assertFalse(alg.uses_geometry)
+
+        fields = QgsFields()
+        for name in ['id', 'intval', 'other', 'name']:
+            fields.append(QgsField(name, QVariant.String))
+        self.assertEqual(alg.outputFields(fields).names(), ['name', 'intval'])
+
+        request = alg.request()
+        self.assertTrue(request.flags() & QgsFeatureRequest.NoGeometry)
+        self.assertTrue(request.flags() & QgsFeatureRequest.SubsetOfAttributes)
+        self.assertEqual(sorted(request.subsetOfAttributes()), [1, 3])
+
+        # no directives, everything is fetched
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_batch.js'))
+        alg.initAlgorithm()
+        self.assertEqual(alg.outputFields(fields).names(), ['id', 'intval', 'other', 'name'])
+        self.assertFalse(alg.request().flags() & QgsFeatureRequest.NoGeometry)
+        self.assertFalse(alg.request().flags() & QgsFeatureRequest.SubsetOfAttributes)
+
+    def testFilter(self):
+        """
+        Test the filter expression directive
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_filter.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.filter_expression, '"TYPE" = \'road\' AND "LANES" >= 2')
+        request = alg.request()
+        self.assertEqual(request.filterType(), QgsFeatureRequest.FilterExpression)
+        self.assertEqual(request.filterExpression().expression(), alg.filter_expression)
+
+        # combined with extent shards
+        alg.shard_extent = [0, 0, 5, 10, True]
+        self.assertIn('"LANES" >= 2', alg.request().filterExpression().expression())
+        self.assertIn('<= 5', alg.request().filterExpression().expression())
+
+        # feature id shards are already filtered
+        alg.shard_extent = None
+        alg.shard_fids = [1, 2]
+        self.assertEqual(alg.request().filterType(), QgsFeatureRequest.FilterFids)
+
+        alg = JsAlgorithm(description_file=None, script='//#filter:"TYPE" = \nfunction func(f) { return f; }')
+        self.assertTrue(alg.error)
+
+    def testPrecision(self):
+        """
+        Test the coordinate precision directive and parameter
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_precision.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.precision, 3)
+        param = alg.parameterDefinition('PRECISION')
+        self.assertEqual(param.defaultValue(), 3)
+        self.assertTrue(param.flags() & QgsProcessingParameterDefinition.FlagAdvanced)
+
+        alg = JsAlgorithm(description_file=None, script='//#precision:20\nfunction func(f) { return f; }')
+        self.assertTrue(alg.error)
+
+    def testScriptParameters(self):
+        """
+        Test conversion of parameter values for injection into scripts
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_parameters.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+
+        context = QgsProcessingContext()
+        values = alg.script_parameter_values({'Distance': 2.5,
+                                              'Label': 'abc',
+                                              'Keep': False,
+                                              'Method': 2,
+                                              'Area': '1,3,2,4 [EPSG:3857]',
+                                              'Target': 'EPSG:4326'}, context)
+        self.assertEqual(values['Distance'], 2.5)
+        self.assertEqual(values['Label'], 'abc')
+        self.assertIs(values['Keep'], False)
+        self.assertEqual(values['Method'], 2)
+        self.assertEqual(values['Area'], {'xmin': 1, 'ymin': 2, 'xmax': 3, 'ymax': 4, 'crs': 'EPSG:3857'})
+        self.assertEqual(values['Target']['authid'], 'EPSG:4326')
+        self.assertIsNone(values['INPUT'])
+        self.assertNotIn('PRECISION', values)
+        self.assertNotIn('OUTPUT', values)
+
+    def testAggregate(self):
+        """
+        Test creating aggregate algorithms
+        """
+        alg = create_algorithm(os.path.join(test_data_path, 'test_aggregate.js'))
+        self.assertIsInstance(alg, JsAggregateAlgorithm)
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.aggregate_type, 'string')
+        self.assertEqual(alg.outputDefinition('RESULT').type(), 'outputString')
+        self.assertIsNone(alg.parameterDefinition('OUTPUT'))
+        self.assertIsNone(alg.parameterDefinition('PROCESSES'))
+        self.assertIsNotNone(alg.parameterDefinition('THREADS'))
+        self.assertIsInstance(alg.createInstance(), JsAggregateAlgorithm)
+        self.assertIn('_aggregateChunk', alg.script_wrapper())
+
+        self.assertNotIsInstance(create_algorithm(os.path.join(test_data_path, 'test_batch.js')),
+                                 JsAggregateAlgorithm)
+
+        alg = create_algorithm(None, script='//#aggregate:table\nfunction map(f) { return 1; }')
+        self.assertIsInstance(alg, JsAggregateAlgorithm)
+        self.assertTrue(alg.error)
+
+    def testRaster(self):
+        """
+        Test creating and running raster algorithms
+        """
+        alg = create_algorithm(os.path.join(test_data_path, 'test_raster.js'))
+        self.assertIsInstance(alg, JsRasterAlgorithm)
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.raster_type, 'float64')
+        self.assertEqual(alg.parameterDefinition('INPUT').type(), 'raster')
+        self.assertEqual(alg.parameterDefinition('OUTPUT').type(), 'rasterDestination')
+        self.assertIsNotNone(alg.parameterDefinition('TILE_SIZE'))
+        self.assertIsInstance(alg.createInstance(), JsRasterAlgorithm)
+
+        input_layer = QgsRasterLayer(os.path.join(test_data_path, 'dem.tif'), 'dem')
+        output_file = os.path.join(tempfile.mkdtemp(), 'scaled.tif')
+        context = QgsProcessingContext()
+        results, ok = alg.run({'INPUT': input_layer, 'BAND': 1, 'TILE_SIZE': 7, 'factor': 3,
+                               'OUTPUT': output_file}, context, QgsProcessingFeedback())
+        self.assertTrue(ok)
+        output_layer = QgsRasterLayer(results['OUTPUT'], 'scaled')
+        self.assertTrue(output_layer.isValid())
+        self.assertEqual((output_layer.width(), output_layer.height()), (input_layer.width(), input_layer.height()))
+        value, _ = input_layer.dataProvider().sample(input_layer.extent().center(), 1)
+        scaled, _ = output_layer.dataProvider().sample(input_layer.extent().center(), 1)
+        self.assertAlmostEqual(scaled, value * 3, 3)
+
+        alg = create_algorithm(None, script='//#raster:int16\nfunction func(b) { return b; }')
+        self.assertIsInstance(alg, JsRasterAlgorithm)
+        self.assertTrue(alg.error)
+
+    def testMetadata(self):
+        """
+        Test creating algorithms from previously parsed metadata
+        """
+        path = os.path.join(test_data_path, 'test_parameters.js')
+        alg = create_algorithm(path)
+        self.assertEqual(alg.metadata[0], '//#Parameters test=name')
+        # only the metadata is read until the algorithm is prepared
+        self.assertIsNone(alg.js_script)
+        alg.load_script()
+        self.assertNotIn('//#', alg.js_script)
+        self.assertIn('function func', alg.js_script)
+
+        cached = create_algorithm(path, metadata=alg.metadata)
+        cached.initAlgorithm()
+        self.assertFalse(cached.error)
+        self.assertEqual(cached.displayName(), alg.displayName())
+        self.assertIsNotNone(cached.parameterDefinition('Distance'))
+        self.assertIsNone(cached.js_script)
+        cached.load_script()
+        self.assertEqual(cached.js_script, alg.js_script)
+
+        self.assertIsInstance(create_algorithm(os.path.join(test_data_path, 'test_aggregate.js'),
+                                               metadata=['//#aggregate:string']), JsAggregateAlgorithm)
+
+        # metadata which doesn't match the file can't be used to run the script
+        stale = create_algorithm(path, metadata=['//#Parameters test=name'])
+        with self.assertRaises(QgsProcessingException):
+            stale.load_script()
+        self.assertEqual(JsAlgorithm.read_metadata(['//#a=name', '', '// comment', '//#b=number 1',
+                                                    'function func(f) {}', '//#c=string']),
+                         ['//#a=name', '//#b=number 1'])
+        self.assertEqual(JsAlgorithm.read_metadata(['/* licence', ' * text */', "'use strict';",
+                                                    '//#a=name', 'function func(f) {}']),
+                         ['//#a=name'])
+
+        # scripts with metadata after code are parsed in full at registration
+        path = os.path.join(tempfile.mkdtemp(), 'late.js')
+        with open(path, 'w') as f:
+            f.write('var x = 1;\n//#Late metadata=name\n//#Distance=number 5\nfunction func(f) { return f; }\n')
+        alg = create_algorithm(path)
+        alg.initAlgorithm()
+        self.assertEqual(alg.displayName(), 'Late metadata')
+        self.assertIsNotNone(alg.parameterDefinition('Distance'))
+        alg.load_script()
+        self.assertIn('function func', alg.js_script)
+
+    def testDirectiveSyntax(self):
+        """
+        Test that directives with arguments are only written as directive:argument
+        """
+        alg = JsAlgorithm(description_file=None, script='//#filter:date > \'2020-01-01\'\n//#uses_fields:date\n'
+                                                        '//#aggregate:html\nfunction map(f) { return 1; }')
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.filter_expression, 'date > \'2020-01-01\'')
+        self.assertEqual(alg.used_fields, ['date'])
+        self.assertEqual(alg.aggregate_type, 'html')
+        for name in ['filter', 'uses_fields', 'aggregate']:
+            self.assertIsNone(alg.parameterDefinition(name))
+
+        # name=value lines using directive names are ambiguous
+        for line in ['//#aggregate=string', '//#aggregate=number', '//#aggregate=html',
+                     '//#filter=date > \'2020-01-01\'', '//#uses_fields=date', '//#filter=string',
+                     '//#Raster=raster', '//#precision=number 2', '//#lookup=vector']:
+            alg = JsAlgorithm(description_file=None, script=line + '\nfunction func(f) { return f; }')
+            self.assertIn('Ambiguous', alg.error, line)
+
+        # only aggregate and raster can be written without an argument
+        for line in ['//#filter', '//#uses_fields', '//#precision']:
+            alg = JsAlgorithm(description_file=None, script=line + '\nfunction func(f) { return f; }')
+            self.assertIn('requires an argument', alg.error, line)
+        alg = create_algorithm(None, script='//#aggregate\nfunction map(f) { return 1; }')
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.aggregate_type, 'number')
+        alg = create_algorithm(None, script='//#Raster\nfunction func(b) { return b; }')
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.raster_type, 'float32')
+
+        # other parameters can still be declared
+        alg = JsAlgorithm(description_file=None, script='//#Where=expression\n'
+                                                        'function func(f) { return f; }')
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertIsNotNone(alg.parameterDefinition('Where'))
+
+    def testIncremental(self):
+        """
+        Test incremental runs over an edited input
+        """
+        script = 'function func(f) { f.properties.name += "!"; return f; }'
+        layer = QgsVectorLayer('Point?crs=EPSG:4326&field=name:string', 'input', 'memory')
+        for i, name in enumerate(['a', 'b', 'c']):
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes([name])
+            feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(i, i)))
+            layer.dataProvider().addFeatures([feature])
+        fids = {f['name']: f.id() for f in layer.getFeatures()}
+
+        def run(destination):
+            alg = JsAlgorithm(description_file=None, script=script)
+            alg.initAlgorithm()
+            context = QgsProcessingContext()
+            results, ok = alg.run({'INPUT': layer, 'INCREMENTAL': True, 'OUTPUT': destination},
+                                  context, QgsProcessingFeedback())
+            self.assertTrue(ok)
+            output = QgsVectorLayer(results['OUTPUT'], 'output', 'ogr')
+            return {f['name']: f.id() for f in output.getFeatures()}, context
+
+        output_file = os.path.join(tempfile.mkdtemp(), 'incremental.gpkg')
+        first, _ = run(output_file)
+        self.assertEqual(sorted(first), ['a!', 'b!', 'c!'])
+
+        layer.dataProvider().changeAttributeValues({fids['b']: {0: 'bb'}})
+        layer.dataProvider().deleteFeatures([fids['c']])
+        destination = QgsProcessingOutputLayerDefinition(output_file, QgsProject.instance())
+        second, context = run(destination)
+        self.assertEqual(sorted(second), ['a!', 'bb!'])
+        # the unchanged feature's output is kept
+        self.assertEqual(second['a!'], first['a!'])
+        # existing outputs are loaded on completion, as new outputs are
+        self.assertTrue(context.willLoadLayerOnCompletion(output_file))
+
+        # feature ids are not stable for other formats, so all features are processed
+        output_file = os.path.join(tempfile.mkdtemp(), 'incremental.shp')
+        run(output_file)
+        outputs, _ = run(output_file)
+        self.assertEqual(sorted(outputs), ['a!', 'bb!'])
+        self.assertFalse(os.path.exists(state_path(output_file)))
+
+    def testFailedRunFeedback(self):
+        """
+        Test that buffered script messages are reported when a run fails
+        """
+        layer = QgsVectorLayer('Point?crs=EPSG:4326&field=name:string', 'input', 'memory')
+        for name in ['a', 'b', 'c']:
+            feature = QgsFeature(layer.fields())
+            feature.setAttributes([name])
+            layer.dataProvider().addFeatures([feature])
+
+        alg = JsAlgorithm(description_file=None,
+                          script='function func(f) { feedback.pushInfo("same"); '
+                                 'if (f.properties.name == "c") throw new Error("bad"); return f; }')
+        alg.initAlgorithm()
+        feedback = RecordingFeedback()
+        _, ok = alg.run({'INPUT': layer, 'THREADS': 1, 'OUTPUT': 'memory:'}, QgsProcessingContext(), feedback)
+        self.assertFalse(ok)
+        self.assertIn('same', feedback.messages)
+        self.assertIn('Message "same" repeated 2 times', feedback.messages)
+
+    def testShardRequest(self):
+        """
+        Test restricting requests to a shard
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_batch.js'))
+        alg.initAlgorithm()
+        self.assertTrue(alg.parameterDefinition('PROCESSES').flags() & QgsProcessingParameterDefinition.FlagAdvanced)
+
+        alg.shard_fids = [3, 4, 5]
+        request = alg.request()
+        self.assertEqual(request.filterType(), QgsFeatureRequest.FilterFids)
+        self.assertEqual(sorted(request.filterFids()), [3, 4, 5])
+
+        alg.shard_fids = None
+        alg.shard_extent = [0, 0, 5, 10, False]
+        request = alg.request()
+        self.assertEqual(request.filterRect().xMaximum(), 5)
+        self.assertEqual(request.filterType(), QgsFeatureRequest.FilterExpression)
+        self.assertIn('< 5', request.filterExpression().expression())
+
+        # the first strip also handles features without geometry
+        alg.shard_null_geometries = True
+        request = alg.request()
+        self.assertTrue(request.filterRect().isNull())
+        self.assertIn('IS NULL', request.filterExpression().expression())
+
+    def testShardedRun(self):
+        """
+        Test that running in several processes gives the same features as a single process
+        """
+        lines = QgsVectorLayer(os.path.join(test_data_path, 'lines.shp'), 'lines', 'ogr')
+        layer = lines.materialize(QgsFeatureRequest())
+        feature = QgsFeature(layer.fields())
+        layer.dataProvider().addFeatures([feature])
+
+        def run(processes, shard_method):
+            alg = JsAlgorithm(description_file=None, script='function func(f) { return f; }')
+            alg.initAlgorithm()
+            output_file = os.path.join(tempfile.mkdtemp(), 'output.gpkg')
+            results, ok = alg.run({'INPUT': layer, 'PROCESSES': processes, 'SHARD_METHOD': shard_method,
+                                   'OUTPUT': output_file}, QgsProcessingContext(), QgsProcessingFeedback())
+            self.assertTrue(ok)
+            return QgsVectorLayer(results['OUTPUT'], 'output', 'ogr').featureCount()
+
+        expected = run(1, JsAlgorithm.SHARD_BY_FEATURE_ID)
+        self.assertEqual(expected, lines.featureCount() + 1)
+        self.assertEqual(run(2, JsAlgorithm.SHARD_BY_FEATURE_ID), expected)
+        self.assertEqual(run(2, JsAlgorithm.SHARD_BY_EXTENT), expected)
+
     def testInputs(self):
         """
         Test creation of script with algorithm inputs
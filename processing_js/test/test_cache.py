@@ -0,0 +1,69 @@
+# coding=utf-8
+"""LRU cache Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from processing_js.processing.cache import LruCache
+
+
+class LruCacheTest(unittest.TestCase):
+    """Test LRU cache."""
+
+    def testEviction(self):
+        """
+        Test least recently used entries are evicted
+        """
+        cache = LruCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+        self.assertEqual(cache.get('b', 5), 5)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.set_max_size(1)
+        self.assertEqual(len(cache), 1)
+        self.assertIn('c', cache)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+
+    def testTake(self):
+        """
+        Test removing entries
+        """
+        cache = LruCache(2)
+        cache.put('a', 1)
+        self.assertEqual(cache.take('a'), 1)
+        self.assertIsNone(cache.take('a'))
+        self.assertEqual(len(cache), 0)
+
+    def testDisabled(self):
+        """
+        Test a cache with no size never stores values
+        """
+        cache = LruCache(0)
+        cache.put('a', 1)
+        self.assertNotIn('a', cache)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LruCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,244 @@
+# coding=utf-8
+"""Script engine Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from qgis.core import (QgsCoordinateReferenceSystem,
+                       QgsCoordinateTransformContext,
+                       QgsFeature,
+                       QgsField,
+                       QgsFields,
+                       QgsProcessingFeedback)
+from qgis.PyQt.QtCore import QVariant
+from processing_js.processing.aggregate import JsAggregateAlgorithm
+from processing_js.processing.engine import (ScriptRunner,
+                                             AggregateRunner,
+                                             EnginePool)
+from processing_js.processing.cache import LruCache
+from processing_js.processing.marshalling import (FeatureMarshaller,
+                                                  python_to_js)
+from .utilities import get_qgis_app, RecordingFeedback
+
+QGIS_APP = get_qgis_app()
+
+SCRIPT = """
+var loads = (typeof loads === 'undefined') ? 1 : loads + 1;
+function func(f) { return f; }
+"""
+
+
+AGGREGATE_SCRIPT = JsAggregateAlgorithm.AGGREGATE_JS + """
+function map(value) { return value % 2 ? value : undefined; }
+function reduce(total, value) { return total + value; }
+function finalize(total) { return total * 10; }
+"""
+
+
+class ValueMarshaller:
+    """
+    Test marshaller which passes plain values to scripts
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def features_to_js(self, features):
+        """
+        Converts a list of values
+        """
+        return python_to_js(self.engine, features)
+
+
+class EngineTest(unittest.TestCase):
+    """Test script engines."""
+
+    def testPool(self):
+        """
+        Test reusing engines from a pool
+        """
+        pool = EnginePool(2)
+        feedback = QgsProcessingFeedback()
+        runner = ScriptRunner(SCRIPT, feedback, False, lambda engine: None, pool=pool)
+        self.assertFalse(runner.reused)
+        engine = runner.engine
+        runner.release()
+        self.assertIsNone(runner.engine)
+
+        runner = ScriptRunner(SCRIPT, feedback, False, lambda engine: None, pool=pool)
+        self.assertTrue(runner.reused)
+        self.assertIs(runner.engine, engine)
+        # the script is not evaluated again
+        self.assertEqual(runner.engine.globalObject().property('loads').toInt(), 1)
+
+        # engines in use are not shared
+        other = ScriptRunner(SCRIPT, feedback, False, lambda engine: None, pool=pool)
+        self.assertFalse(other.reused)
+
+        # different source, different engine
+        runner.release()
+        runner = ScriptRunner(SCRIPT + '\n', feedback, False, lambda engine: None, pool=pool)
+        self.assertFalse(runner.reused)
+
+        pool.clear()
+        runner = ScriptRunner(SCRIPT, feedback, False, lambda engine: None, pool=pool)
+        self.assertFalse(runner.reused)
+
+    def testParameters(self):
+        """
+        Test injecting typed parameter values
+        """
+        parameters = {'count': 3,
+                      'flag': True,
+                      'label': 'abc',
+                      'extent': {'xmin': 1.5, 'ymin': 2},
+                      'layers': [{'name': 'a'}, {'name': 'b'}],
+                      'missing': None}
+        runner = ScriptRunner('var doubled = count * 2; function func(f) { return f; }',
+                              QgsProcessingFeedback(), False, lambda engine: None, parameters=parameters)
+        global_object = runner.engine.globalObject()
+        # parameters are available to top level code
+        self.assertEqual(global_object.property('doubled').toInt(), 6)
+        self.assertTrue(global_object.property('flag').isBool())
+        self.assertEqual(global_object.property('label').toString(), 'abc')
+        self.assertEqual(global_object.property('extent').property('xmin').toNumber(), 1.5)
+        self.assertEqual(runner.engine.evaluate('layers[1].name').toString(), 'b')
+        self.assertTrue(global_object.property('missing').isNull())
+
+    def testPooledParameters(self):
+        """
+        Test that engines are only reused for runs with the same parameter values
+        """
+        pool = EnginePool(2)
+        script = 'var loads = (typeof loads === "undefined") ? 1 : loads + 1; ' \
+                 'var doubled = count * 2; function func(f) { count = 0; return f; }'
+        runner = ScriptRunner(script, QgsProcessingFeedback(), False, lambda engine: None,
+                              parameters={'count': 3}, pool=pool)
+        self.assertEqual(runner.engine.globalObject().property('doubled').toInt(), 6)
+        runner.engine.evaluate('func(1)')
+        runner.release()
+
+        runner = ScriptRunner(script, QgsProcessingFeedback(), False, lambda engine: None,
+                              parameters={'count': 5}, pool=pool)
+        self.assertFalse(runner.reused)
+        self.assertEqual(runner.engine.globalObject().property('doubled').toInt(), 10)
+        runner.release()
+
+        runner = ScriptRunner(script, QgsProcessingFeedback(), False, lambda engine: None,
+                              parameters={'count': 3}, pool=pool)
+        self.assertTrue(runner.reused)
+        self.assertEqual(runner.engine.globalObject().property('doubled').toInt(), 6)
+        # the script is not evaluated again for the same parameter values
+        self.assertEqual(runner.engine.globalObject().property('loads').toInt(), 1)
+        # parameters assigned by the script are reset
+        self.assertEqual(runner.engine.globalObject().property('count').toInt(), 3)
+
+    def testAggregateRunner(self):
+        """
+        Test reducing chunks of values
+        """
+        runner = AggregateRunner(AGGREGATE_SCRIPT, QgsProcessingFeedback(), False, ValueMarshaller)
+        partials = runner.process_features([1, 2, 3]) + runner.process_features([4, 6]) + \
+            runner.process_features([5])
+        self.assertEqual(len(partials), 3)
+        self.assertTrue(partials[1]['empty'])
+        self.assertEqual(runner.reduce_partials(partials), 90)
+        self.assertIsNone(AggregateRunner('function map(v) { return v; } function reduce(a, b) { return a + b; }' +
+                                          JsAggregateAlgorithm.AGGREGATE_JS, QgsProcessingFeedback(), False,
+                                          ValueMarshaller).reduce_partials([]))
+
+    def testMemo(self):
+        """
+        Test reusing results of pure scripts
+        """
+        fields = QgsFields()
+        fields.append(QgsField('name', QVariant.String))
+
+        def create_marshaller(engine):
+            return FeatureMarshaller(engine, fields, QgsCoordinateReferenceSystem('EPSG:4326'),
+                                     QgsCoordinateTransformContext(), lazy=False)
+
+        memo = LruCache(10)
+        runner = ScriptRunner(FeatureMarshaller.JS_WRAPPER +
+                              'var calls = 0; function func(f) { calls++; f.properties.name += "!"; return f; }',
+                              QgsProcessingFeedback(), False, create_marshaller, memo=memo)
+        features = []
+        for name in ['a', 'b', 'a', 'a']:
+            feature = QgsFeature(fields)
+            feature.setAttributes([name])
+            features.append(feature)
+
+        res = runner.process_features(features)
+        self.assertEqual([f['name'] for f in res], ['a!', 'b!', 'a!', 'a!'])
+        self.assertEqual(runner.engine.globalObject().property('calls').toInt(), 2)
+        self.assertEqual((memo.hits, memo.misses), (2, 2))
+
+    def testBufferedFeedback(self):
+        """
+        Test buffering and deduplicating script feedback
+        """
+        script = FeatureMarshaller.JS_WRAPPER + """
+function func(f) { feedback.pushInfo('same'); feedback.pushInfo('id ' + f.id); return f; }
+"""
+        fields = QgsFields()
+
+        def create_marshaller(engine):
+            return FeatureMarshaller(engine, fields, QgsCoordinateReferenceSystem('EPSG:4326'),
+                                     QgsCoordinateTransformContext(), lazy=False)
+
+        features = []
+        for i in range(5):
+            feature = QgsFeature(fields)
+            feature.setId(i)
+            features.append(feature)
+
+        feedback = RecordingFeedback()
+        runner = ScriptRunner(script, feedback, False, create_marshaller, buffer_feedback=True)
+        runner.process_features(features)
+        runner.release()
+        self.assertEqual(feedback.messages, ['same', 'id 0', 'id 1', 'id 2', 'id 3', 'id 4',
+                                             'Message "same" repeated 4 times'])
+
+        # buffered messages are passed on during the run once the flush interval elapses,
+        # without waiting for the script's next message
+        feedback = RecordingFeedback()
+        runner = ScriptRunner(script, feedback, False, create_marshaller, buffer_feedback=True)
+        runner.process_feature(features[0])
+        self.assertEqual(feedback.messages, ['same'])
+        runner.flush_interval = 0
+        runner.process_feature(features[1])
+        self.assertEqual(feedback.messages, ['same', 'id 0', 'id 1'])
+        runner.release()
+
+        # raw feedback passes every message straight through
+        feedback = RecordingFeedback()
+        runner = ScriptRunner(script, feedback, False, create_marshaller)
+        runner.process_features(features[:2])
+        runner.release()
+        self.assertEqual(feedback.messages, ['same', 'id 0', 'same', 'id 1'])
+
+    def testNoPool(self):
+        """
+        Test runners without a pool
+        """
+        runner = ScriptRunner(SCRIPT, QgsProcessingFeedback(), False, lambda engine: None)
+        self.assertFalse(runner.reused)
+        runner.release()
+        self.assertIsNone(runner.engine)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(EngineTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
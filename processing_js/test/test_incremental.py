@@ -0,0 +1,90 @@
+# coding=utf-8
+"""Incremental state Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+import os
+import tempfile
+from qgis.core import (QgsFeature,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsPointXY)
+from qgis.PyQt.QtCore import QVariant
+from processing_js.processing.incremental import (IncrementalState,
+                                                  feature_hash,
+                                                  state_path)
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class IncrementalTest(unittest.TestCase):
+    """Test incremental state."""
+
+    def testFeatureHash(self):
+        """
+        Test feature content hashes
+        """
+        fields = QgsFields()
+        fields.append(QgsField('name', QVariant.String))
+        feature = QgsFeature(fields)
+        feature.setAttributes(['a'])
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(1, 2)))
+        original = feature_hash(feature)
+        self.assertEqual(feature_hash(feature), original)
+
+        feature.setAttributes(['b'])
+        self.assertNotEqual(feature_hash(feature), original)
+        feature.setAttributes(['a'])
+        feature.setGeometry(QgsGeometry.fromPointXY(QgsPointXY(1, 3)))
+        self.assertNotEqual(feature_hash(feature), original)
+
+    def testState(self):
+        """
+        Test storing incremental state
+        """
+        self.assertEqual(state_path('/tmp/out.gpkg'), '/tmp/out.gpkg.jsstate.sqlite')
+
+        path = os.path.join(tempfile.mkdtemp(), 'state.sqlite')
+        state = IncrementalState(path)
+        self.assertIsNone(state.run_key())
+        state.reset('key')
+        state.set(1, 'h1', [10, 11])
+        state.set(2, 'h2', [12])
+        state.commit()
+        state.close()
+
+        state = IncrementalState(path)
+        self.assertEqual(state.run_key(), 'key')
+        self.assertEqual(state.get(1), ('h1', [10, 11]))
+        self.assertEqual(state.input_fids(), {1, 2})
+        state.remove(1)
+        state.set(3, 'h3', [])
+        state.commit()
+        state.close()
+
+        state = IncrementalState(path)
+        self.assertIsNone(state.get(1))
+        self.assertEqual(state.input_fids(), {2, 3})
+        state.reset('other')
+        self.assertEqual(state.input_fids(), set())
+        state.close()
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(IncrementalTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,84 @@
+# coding=utf-8
+"""Lookup table Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+import os
+from qgis.core import QgsProcessingFeedback
+from processing_js.processing.algorithm import JsAlgorithm
+from processing_js.processing.engine import ScriptRunner
+from processing_js.processing.lookup import (LookupTable,
+                                             LookupObject)
+from .utilities import get_qgis_app, create_layer
+
+QGIS_APP = get_qgis_app()
+
+test_data_path = os.path.join(
+    os.path.dirname(__file__),
+    'data')
+
+# road classes, including a duplicated code and a null name
+ROAD_CLASSES = [[1, 'motorway'], [2, 'primary'], [2, 'duplicate'], [3, None]]
+
+
+class LookupTest(unittest.TestCase):
+    """Test lookup tables."""
+
+    def testTable(self):
+        """
+        Test building lookup tables
+        """
+        layer = create_layer('None?field=code:integer&field=name:string', 'classes', ROAD_CLASSES)
+        table = LookupTable('lookup', layer, 'code')
+        self.assertEqual(len(table), 3)
+        self.assertEqual(table.duplicates, 1)
+        self.assertEqual(table.get(1), {'code': 1, 'name': 'motorway'})
+        self.assertEqual(table.get(2.0)['name'], 'primary')
+        self.assertIsNone(table.get(3)['name'])
+        self.assertIsNone(table.get(4))
+        self.assertGreater(table.memory_usage(), 0)
+
+    def testScriptAccess(self):
+        """
+        Test accessing lookup tables from scripts
+        """
+        layer = create_layer('None?field=code:integer&field=name:string', 'classes', ROAD_CLASSES)
+        table = LookupTable('lookup', layer, 'code')
+        runner = ScriptRunner('function func(f) { return f; }', QgsProcessingFeedback(), False,
+                              lambda engine: None,
+                              globals_factory=lambda engine: {'lookup': LookupObject(table, engine)})
+        self.assertEqual(runner.engine.evaluate('lookup.get(1).name').toString(), 'motorway')
+        self.assertTrue(runner.engine.evaluate('lookup.get(5)').isNull())
+        self.assertTrue(runner.engine.evaluate('lookup.has(2)').toBool())
+        self.assertEqual(runner.engine.evaluate('lookup.size()').toInt(), 3)
+
+    def testDirective(self):
+        """
+        Test parsing lookup directives
+        """
+        alg = JsAlgorithm(description_file=os.path.join(test_data_path, 'test_lookup.js'))
+        alg.initAlgorithm()
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.lookups, {'lookup': ('Classes', 'code'),
+                                       'by_name': ('Classes', 'name')})
+
+        alg = JsAlgorithm(description_file=None, script='//#lookup:Classes\nfunction func(f) { return f; }')
+        self.assertTrue(alg.error)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(LookupTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,90 @@
+# coding=utf-8
+"""Script manifest Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import tempfile
+import unittest
+from processing_js.processing.manifest import ScriptManifest
+
+
+class ManifestTest(unittest.TestCase):
+    """Test the script metadata manifest."""
+
+    def testManifest(self):
+        """
+        Test storing and retrieving script metadata
+        """
+        folder = tempfile.mkdtemp()
+        script_path = os.path.join(folder, 'script.js')
+        with open(script_path, 'w') as f:
+            f.write('//#Test=name\nfunction func(f) { return f; }\n')
+        manifest_path = os.path.join(folder, 'cache', 'manifest.json')
+
+        manifest = ScriptManifest(manifest_path)
+        signature = ScriptManifest.signature(script_path)
+        self.assertIsNone(manifest.get(script_path, signature))
+        manifest.put(script_path, signature, ['//#Test=name'])
+        self.assertEqual(manifest.get(script_path), ['//#Test=name'])
+        self.assertEqual((manifest.hits, manifest.misses), (1, 1))
+        self.assertEqual(manifest.hit_rate(), 50)
+        manifest.save()
+        self.assertFalse(manifest.modified)
+
+        # entries persist between sessions
+        manifest = ScriptManifest(manifest_path)
+        self.assertEqual(manifest.get(script_path), ['//#Test=name'])
+
+        # changed scripts are not used
+        with open(script_path, 'a') as f:
+            f.write('// changed\n')
+        self.assertIsNone(manifest.get(script_path))
+        self.assertIsNone(manifest.get(os.path.join(folder, 'missing.js')))
+
+    def testPrune(self):
+        """
+        Test removing entries for scripts which no longer exist
+        """
+        folder = tempfile.mkdtemp()
+        manifest = ScriptManifest(os.path.join(folder, 'manifest.json'))
+        manifest.put(os.path.join(folder, 'a.js'), (1, 2), ['//#a=name'])
+        manifest.put(os.path.join(folder, 'b.js'), (1, 2), ['//#b=name'])
+        manifest.save()
+
+        manifest = ScriptManifest(os.path.join(folder, 'manifest.json'))
+        manifest.get(os.path.join(folder, 'a.js'))
+        manifest.prune()
+        self.assertTrue(manifest.modified)
+        self.assertEqual(list(manifest.entries.keys()), [ScriptManifest.key(os.path.join(folder, 'a.js'))])
+
+    def testInvalidManifest(self):
+        """
+        Test that unreadable manifests are treated as empty
+        """
+        folder = tempfile.mkdtemp()
+        path = os.path.join(folder, 'manifest.json')
+        with open(path, 'w') as f:
+            f.write('not json')
+        self.assertEqual(ScriptManifest(path).entries, {})
+
+        with open(path, 'w') as f:
+            f.write('{"version": -1, "scripts": {"a": {}}}')
+        self.assertEqual(ScriptManifest(path).entries, {})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ManifestTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,221 @@
+# coding=utf-8
+"""Feature marshalling Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from qgis.core import (QgsFeature,
+                       QgsProcessingException,
+                       QgsField,
+                       QgsFields,
+                       QgsGeometry,
+                       QgsCoordinateReferenceSystem,
+                       QgsCoordinateTransformContext)
+from qgis.PyQt.QtCore import QVariant, QDate
+from PyQt5.QtQml import QJSEngine
+from processing_js.processing.marshalling import (FeatureMarshaller,
+                                                 FlatGeometryMarshaller,
+                                                 value_converter)
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class MarshallingTest(unittest.TestCase):
+    """Test feature marshalling."""
+
+    @staticmethod
+    def create_marshaller(engine, marshaller_class=FeatureMarshaller, lazy=False):
+        """
+        Creates a marshaller for a simple set of fields
+        """
+        fields = QgsFields()
+        fields.append(QgsField('name', QVariant.String))
+        fields.append(QgsField('value', QVariant.Int))
+        return marshaller_class(engine, fields, QgsCoordinateReferenceSystem('EPSG:4326'),
+                                QgsCoordinateTransformContext(), lazy=lazy)
+
+    def testRoundTrip(self):
+        """
+        Test converting features to and from JS values
+        """
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine)
+
+        feature = QgsFeature(marshaller.fields)
+        feature.setAttributes(['a', 5])
+        feature.setGeometry(QgsGeometry.fromWkt('Polygon((1 1, 2 1, 2 2, 1 1),(1.1 1.1, 1.2 1.1, 1.2 1.2, 1.1 1.1))'))
+
+        value = marshaller.feature_to_js(feature)
+        self.assertEqual(value.property('type').toString(), 'Feature')
+        self.assertEqual(value.property('properties').property('name').toString(), 'a')
+        self.assertEqual(value.property('geometry').property('type').toString(), 'Polygon')
+
+        features = marshaller.features_from_js(value)
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0].attributes(), ['a', 5])
+        self.assertEqual(features[0].geometry().asWkt(),
+                         'Polygon ((1 1, 2 1, 2 2, 1 1),(1.1 1.1, 1.2 1.1, 1.2 1.2, 1.1 1.1))')
+
+    def testScriptResults(self):
+        """
+        Test converting values returned from scripts
+        """
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine)
+
+        self.assertEqual(marshaller.features_from_js(engine.evaluate('null')), [])
+        self.assertEqual(marshaller.features_from_js(engine.evaluate('undefined')), [])
+
+        features = marshaller.features_from_js(engine.evaluate(
+            '[{"type": "Feature", "properties": {"name": "b", "other": 1},'
+            '  "geometry": {"type": "MultiPoint", "coordinates": [[1, 2], [3, 4]]}}, null]'))
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0].attributes(), ['b', None])
+        self.assertEqual(features[0].geometry().asWkt(), 'MultiPoint ((1 2),(3 4))')
+
+    def testFlatGeometry(self):
+        """
+        Test converting geometries to and from flat typed arrays
+        """
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine, FlatGeometryMarshaller)
+        engine.evaluate(FlatGeometryMarshaller.JS_WRAPPER +
+                        'function func(feature) {'
+                        '  var c = feature.geometry.coordinates;'
+                        '  for (var i = 0; i < c.length; i++) c[i] *= 2;'
+                        '  return feature;'
+                        '}')
+        process = engine.globalObject().property('process')
+
+        feature = QgsFeature(marshaller.fields)
+        feature.setAttributes(['a', 5])
+        feature.setGeometry(QgsGeometry.fromWkt('MultiPolygon (((1 1, 2 1, 2 2, 1 1)),((3 3, 4 3, 4 4, 3 3)))'))
+
+        value = marshaller.feature_to_js(feature)
+        geometry = value.property('geometry')
+        self.assertEqual(geometry.property('type').toString(), 'MultiPolygon')
+        self.assertEqual(geometry.property('stride').toInt(), 2)
+        self.assertEqual(geometry.property('coordinates').property('length').toInt(), 16)
+        self.assertEqual(geometry.property('rings').property('length').toInt(), 3)
+        self.assertEqual(geometry.property('parts').property('length').toInt(), 3)
+
+        features = marshaller.features_from_js(process.call([value]))
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0].geometry().asWkt(),
+                         'MultiPolygon (((2 2, 4 2, 4 4, 2 2)),((6 6, 8 6, 8 8, 6 6)))')
+
+    def testLazyFeatures(self):
+        """
+        Test lazy feature objects
+        """
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine, lazy=True)
+        engine.evaluate(FeatureMarshaller.JS_WRAPPER +
+                        'function func(feature) {'
+                        '  feature.properties.value = feature.properties.value + 1;'
+                        '  return feature;'
+                        '}')
+        process = engine.globalObject().property('process')
+
+        feature = QgsFeature(marshaller.fields)
+        feature.setAttributes(['a', 5])
+        feature.setGeometry(QgsGeometry.fromWkt('Point (1 2)'))
+
+        value = marshaller.feature_to_js(feature)
+        # nothing is read until the script asks for it
+        self.assertEqual(value.property('properties').property('__lazyTarget').toVariant(), {})
+
+        res = process.call([value])
+        self.assertEqual(res.property('properties').property('__lazyTarget').toVariant(), {'value': 6})
+        self.assertEqual(res.property('__lazyGeometrySlot').toInt(), 0)
+
+        features = marshaller.features_from_js(res)
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0].attributes(), ['a', 6])
+        self.assertEqual(features[0].geometry().asWkt(), 'Point (1 2)')
+
+        # reading the geometry materializes it
+        value = marshaller.feature_to_js(feature)
+        self.assertEqual(value.property('geometry').property('type').toString(), 'Point')
+        self.assertEqual(value.property('__lazyGeometrySlot').toInt(), -1)
+
+    def testKeptLazyFeatures(self):
+        """
+        Test lazy features kept by a script from an earlier call
+        """
+        script = FeatureMarshaller.JS_WRAPPER + 'var last; function func(f) { var o = last; last = f; return o; }'
+        features = []
+        for name, value in [('a', 1), ('b', 2)]:
+            feature = QgsFeature()
+            feature.setAttributes([name, value])
+            feature.setGeometry(QgsGeometry.fromWkt('Point ({} 0)'.format(value)))
+            features.append(feature)
+
+        # the kept feature can't be read from the replaced input features
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine, lazy=True)
+        engine.evaluate(script)
+        process = engine.globalObject().property('process')
+        self.assertEqual(marshaller.features_from_js(process.call([marshaller.feature_to_js(features[0])])), [])
+        with self.assertRaises(QgsProcessingException):
+            marshaller.features_from_js(process.call([marshaller.feature_to_js(features[1])]))
+        self.assertEqual(engine.evaluate('last.properties.name').toString(), 'b')
+        marshaller.feature_to_js(features[0])
+        self.assertTrue(engine.evaluate('last.properties.name').isError())
+        self.assertTrue(engine.evaluate('last.geometry').isError())
+
+        # values which were read during the call are kept
+        engine.evaluate('last = null; function func(f) { f.properties.name; f.geometry; last = f; }')
+        process.call([marshaller.feature_to_js(features[1])])
+        marshaller.feature_to_js(features[0])
+        self.assertEqual(engine.evaluate('last.properties.name').toString(), 'b')
+        self.assertEqual(engine.evaluate('last.geometry.coordinates[0]').toInt(), 2)
+        self.assertTrue(engine.evaluate('last.properties.value').isError())
+
+        # eager features can be kept
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine, lazy=False)
+        engine.evaluate(script)
+        process = engine.globalObject().property('process')
+        marshaller.features_from_js(process.call([marshaller.feature_to_js(features[0])]))
+        res = marshaller.features_from_js(process.call([marshaller.feature_to_js(features[1])]))
+        self.assertEqual(res[0].attributes(), ['a', 1])
+        self.assertEqual(res[0].geometry().asWkt(), 'Point (1 0)')
+
+    def testValueConverters(self):
+        """
+        Test converting script values to field types
+        """
+        self.assertEqual(value_converter(QgsField('f', QVariant.Int))(5.0), 5)
+        self.assertEqual(value_converter(QgsField('f', QVariant.Int))('7'), 7)
+        self.assertIsNone(value_converter(QgsField('f', QVariant.Int))('x'))
+        self.assertIsNone(value_converter(QgsField('f', QVariant.Int))(None))
+        self.assertEqual(value_converter(QgsField('f', QVariant.Double))(5), 5.0)
+        self.assertEqual(value_converter(QgsField('f', QVariant.String))(5), '5')
+        self.assertTrue(value_converter(QgsField('f', QVariant.Bool))('true'))
+        self.assertFalse(value_converter(QgsField('f', QVariant.Bool))('false'))
+        self.assertEqual(value_converter(QgsField('f', QVariant.Date))('2020-05-04'), QDate(2020, 5, 4))
+
+        engine = QJSEngine()
+        marshaller = self.create_marshaller(engine)
+        features = marshaller.features_from_js(engine.evaluate(
+            '({"type": "Feature", "properties": {"value": "12", "unknown": 1, "name": 3}})'))
+        self.assertEqual(features[0].attributes(), ['3', 12])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MarshallingTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,118 @@
+# coding=utf-8
+"""Parallel execution Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import threading
+import unittest
+from qgis.core import (QgsProcessingException,
+                       QgsProcessingFeedback)
+from processing_js.processing.parallel import (ParallelScriptExecutor,
+                                               chunked)
+from .utilities import get_qgis_app, RecordingFeedback
+
+QGIS_APP = get_qgis_app()
+
+
+class DoublingRunner:
+    """
+    Test runner which doubles all input values
+    """
+
+    def __init__(self, feedback):
+        self.feedback = feedback
+
+    def process_features(self, features):
+        """
+        Processes a chunk of values
+        """
+        self.feedback.pushInfo('chunk {}'.format(features[0]))
+        return [f * 2 for f in features]
+
+    def release(self):
+        """
+        Releases the runner
+        """
+        self.feedback.pushInfo('released')
+
+
+class BrokenRunner:
+    """
+    Test runner which fails to initialize
+    """
+
+    def __init__(self, feedback):  # pylint: disable=unused-argument
+        raise QgsProcessingException('broken script')
+
+
+class ParallelTest(unittest.TestCase):
+    """Test parallel execution."""
+
+    def testChunked(self):
+        """
+        Test splitting iterables into chunks
+        """
+        self.assertEqual(list(chunked(range(7), 3)), [[0, 1, 2], [3, 4, 5], [6]])
+        self.assertEqual(list(chunked([], 3)), [])
+
+    def testOrdered(self):
+        """
+        Test ordered parallel execution
+        """
+        res = []
+        counts = []
+
+        def handle_results(features, count):
+            res.extend(features)
+            counts.append(count)
+
+        executor = ParallelScriptExecutor(4, DoublingRunner, ordered=True)
+        executor.run(chunked(range(1000), 7), QgsProcessingFeedback(), handle_results)
+        self.assertEqual(res, [i * 2 for i in range(1000)])
+        self.assertEqual(sum(counts), 1000)
+
+    def testUnordered(self):
+        """
+        Test unordered parallel execution
+        """
+        res = []
+        executor = ParallelScriptExecutor(4, DoublingRunner, ordered=False)
+        executor.run(chunked(range(1000), 7), QgsProcessingFeedback(), lambda f, c: res.extend(f))
+        self.assertEqual(sorted(res), [i * 2 for i in range(1000)])
+
+    def testFeedback(self):
+        """
+        Test that worker messages are passed to feedback from the calling thread
+        """
+        feedback = RecordingFeedback()
+        executor = ParallelScriptExecutor(4, DoublingRunner)
+        executor.run(chunked(range(100), 10), feedback, lambda f, c: None)
+        self.assertEqual(sorted(m for m in feedback.messages if m != 'released'),
+                         sorted('chunk {}'.format(i) for i in range(0, 100, 10)))
+        self.assertEqual(feedback.messages.count('released'), 4)
+        self.assertEqual(feedback.threads, {threading.get_ident()})
+
+    def testErrors(self):
+        """
+        Test that worker errors are raised
+        """
+        executor = ParallelScriptExecutor(2, BrokenRunner)
+        with self.assertRaises(QgsProcessingException):
+            executor.run(chunked(range(10), 2), QgsProcessingFeedback(), lambda f, c: None)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ParallelTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
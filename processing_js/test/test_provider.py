@@ -0,0 +1,94 @@
+# coding=utf-8
+"""Provider Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import os
+import tempfile
+import unittest
+from qgis.PyQt.QtCore import QFileSystemWatcher
+from processing_js.processing.manifest import ScriptManifest
+from processing_js.processing.provider import JsAlgorithmProvider
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+def write_script(path, name):
+    """
+    Writes a minimal script
+    """
+    with open(path, 'w') as f:
+        f.write('//#{}=name\nfunction func(f) {{ return f; }}\n'.format(name))
+
+
+class ProviderTest(unittest.TestCase):
+    """Test the script provider."""
+
+    def testFolderChanges(self):
+        """
+        Test updating scripts for changed files and folders
+        """
+        folder = os.path.realpath(tempfile.mkdtemp())
+        write_script(os.path.join(folder, 'a.js'), 'A')
+
+        provider = JsAlgorithmProvider()
+        provider.manifest = ScriptManifest(os.path.join(tempfile.mkdtemp(), 'manifest.json'))
+        provider.watcher = QFileSystemWatcher()
+        algs = provider.scan_script_folders([folder])
+        self.assertEqual([a.displayName() for a in algs], ['A'])
+        self.assertIn(folder, provider.watcher.directories())
+        self.assertIn(os.path.join(folder, 'a.js'), provider.watcher.files())
+        self.assertFalse(provider.apply_changes([folder]))
+
+        # new scripts and folders
+        write_script(os.path.join(folder, 'b.js'), 'B')
+        os.mkdir(os.path.join(folder, 'sub'))
+        write_script(os.path.join(folder, 'sub', 'c.js'), 'C')
+        self.assertTrue(provider.apply_changes([folder]))
+        self.assertEqual(sorted(a.displayName() for a in provider.algorithms_from_metadata()), ['A', 'B', 'C'])
+        self.assertIn(os.path.join(folder, 'sub'), provider.watcher.directories())
+
+        # changed scripts, detected by a changed size even if the modification time is unchanged
+        path = os.path.join(folder, 'b.js')
+        mtime = os.stat(path).st_mtime
+        write_script(path, 'B2')
+        os.utime(path, (mtime, mtime))
+        self.assertTrue(provider.apply_changes([path]))
+        self.assertEqual(sorted(a.displayName() for a in provider.algorithms_from_metadata()), ['A', 'B2', 'C'])
+
+        # or by a changed modification time if the size is unchanged
+        write_script(path, 'B3')
+        os.utime(path, (mtime + 10, mtime + 10))
+        self.assertTrue(provider.apply_changes([path]))
+        self.assertEqual(sorted(a.displayName() for a in provider.algorithms_from_metadata()), ['A', 'B3', 'C'])
+        self.assertFalse(provider.apply_changes([path]))
+
+        # removed scripts and folders
+        os.remove(os.path.join(folder, 'a.js'))
+        os.remove(os.path.join(folder, 'sub', 'c.js'))
+        os.rmdir(os.path.join(folder, 'sub'))
+        self.assertTrue(provider.apply_changes([folder, os.path.join(folder, 'sub')]))
+        self.assertEqual([a.displayName() for a in provider.algorithms_from_metadata()], ['B3'])
+
+        # scripts outside the script folders are ignored
+        outside = os.path.join(tempfile.mkdtemp(), 'd.js')
+        write_script(outside, 'D')
+        self.assertFalse(provider.apply_changes([outside]))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ProviderTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
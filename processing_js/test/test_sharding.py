@@ -0,0 +1,58 @@
+# coding=utf-8
+"""Sharded execution Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from processing_js.processing.sharding import (split_evenly,
+                                               split_extent,
+                                               format_message,
+                                               parse_message,
+                                               MESSAGE_PROGRESS)
+from .utilities import get_qgis_app
+
+QGIS_APP = get_qgis_app()
+
+
+class ShardingTest(unittest.TestCase):
+    """Test sharded execution."""
+
+    def testSplitEvenly(self):
+        """
+        Test splitting feature ids into shards
+        """
+        self.assertEqual(split_evenly(list(range(7)), 3), [[0, 1, 2], [3, 4], [5, 6]])
+        self.assertEqual(split_evenly([1, 2], 4), [[1], [2]])
+        self.assertEqual(split_evenly([], 4), [])
+
+    def testSplitExtent(self):
+        """
+        Test splitting an extent into strips
+        """
+        self.assertEqual(split_extent(0, 10, 2), [(0, 5), (5, 10)])
+        self.assertEqual(split_extent(0, 9, 1), [(0, 9)])
+
+    def testMessages(self):
+        """
+        Test worker message encoding
+        """
+        line = format_message(MESSAGE_PROGRESS, 50.0)
+        self.assertEqual(parse_message(line), (MESSAGE_PROGRESS, '50.0'))
+        self.assertEqual(parse_message(format_message('info', 'a:b\nc')), ('info', 'a:b c'))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ShardingTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,85 @@
+# coding=utf-8
+"""Spatial index Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from qgis.core import (QgsCoordinateTransformContext,
+                       QgsProcessingFeedback)
+from processing_js.processing.algorithm import JsAlgorithm
+from processing_js.processing.engine import ScriptRunner
+from processing_js.processing.spatial import (SpatialIndexTable,
+                                              SpatialIndexObject)
+from .utilities import get_qgis_app, create_layer
+
+QGIS_APP = get_qgis_app()
+
+POINT_NAMES = [['a'], ['b'], ['c'], ['d']]
+POINTS = ['Point (0 0)', 'Point (10 0)', 'Point (0 10)', 'Point (5 5)']
+
+
+class SpatialIndexTest(unittest.TestCase):
+    """Test spatial indexes."""
+
+    def testTable(self):
+        """
+        Test spatial index queries
+        """
+        layer = create_layer('Point?crs=EPSG:4326&field=name:string', 'points', POINT_NAMES, POINTS)
+        table = SpatialIndexTable('spatial', layer, QgsCoordinateTransformContext())
+        self.assertEqual(len(table), 4)
+
+        res = table.nearest(9, 1)
+        self.assertEqual(len(res), 1)
+        self.assertEqual(res[0]['properties']['name'], 'b')
+        self.assertAlmostEqual(res[0]['distance'], 2 ** 0.5)
+
+        res = table.nearest(1, 1, 2)
+        self.assertEqual([r['properties']['name'] for r in res], ['a', 'd'])
+
+        res = table.intersects([4, 4, 11, 6])
+        self.assertEqual(sorted(r['properties']['name'] for r in res), ['d'])
+        res = table.intersects({'xmin': -1, 'ymin': -1, 'xmax': 11, 'ymax': 1})
+        self.assertEqual(sorted(r['properties']['name'] for r in res), ['a', 'b'])
+
+    def testScriptAccess(self):
+        """
+        Test querying spatial indexes from scripts
+        """
+        layer = create_layer('Point?crs=EPSG:4326&field=name:string', 'points', POINT_NAMES, POINTS)
+        table = SpatialIndexTable('spatial', layer, QgsCoordinateTransformContext())
+        runner = ScriptRunner('function func(f) { return f; }', QgsProcessingFeedback(), False,
+                              lambda engine: None,
+                              globals_factory=lambda engine: {'spatial': SpatialIndexObject(table, engine)})
+        self.assertEqual(runner.engine.evaluate('spatial.nearest(9, 1)[0].properties.name').toString(), 'b')
+        self.assertEqual(runner.engine.evaluate('spatial.nearest(1, 1, 2).length').toInt(), 2)
+        self.assertEqual(runner.engine.evaluate('spatial.intersects([4, 4, 11, 6])[0].properties.name').toString(),
+                         'd')
+        self.assertEqual(runner.engine.evaluate('spatial.size()').toInt(), 4)
+
+    def testDirective(self):
+        """
+        Test parsing spatial index directives
+        """
+        alg = JsAlgorithm(description_file=None,
+                          script='//#Other=source\n//#spatial_index:Other\n//#spatial_index:Other,other\n'
+                                 'function func(f) { return f; }')
+        self.assertFalse(alg.error)
+        self.assertEqual(alg.spatial_indexes, {'spatial': 'Other', 'other': 'Other'})
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SpatialIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
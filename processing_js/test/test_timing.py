@@ -0,0 +1,74 @@
+# coding=utf-8
+"""Stage timing Test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = '(C) 2026 by North Road'
+__date__ = '17/10/2026'
+__copyright__ = 'Copyright 2026, North Road'
+# This will get replaced with a git SHA1 when you do a git archive
+__revision__ = '$Format:%H$'
+
+import unittest
+from processing_js.processing.timing import (StageTimings,
+                                             TimedSink)
+
+
+class ListSink:
+    """
+    Test sink which collects features in a list
+    """
+
+    def __init__(self):
+        self.features = []
+
+    def addFeatures(self, features, flags=0):  # pylint: disable=invalid-name,unused-argument
+        """
+        Adds features to the list
+        """
+        self.features.extend(features)
+        return True
+
+
+class StageTimingsTest(unittest.TestCase):
+    """Test stage timings."""
+
+    def testTimings(self):
+        """
+        Test accumulating stage timings
+        """
+        timings = StageTimings()
+        self.assertEqual(list(timings.iterate(range(5))), [0, 1, 2, 3, 4])
+        self.assertEqual(timings.features, 5)
+        self.assertEqual(timings.counts[StageTimings.READ], 5)
+
+        timings.add_call(1, 2, 3)
+        timings.add_call(1, 2, 3)
+        self.assertEqual(timings.times[StageTimings.CALL], 4)
+        self.assertEqual(timings.counts[StageTimings.IMPORT], 2)
+
+        sink = ListSink()
+        timed = TimedSink(sink, timings)
+        self.assertTrue(timed.addFeatures([1, 2]))
+        self.assertEqual(sink.features, [1, 2])
+        self.assertEqual(timings.counts[StageTimings.WRITE], 1)
+
+        timings.finish()
+        self.assertGreater(timings.elapsed, 0)
+        outputs = timings.outputs()
+        self.assertEqual(outputs['EXPORT_TIME'], 2)
+        self.assertEqual(sorted(outputs.keys()),
+                         ['CALL_TIME', 'EXPORT_TIME', 'FEATURES_PER_SECOND', 'IMPORT_TIME', 'READ_TIME',
+                          'TOTAL_TIME', 'WRITE_TIME'])
+        self.assertEqual(len(timings.table()), len(StageTimings.STAGES) + 3)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(StageTimingsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -4,7 +4,9 @@
 import sys
 import logging
 import os
+import threading
 
+from qgis.core import QgsFeature, QgsGeometry, QgsProcessingFeedback, QgsVectorLayer
 from qgis.utils import iface
 
 LOGGER = logging.getLogger('QGIS')
@@ -104,3 +106,37 @@ def get_qgis_app(cleanup=True):
         IFACE = QgisInterface(CANVAS)
 
     return QGISAPP, CANVAS, IFACE, PARENT
+
+
+def create_layer(definition: str, name: str, attributes: list, geometries: list = None) -> QgsVectorLayer:
+    """
+    Creates a memory layer from a memory provider definition (such as
+    'Point?crs=EPSG:4326&field=name:string'), with a feature for each list
+    of attribute values. If specified, geometries is a list of WKT strings
+    for the features.
+    """
+    layer = QgsVectorLayer(definition, name, 'memory')
+    features = []
+    for i, values in enumerate(attributes):
+        feature = QgsFeature(layer.fields())
+        feature.setAttributes(values)
+        if geometries is not None:
+            feature.setGeometry(QgsGeometry.fromWkt(geometries[i]))
+        features.append(feature)
+    layer.dataProvider().addFeatures(features)
+    return layer
+
+
+class RecordingFeedback(QgsProcessingFeedback):
+    """
+    Test feedback which records pushed messages, and the threads they were pushed from
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = set()
+
+    def pushInfo(self, info):  # pylint: disable=missing-docstring
+        self.messages.append(info)
+        self.threads.add(threading.get_ident())